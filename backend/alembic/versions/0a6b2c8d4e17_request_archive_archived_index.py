@@ -0,0 +1,23 @@
+"""request archive archived_at index
+
+Revision ID: 0a6b2c8d4e17
+Revises: f18c3d5e7a92
+Create Date: 2026-01-30 15:03:27.664120
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '0a6b2c8d4e17'
+down_revision = 'f18c3d5e7a92'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('idx_req_archive_archived', 'maintenance_request_archive', ['archived_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_req_archive_archived', table_name='maintenance_request_archive')
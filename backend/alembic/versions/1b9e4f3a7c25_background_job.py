@@ -0,0 +1,42 @@
+"""background job
+
+Revision ID: 1b9e4f3a7c25
+Revises: 0a6b2c8d4e17
+Create Date: 2026-02-03 11:18:52.093471
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = '1b9e4f3a7c25'
+down_revision = '0a6b2c8d4e17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('background_job',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('kind', sa.String(), nullable=False),
+    sa.Column('payload', postgresql.JSONB(astext_type=sa.Text()), server_default=sa.text("'{}'::jsonb"), nullable=False),
+    sa.Column('status', sa.String(), server_default='queued', nullable=False),
+    sa.Column('attempts', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('max_attempts', sa.Integer(), server_default='5', nullable=False),
+    sa.Column('run_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.Column('locked_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('locked_by', sa.String(), nullable=True),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.CheckConstraint("status IN ('queued','running','dead')", name='background_job_status_check'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_job_ready', 'background_job', ['run_at', 'id'], unique=False, postgresql_where=sa.text("status = 'queued'"))
+    op.create_index('idx_job_running', 'background_job', ['locked_at'], unique=False, postgresql_where=sa.text("status = 'running'"))
+
+
+def downgrade() -> None:
+    op.drop_index('idx_job_running', table_name='background_job', postgresql_where=sa.text("status = 'running'"))
+    op.drop_index('idx_job_ready', table_name='background_job', postgresql_where=sa.text("status = 'queued'"))
+    op.drop_table('background_job')
@@ -0,0 +1,47 @@
+"""overdue and warranty indexes
+
+Revision ID: 2c7d5a9e0b38
+Revises: 1b9e4f3a7c25
+Create Date: 2026-02-06 13:52:19.408736
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '2c7d5a9e0b38'
+down_revision = '1b9e4f3a7c25'
+branch_labels = None
+depends_on = None
+
+OLD_LIST_COLUMNS = ['request_type', 'subject', 'equipment_id', 'scheduled_start', 'version']
+LIST_COLUMNS = ['request_type', 'subject', 'equipment_id', 'scheduled_start', 'due_at', 'is_open', 'version']
+
+
+def _visibility_indexes(list_columns) -> None:
+    op.create_index('idx_req_assignee', 'maintenance_request', ['assigned_to_id'], unique=False, postgresql_include=['id', 'stage_id', 'team_id', *list_columns])
+    op.create_index('idx_req_requester', 'maintenance_request', ['requester_id'], unique=False, postgresql_include=['id', 'stage_id', 'team_id', 'assigned_to_id', *list_columns])
+    op.create_index('idx_req_team_stage_open', 'maintenance_request', ['team_id', 'stage_id'], unique=False, postgresql_include=['id', 'assigned_to_id', *list_columns], postgresql_where=sa.text('is_open'))
+
+
+def _drop_visibility_indexes() -> None:
+    op.drop_index('idx_req_team_stage_open', table_name='maintenance_request', postgresql_where=sa.text('is_open'))
+    op.drop_index('idx_req_requester', table_name='maintenance_request')
+    op.drop_index('idx_req_assignee', table_name='maintenance_request')
+
+
+def upgrade() -> None:
+    # requests had due_at but nothing set it; the UI treated scheduled_start as the deadline
+    op.execute("UPDATE maintenance_request SET due_at = scheduled_start WHERE due_at IS NULL AND scheduled_start IS NOT NULL")
+    op.create_index('idx_req_overdue', 'maintenance_request', ['due_at', 'id'], unique=False, postgresql_where=sa.text('is_open AND due_at IS NOT NULL'))
+    op.create_index('idx_equipment_warranty', 'equipment', ['warranty_end_date'], unique=False, postgresql_where=sa.text('warranty_end_date IS NOT NULL'))
+    # the list projection now carries due_at/is_open; keep index-only scans possible
+    _drop_visibility_indexes()
+    _visibility_indexes(LIST_COLUMNS)
+
+
+def downgrade() -> None:
+    _drop_visibility_indexes()
+    _visibility_indexes(OLD_LIST_COLUMNS)
+    op.drop_index('idx_equipment_warranty', table_name='equipment', postgresql_where=sa.text('warranty_end_date IS NOT NULL'))
+    op.drop_index('idx_req_overdue', table_name='maintenance_request', postgresql_where=sa.text('is_open AND due_at IS NOT NULL'))
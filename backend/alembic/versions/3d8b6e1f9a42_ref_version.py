@@ -0,0 +1,50 @@
+"""ref version
+
+Revision ID: 3d8b6e1f9a42
+Revises: 2c7d5a9e0b38
+Create Date: 2026-02-09 10:04:37.512864
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '3d8b6e1f9a42'
+down_revision = '2c7d5a9e0b38'
+branch_labels = None
+depends_on = None
+
+REF_TABLES = ['maintenance_team', 'app_user', 'department', 'equipment_category', 'location']
+
+
+def upgrade() -> None:
+    op.create_table('ref_version',
+    sa.Column('table_name', sa.String(), nullable=False),
+    sa.Column('version', sa.BigInteger(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+    op.execute(
+        "INSERT INTO ref_version (table_name, version) VALUES "
+        + ", ".join(f"('{t}', 0)" for t in REF_TABLES)
+    )
+    op.execute("""
+        CREATE FUNCTION bump_ref_version() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO ref_version (table_name, version) VALUES (TG_TABLE_NAME, 1)
+            ON CONFLICT (table_name) DO UPDATE SET version = ref_version.version + 1;
+            RETURN NULL;
+        END;
+        $$
+    """)
+    for table in REF_TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_ref_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE "
+            f"ON {table} FOR EACH STATEMENT EXECUTE FUNCTION bump_ref_version()"
+        )
+
+
+def downgrade() -> None:
+    for table in REF_TABLES:
+        op.execute(f"DROP TRIGGER {table}_ref_version ON {table}")
+    op.execute("DROP FUNCTION bump_ref_version()")
+    op.drop_table('ref_version')
@@ -0,0 +1,47 @@
+"""request stage rollup
+
+Revision ID: 3f1a9c7d2e45
+Revises: 8562ca7f8964
+Create Date: 2026-01-05 09:14:02.118340
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '3f1a9c7d2e45'
+down_revision = '8562ca7f8964'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('request_stage_rollup',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('team_id', sa.Integer(), nullable=False),
+    sa.Column('equipment_category_id', sa.Integer(), nullable=False),
+    sa.Column('stage_id', sa.Integer(), nullable=False),
+    sa.Column('request_count', sa.Integer(), nullable=False),
+    sa.Column('duration_hours_sum', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('duration_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['equipment_category_id'], ['equipment_category.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['stage_id'], ['request_stage.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['team_id'], ['maintenance_team.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('day', 'team_id', 'equipment_category_id', 'stage_id')
+    )
+    # backfill from existing history
+    op.execute(
+        """
+        INSERT INTO request_stage_rollup
+            (day, team_id, equipment_category_id, stage_id,
+             request_count, duration_hours_sum, duration_count)
+        SELECT (created_at AT TIME ZONE 'UTC')::date, team_id, equipment_category_id, stage_id,
+               count(*), coalesce(sum(actual_duration_hours), 0), count(actual_duration_hours)
+        FROM maintenance_request
+        GROUP BY 1, 2, 3, 4
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('request_stage_rollup')
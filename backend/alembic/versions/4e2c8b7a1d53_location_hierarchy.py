@@ -0,0 +1,159 @@
+"""location hierarchy
+
+Revision ID: 4e2c8b7a1d53
+Revises: 3d8b6e1f9a42
+Create Date: 2026-02-11 15:27:08.664190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '4e2c8b7a1d53'
+down_revision = '3d8b6e1f9a42'
+branch_labels = None
+depends_on = None
+
+ROLLUP_DIMS = ['team_id', 'equipment_category_id', 'stage_id']
+
+
+def _refill_rollup(dims: list[str]) -> None:
+    """Recount rollup cells over live and archived requests, keyed by day + dims."""
+    cols = ', '.join(dims)
+    op.execute('DELETE FROM request_stage_rollup')
+    op.execute(
+        f"""
+        INSERT INTO request_stage_rollup
+            (day, {cols}, request_count, duration_hours_sum, duration_count)
+        SELECT (created_at AT TIME ZONE 'UTC')::date, {cols},
+               count(*), coalesce(sum(actual_duration_hours), 0), count(actual_duration_hours)
+        FROM (
+            SELECT created_at, {cols}, actual_duration_hours FROM maintenance_request
+            UNION ALL
+            SELECT created_at, {cols}, actual_duration_hours FROM maintenance_request_archive
+        ) AS history
+        GROUP BY (created_at AT TIME ZONE 'UTC')::date, {cols}
+        """
+    )
+
+
+def upgrade() -> None:
+    # tree with materialized id paths
+    op.add_column('location', sa.Column('parent_id', sa.Integer(), nullable=True))
+    op.add_column('location', sa.Column('path', sa.String(collation='C'), server_default='', nullable=False))
+    op.create_foreign_key('location_parent_id_fkey', 'location', 'location', ['parent_id'], ['id'], ondelete='RESTRICT')
+    op.execute("UPDATE location SET path = '/' || id || '/'")
+    op.create_index('idx_location_parent', 'location', ['parent_id'], unique=False)
+    op.create_index('idx_location_path', 'location', ['path'], unique=False)
+    op.execute("""
+        CREATE FUNCTION location_set_path() RETURNS trigger LANGUAGE plpgsql AS $$
+        DECLARE
+            parent_path text;
+        BEGIN
+            IF NEW.parent_id IS NULL THEN
+                NEW.path := '/' || NEW.id || '/';
+                RETURN NEW;
+            END IF;
+            SELECT path INTO parent_path FROM location WHERE id = NEW.parent_id;
+            IF NOT FOUND THEN
+                RAISE EXCEPTION 'parent location % does not exist', NEW.parent_id
+                    USING ERRCODE = 'foreign_key_violation';
+            END IF;
+            IF position('/' || NEW.id || '/' IN parent_path) > 0 THEN
+                RAISE EXCEPTION 'location % cannot be moved under itself', NEW.id
+                    USING ERRCODE = 'check_violation';
+            END IF;
+            NEW.path := parent_path || NEW.id || '/';
+            RETURN NEW;
+        END;
+        $$
+    """)
+    op.execute("""
+        CREATE FUNCTION location_move_subtree() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            -- descendants keep their parent_id, so this does not re-fire the triggers
+            UPDATE location
+            SET path = NEW.path || substr(path, length(OLD.path) + 1)
+            WHERE path LIKE OLD.path || '%' AND id <> NEW.id;
+            UPDATE maintenance_request
+            SET location_path = NEW.path || substr(location_path, length(OLD.path) + 1)
+            WHERE location_path LIKE OLD.path || '%';
+            RETURN NULL;
+        END;
+        $$
+    """)
+    op.execute(
+        "CREATE TRIGGER location_set_path BEFORE INSERT OR UPDATE OF parent_id ON location "
+        "FOR EACH ROW EXECUTE FUNCTION location_set_path()"
+    )
+    op.execute(
+        "CREATE TRIGGER location_move_subtree AFTER UPDATE OF parent_id ON location "
+        "FOR EACH ROW WHEN (OLD.path IS DISTINCT FROM NEW.path) EXECUTE FUNCTION location_move_subtree()"
+    )
+
+    op.create_index('idx_equipment_location', 'equipment', ['location_id'], unique=False)
+
+    # requests snapshot the equipment's location; the path copy follows the tree
+    op.add_column('maintenance_request', sa.Column('location_id', sa.Integer(), nullable=True))
+    op.add_column('maintenance_request', sa.Column('location_path', sa.String(collation='C'), nullable=True))
+    op.create_foreign_key('maintenance_request_location_id_fkey', 'maintenance_request', 'location', ['location_id'], ['id'])
+    op.add_column('maintenance_request_archive', sa.Column('location_id', sa.Integer(), nullable=True))
+    op.execute("""
+        CREATE FUNCTION request_set_location_path() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            NEW.location_path := (SELECT path FROM location WHERE id = NEW.location_id);
+            RETURN NEW;
+        END;
+        $$
+    """)
+    op.execute(
+        "CREATE TRIGGER request_set_location_path BEFORE INSERT OR UPDATE OF location_id ON maintenance_request "
+        "FOR EACH ROW EXECUTE FUNCTION request_set_location_path()"
+    )
+    op.execute("""
+        UPDATE maintenance_request r SET location_id = e.location_id
+        FROM equipment e WHERE e.id = r.equipment_id AND e.location_id IS NOT NULL
+    """)
+    op.execute("""
+        UPDATE maintenance_request_archive r SET location_id = e.location_id
+        FROM equipment e WHERE e.id = r.equipment_id AND e.location_id IS NOT NULL
+    """)
+    op.create_index('idx_req_location', 'maintenance_request', ['location_path'], unique=False)
+    op.create_index('idx_req_location_open', 'maintenance_request', ['location_path'], unique=False, postgresql_where=sa.text('is_open'))
+
+    # location becomes a rollup dimension; it is nullable, so the cell key
+    # moves from the primary key to a NULLS NOT DISTINCT unique index
+    op.drop_constraint('request_stage_rollup_pkey', 'request_stage_rollup', type_='primary')
+    op.add_column('request_stage_rollup', sa.Column('location_id', sa.Integer(), nullable=True))
+    op.create_foreign_key('request_stage_rollup_location_id_fkey', 'request_stage_rollup', 'location', ['location_id'], ['id'])
+    _refill_rollup(ROLLUP_DIMS + ['location_id'])
+    op.create_index('uq_rollup_cell', 'request_stage_rollup', ['day', *ROLLUP_DIMS, 'location_id'], unique=True, postgresql_nulls_not_distinct=True)
+
+
+def downgrade() -> None:
+    op.drop_index('uq_rollup_cell', table_name='request_stage_rollup', postgresql_nulls_not_distinct=True)
+    op.drop_constraint('request_stage_rollup_location_id_fkey', 'request_stage_rollup', type_='foreignkey')
+    op.drop_column('request_stage_rollup', 'location_id')
+    _refill_rollup(ROLLUP_DIMS)
+    op.create_primary_key('request_stage_rollup_pkey', 'request_stage_rollup', ['day', *ROLLUP_DIMS])
+
+    op.drop_index('idx_req_location_open', table_name='maintenance_request', postgresql_where=sa.text('is_open'))
+    op.drop_index('idx_req_location', table_name='maintenance_request')
+    op.execute('DROP TRIGGER request_set_location_path ON maintenance_request')
+    op.execute('DROP FUNCTION request_set_location_path()')
+    op.drop_column('maintenance_request_archive', 'location_id')
+    op.drop_constraint('maintenance_request_location_id_fkey', 'maintenance_request', type_='foreignkey')
+    op.drop_column('maintenance_request', 'location_path')
+    op.drop_column('maintenance_request', 'location_id')
+
+    op.drop_index('idx_equipment_location', table_name='equipment')
+
+    op.execute('DROP TRIGGER location_move_subtree ON location')
+    op.execute('DROP TRIGGER location_set_path ON location')
+    op.execute('DROP FUNCTION location_move_subtree()')
+    op.execute('DROP FUNCTION location_set_path()')
+    op.drop_index('idx_location_path', table_name='location')
+    op.drop_index('idx_location_parent', table_name='location')
+    op.drop_constraint('location_parent_id_fkey', 'location', type_='foreignkey')
+    op.drop_column('location', 'path')
+    op.drop_column('location', 'parent_id')
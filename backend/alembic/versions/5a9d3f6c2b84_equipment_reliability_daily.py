@@ -0,0 +1,82 @@
+"""equipment reliability daily
+
+Revision ID: 5a9d3f6c2b84
+Revises: 4e2c8b7a1d53
+Create Date: 2026-02-13 09:41:55.208317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '5a9d3f6c2b84'
+down_revision = '4e2c8b7a1d53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('equipment_reliability_daily',
+    sa.Column('equipment_id', sa.Integer(), nullable=False),
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('failure_count', sa.Integer(), nullable=False),
+    sa.Column('repair_count', sa.Integer(), nullable=False),
+    sa.Column('repair_hours_sum', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('repair_hours_count', sa.Integer(), nullable=False),
+    sa.Column('restore_hours_sum', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('downtime_hours', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.ForeignKeyConstraint(['equipment_id'], ['equipment.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('equipment_id', 'day')
+    )
+    # backfill from existing corrective history (same as rollups.rebuild_reliability)
+    op.execute(
+        """
+        WITH history AS (
+            SELECT equipment_id, stage_id, created_at, repaired_at, actual_duration_hours
+            FROM maintenance_request WHERE request_type = 'corrective'
+            UNION ALL
+            SELECT equipment_id, stage_id, created_at, repaired_at, actual_duration_hours
+            FROM maintenance_request_archive WHERE request_type = 'corrective'
+        ),
+        repaired AS (
+            SELECT h.equipment_id,
+                   h.created_at AT TIME ZONE 'UTC' AS created_at,
+                   h.repaired_at AT TIME ZONE 'UTC' AS repaired_at,
+                   h.actual_duration_hours
+            FROM history h JOIN request_stage s ON s.id = h.stage_id
+            WHERE s.is_closed AND NOT s.is_scrap
+        ),
+        cells AS (
+            SELECT equipment_id, (created_at AT TIME ZONE 'UTC')::date AS day,
+                   1 AS failures, 0 AS repairs, 0::numeric AS repair_hours, 0 AS repair_hours_n,
+                   0::numeric AS restore_hours, 0::numeric AS downtime
+            FROM history
+            UNION ALL
+            SELECT equipment_id, coalesce(repaired_at, created_at)::date,
+                   0, 1, coalesce(actual_duration_hours, 0), (actual_duration_hours IS NOT NULL)::int,
+                   coalesce(round(extract(epoch FROM repaired_at - created_at) / 3600, 2), 0), 0
+            FROM repaired
+            UNION ALL
+            SELECT r.equipment_id, d.day::date, 0, 0, 0, 0, 0,
+                   round(extract(epoch FROM least(r.repaired_at, d.day + interval '1 day')
+                                            - greatest(r.created_at, d.day)) / 3600, 2)
+            FROM repaired r
+            CROSS JOIN LATERAL generate_series(
+                date_trunc('day', r.created_at), r.repaired_at, interval '1 day'
+            ) AS d(day)
+            WHERE r.repaired_at > r.created_at AND r.repaired_at > d.day
+        )
+        INSERT INTO equipment_reliability_daily (
+            equipment_id, day, failure_count, repair_count, repair_hours_sum,
+            repair_hours_count, restore_hours_sum, downtime_hours
+        )
+        SELECT equipment_id, day, sum(failures), sum(repairs), sum(repair_hours),
+               sum(repair_hours_n), sum(restore_hours), sum(downtime)
+        FROM cells
+        GROUP BY equipment_id, day
+        """
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('equipment_reliability_daily')
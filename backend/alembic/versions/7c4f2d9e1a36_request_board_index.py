@@ -0,0 +1,26 @@
+"""request board index
+
+Revision ID: 7c4f2d9e1a36
+Revises: 6b1e4a7c3d95
+Create Date: 2026-02-18 10:22:47.913564
+
+"""
+from alembic import op
+
+
+revision = '7c4f2d9e1a36'
+down_revision = '6b1e4a7c3d95'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # (stage_id, updated_at, id) also serves every stage_id lookup, so it
+    # replaces idx_req_stage instead of adding to the write cost
+    op.create_index('idx_req_board', 'maintenance_request', ['stage_id', 'updated_at', 'id'], unique=False)
+    op.drop_index('idx_req_stage', table_name='maintenance_request')
+
+
+def downgrade() -> None:
+    op.create_index('idx_req_stage', 'maintenance_request', ['stage_id'], unique=False)
+    op.drop_index('idx_req_board', table_name='maintenance_request')
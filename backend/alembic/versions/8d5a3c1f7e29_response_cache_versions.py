@@ -0,0 +1,58 @@
+"""response cache versions
+
+Revision ID: 8d5a3c1f7e29
+Revises: 7c4f2d9e1a36
+Create Date: 2026-02-20 16:35:12.418907
+
+"""
+from alembic import op
+
+
+revision = '8d5a3c1f7e29'
+down_revision = '7c4f2d9e1a36'
+branch_labels = None
+depends_on = None
+
+STATEMENT_TABLES = ['equipment', 'maintenance_team_member']
+
+
+def upgrade() -> None:
+    op.execute(
+        "INSERT INTO ref_version (table_name, version) VALUES "
+        + ", ".join(f"('{t}', 0)" for t in [*STATEMENT_TABLES, 'maintenance_request'])
+        + " ON CONFLICT (table_name) DO NOTHING"
+    )
+    for table in STATEMENT_TABLES:
+        op.execute(
+            f"CREATE TRIGGER {table}_ref_version AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE "
+            f"ON {table} FOR EACH STATEMENT EXECUTE FUNCTION bump_ref_version()"
+        )
+    # requests are written far more often than the lists cached on them
+    # change: only bump when a request opens, closes or changes equipment,
+    # i.e. when some equipment's open count can move
+    op.execute(
+        "CREATE TRIGGER maintenance_request_ref_version_insert AFTER INSERT OR TRUNCATE "
+        "ON maintenance_request FOR EACH STATEMENT EXECUTE FUNCTION bump_ref_version()"
+    )
+    op.execute(
+        "CREATE TRIGGER maintenance_request_ref_version_update "
+        "AFTER UPDATE OF is_open, equipment_id ON maintenance_request FOR EACH ROW "
+        "WHEN (OLD.is_open IS DISTINCT FROM NEW.is_open OR OLD.equipment_id IS DISTINCT FROM NEW.equipment_id) "
+        "EXECUTE FUNCTION bump_ref_version()"
+    )
+    op.execute(
+        "CREATE TRIGGER maintenance_request_ref_version_delete "
+        "AFTER DELETE ON maintenance_request FOR EACH ROW WHEN (OLD.is_open) "
+        "EXECUTE FUNCTION bump_ref_version()"
+    )
+
+
+def downgrade() -> None:
+    for suffix in ('insert', 'update', 'delete'):
+        op.execute(f"DROP TRIGGER maintenance_request_ref_version_{suffix} ON maintenance_request")
+    for table in STATEMENT_TABLES:
+        op.execute(f"DROP TRIGGER {table}_ref_version ON {table}")
+    op.execute(
+        "DELETE FROM ref_version WHERE table_name IN "
+        "('equipment', 'maintenance_team_member', 'maintenance_request')"
+    )
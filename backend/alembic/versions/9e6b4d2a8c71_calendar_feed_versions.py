@@ -0,0 +1,84 @@
+"""calendar feed versions
+
+Revision ID: 9e6b4d2a8c71
+Revises: 8d5a3c1f7e29
+Create Date: 2026-02-23 11:48:03.275190
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = '9e6b4d2a8c71'
+down_revision = '8d5a3c1f7e29'
+branch_labels = None
+depends_on = None
+
+# columns shown in a calendar event, see app.services.ical
+SCHEDULE_COLUMNS = [
+    'subject', 'description', 'scheduled_start', 'scheduled_end', 'stage_id',
+    'team_id', 'assigned_to_id', 'equipment_id', 'request_type',
+]
+
+
+def upgrade() -> None:
+    op.add_column('ref_version', sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+    # the counter name defaults to the table; a trigger argument overrides it
+    # so one table can feed several counters
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_ref_version() RETURNS trigger LANGUAGE plpgsql AS $$
+        DECLARE
+            counter text := coalesce(TG_ARGV[0], TG_TABLE_NAME);
+        BEGIN
+            INSERT INTO ref_version (table_name, version, updated_at) VALUES (counter, 1, now())
+            ON CONFLICT (table_name) DO UPDATE
+                SET version = ref_version.version + 1, updated_at = now();
+            RETURN NULL;
+        END;
+        $$
+    """)
+    op.execute(
+        "INSERT INTO ref_version (table_name, version) VALUES ('maintenance_request_schedule', 0) "
+        "ON CONFLICT (table_name) DO NOTHING"
+    )
+    # preventive requests only: corrective work never shows in the feed
+    columns = ", ".join(SCHEDULE_COLUMNS)
+    old = ", ".join(f"OLD.{c}" for c in SCHEDULE_COLUMNS)
+    new = ", ".join(f"NEW.{c}" for c in SCHEDULE_COLUMNS)
+    op.execute(
+        "CREATE TRIGGER maintenance_request_schedule_insert AFTER INSERT ON maintenance_request "
+        "FOR EACH ROW WHEN (NEW.request_type = 'preventive') "
+        "EXECUTE FUNCTION bump_ref_version('maintenance_request_schedule')"
+    )
+    op.execute(
+        f"CREATE TRIGGER maintenance_request_schedule_update AFTER UPDATE OF {columns} "
+        "ON maintenance_request FOR EACH ROW "
+        "WHEN ((OLD.request_type = 'preventive' OR NEW.request_type = 'preventive') "
+        f"AND ({old}) IS DISTINCT FROM ({new})) "
+        "EXECUTE FUNCTION bump_ref_version('maintenance_request_schedule')"
+    )
+    op.execute(
+        "CREATE TRIGGER maintenance_request_schedule_delete AFTER DELETE ON maintenance_request "
+        "FOR EACH ROW WHEN (OLD.request_type = 'preventive') "
+        "EXECUTE FUNCTION bump_ref_version('maintenance_request_schedule')"
+    )
+    op.execute(
+        "CREATE TRIGGER maintenance_request_schedule_truncate AFTER TRUNCATE ON maintenance_request "
+        "FOR EACH STATEMENT EXECUTE FUNCTION bump_ref_version('maintenance_request_schedule')"
+    )
+
+
+def downgrade() -> None:
+    for suffix in ('insert', 'update', 'delete', 'truncate'):
+        op.execute(f"DROP TRIGGER maintenance_request_schedule_{suffix} ON maintenance_request")
+    op.execute("DELETE FROM ref_version WHERE table_name = 'maintenance_request_schedule'")
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_ref_version() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            INSERT INTO ref_version (table_name, version) VALUES (TG_TABLE_NAME, 1)
+            ON CONFLICT (table_name) DO UPDATE SET version = ref_version.version + 1;
+            RETURN NULL;
+        END;
+        $$
+    """)
+    op.drop_column('ref_version', 'updated_at')
@@ -0,0 +1,46 @@
+"""drop request cache triggers
+
+Revision ID: a4f7c2e9b816
+Revises: 9e6b4d2a8c71
+Create Date: 2026-02-24 09:12:47.603318
+
+"""
+from alembic import op
+
+
+revision = 'a4f7c2e9b816'
+down_revision = '9e6b4d2a8c71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # every request insert and open/close upserted the one
+    # ref_version('maintenance_request') row, serializing those transactions
+    # on its lock until commit; GET /equipment now expires its open-count
+    # variants by time instead
+    for suffix in ('insert', 'update', 'delete'):
+        op.execute(f"DROP TRIGGER IF EXISTS maintenance_request_ref_version_{suffix} ON maintenance_request")
+    op.execute("DELETE FROM ref_version WHERE table_name = 'maintenance_request'")
+
+
+def downgrade() -> None:
+    op.execute(
+        "INSERT INTO ref_version (table_name, version) VALUES ('maintenance_request', 0) "
+        "ON CONFLICT (table_name) DO NOTHING"
+    )
+    op.execute(
+        "CREATE TRIGGER maintenance_request_ref_version_insert AFTER INSERT OR TRUNCATE "
+        "ON maintenance_request FOR EACH STATEMENT EXECUTE FUNCTION bump_ref_version()"
+    )
+    op.execute(
+        "CREATE TRIGGER maintenance_request_ref_version_update "
+        "AFTER UPDATE OF is_open, equipment_id ON maintenance_request FOR EACH ROW "
+        "WHEN (OLD.is_open IS DISTINCT FROM NEW.is_open OR OLD.equipment_id IS DISTINCT FROM NEW.equipment_id) "
+        "EXECUTE FUNCTION bump_ref_version()"
+    )
+    op.execute(
+        "CREATE TRIGGER maintenance_request_ref_version_delete "
+        "AFTER DELETE ON maintenance_request FOR EACH ROW WHEN (OLD.is_open) "
+        "EXECUTE FUNCTION bump_ref_version()"
+    )
@@ -0,0 +1,62 @@
+"""request archive
+
+Revision ID: b7d40e2c9a16
+Revises: 3f1a9c7d2e45
+Create Date: 2026-01-09 16:40:51.302117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'b7d40e2c9a16'
+down_revision = '3f1a9c7d2e45'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('maintenance_request_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('request_type', sa.String(), nullable=False),
+    sa.Column('subject', sa.String(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('equipment_id', sa.Integer(), nullable=False),
+    sa.Column('equipment_category_id', sa.Integer(), nullable=False),
+    sa.Column('team_id', sa.Integer(), nullable=False),
+    sa.Column('requester_id', sa.Integer(), nullable=False),
+    sa.Column('assigned_to_id', sa.Integer(), nullable=True),
+    sa.Column('stage_id', sa.Integer(), nullable=False),
+    sa.Column('scheduled_start', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('scheduled_end', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('due_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('actual_duration_hours', sa.Numeric(precision=10, scale=2), nullable=True),
+    sa.Column('repaired_at', sa.DateTime(timezone=True), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+    sa.Column('archived_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('idx_req_archive_equipment', 'maintenance_request_archive', ['equipment_id', 'created_at'], unique=False)
+    op.create_index('idx_req_archive_requester', 'maintenance_request_archive', ['requester_id'], unique=False)
+    op.create_table('maintenance_request_log_archive',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('request_id', sa.Integer(), nullable=False),
+    sa.Column('changed_by', sa.Integer(), nullable=True),
+    sa.Column('field_name', sa.String(), nullable=False),
+    sa.Column('old_value', sa.Text(), nullable=True),
+    sa.Column('new_value', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(timezone=True), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_maintenance_request_log_archive_request_id'), 'maintenance_request_log_archive', ['request_id'], unique=False)
+    op.create_index('idx_req_updated', 'maintenance_request', ['updated_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_req_updated', table_name='maintenance_request')
+    op.drop_index(op.f('ix_maintenance_request_log_archive_request_id'), table_name='maintenance_request_log_archive')
+    op.drop_table('maintenance_request_log_archive')
+    op.drop_index('idx_req_archive_requester', table_name='maintenance_request_archive')
+    op.drop_index('idx_req_archive_equipment', table_name='maintenance_request_archive')
+    op.drop_table('maintenance_request_archive')
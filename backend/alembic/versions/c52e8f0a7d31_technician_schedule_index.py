@@ -0,0 +1,45 @@
+"""technician schedule index
+
+Revision ID: c52e8f0a7d31
+Revises: b7d40e2c9a16
+Create Date: 2026-01-14 11:02:37.640981
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'c52e8f0a7d31'
+down_revision = 'b7d40e2c9a16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("CREATE EXTENSION IF NOT EXISTS btree_gist")
+    # every scheduled request gets a concrete window so it can be range-indexed
+    op.execute(
+        "UPDATE maintenance_request SET scheduled_end = scheduled_start + interval '1 hour' "
+        "WHERE scheduled_start IS NOT NULL "
+        "AND (scheduled_end IS NULL OR scheduled_end < scheduled_start)"
+    )
+    op.create_check_constraint(
+        'request_schedule_check',
+        'maintenance_request',
+        'scheduled_end IS NULL OR scheduled_end >= scheduled_start',
+    )
+    op.create_index(
+        'idx_req_tech_schedule',
+        'maintenance_request',
+        ['assigned_to_id', sa.text('tstzrange(scheduled_start, scheduled_end)')],
+        unique=False,
+        postgresql_using='gist',
+        postgresql_where=sa.text(
+            'assigned_to_id IS NOT NULL AND scheduled_start IS NOT NULL AND scheduled_end IS NOT NULL'
+        ),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('idx_req_tech_schedule', table_name='maintenance_request')
+    op.drop_constraint('request_schedule_check', 'maintenance_request', type_='check')
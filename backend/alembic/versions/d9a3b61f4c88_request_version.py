@@ -0,0 +1,23 @@
+"""request version
+
+Revision ID: d9a3b61f4c88
+Revises: c52e8f0a7d31
+Create Date: 2026-01-20 14:27:10.954312
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'd9a3b61f4c88'
+down_revision = 'c52e8f0a7d31'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('maintenance_request', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('maintenance_request', 'version')
@@ -0,0 +1,37 @@
+"""request visibility indexes
+
+Revision ID: e4f7a2b9c610
+Revises: d9a3b61f4c88
+Create Date: 2026-01-23 10:12:44.581903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+revision = 'e4f7a2b9c610'
+down_revision = 'd9a3b61f4c88'
+branch_labels = None
+depends_on = None
+
+LIST_COLUMNS = ['request_type', 'subject', 'equipment_id', 'scheduled_start', 'version']
+
+
+def upgrade() -> None:
+    op.add_column('maintenance_request', sa.Column('is_open', sa.Boolean(), server_default=sa.text('true'), nullable=False))
+    op.execute(
+        "UPDATE maintenance_request r SET is_open = false "
+        "FROM request_stage s WHERE s.id = r.stage_id AND s.is_closed"
+    )
+    op.create_index('idx_req_assignee', 'maintenance_request', ['assigned_to_id'], unique=False, postgresql_include=['id', 'stage_id', 'team_id', *LIST_COLUMNS])
+    op.create_index('idx_req_requester', 'maintenance_request', ['requester_id'], unique=False, postgresql_include=['id', 'stage_id', 'team_id', 'assigned_to_id', *LIST_COLUMNS])
+    op.create_index('idx_req_team_stage_open', 'maintenance_request', ['team_id', 'stage_id'], unique=False, postgresql_include=['id', 'assigned_to_id', *LIST_COLUMNS], postgresql_where=sa.text('is_open'))
+    op.create_index('idx_req_open_assignee', 'maintenance_request', ['assigned_to_id'], unique=False, postgresql_where=sa.text('is_open AND assigned_to_id IS NOT NULL'))
+
+
+def downgrade() -> None:
+    op.drop_index('idx_req_open_assignee', table_name='maintenance_request', postgresql_where=sa.text('is_open AND assigned_to_id IS NOT NULL'))
+    op.drop_index('idx_req_team_stage_open', table_name='maintenance_request', postgresql_where=sa.text('is_open'))
+    op.drop_index('idx_req_requester', table_name='maintenance_request')
+    op.drop_index('idx_req_assignee', table_name='maintenance_request')
+    op.drop_column('maintenance_request', 'is_open')
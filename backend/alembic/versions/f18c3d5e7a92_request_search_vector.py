@@ -0,0 +1,26 @@
+"""request search vector
+
+Revision ID: f18c3d5e7a92
+Revises: e4f7a2b9c610
+Create Date: 2026-01-27 09:41:05.227614
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = 'f18c3d5e7a92'
+down_revision = 'e4f7a2b9c610'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('maintenance_request', sa.Column('search_vector', postgresql.TSVECTOR(), sa.Computed("setweight(to_tsvector('english', coalesce(subject, '')), 'A') || setweight(to_tsvector('english', coalesce(description, '')), 'B')", persisted=True), nullable=True))
+    op.create_index('idx_req_search', 'maintenance_request', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade() -> None:
+    op.drop_index('idx_req_search', table_name='maintenance_request', postgresql_using='gin')
+    op.drop_column('maintenance_request', 'search_vector')
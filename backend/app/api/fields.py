@@ -0,0 +1,31 @@
+"""Sparse fieldsets (`?fields=id,name,...`) for list endpoints.
+
+Handlers use the parsed set to decide which columns and joins to select and
+return the trimmed dicts directly, skipping the full response model.
+"""
+from typing import Iterable, Optional
+
+from fastapi import HTTPException, Query
+from fastapi.responses import JSONResponse
+
+FIELDS_QUERY = Query(
+    None,
+    description="Comma-separated subset of response fields; id is always included",
+)
+
+
+def parse_fields(fields: Optional[str], allowed: Iterable[str]) -> Optional[set[str]]:
+    """None means every field. Unknown names are a 400."""
+    if not fields:
+        return None
+    wanted = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = wanted - set(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=400, detail=f"Unknown fields: {', '.join(sorted(unknown))}"
+        )
+    return wanted | {"id"}
+
+
+def sparse_response(items: list[dict]) -> JSONResponse:
+    return JSONResponse(content=items)
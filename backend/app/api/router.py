@@ -5,6 +5,9 @@ from app.api.routes.auth import router as auth_router
 from app.api.routes.requests import router as requests_router
 from app.api.routes.equipment import router as equipment_router
 from app.api.routes.teams import router as teams_router
+from app.api.routes.reports import router as reports_router
+from app.api.routes.schedule import router as schedule_router
+from app.api.routes.locations import router as locations_router
 
 api_router = APIRouter()
 api_router.include_router(health_router, tags=["health"])
@@ -12,3 +15,6 @@ api_router.include_router(auth_router, tags=["auth"])
 api_router.include_router(requests_router, tags=["requests"])
 api_router.include_router(equipment_router, tags=["equipment"])
 api_router.include_router(teams_router, tags=["teams"])
+api_router.include_router(reports_router, tags=["reports"])
+api_router.include_router(schedule_router, tags=["schedule"])
+api_router.include_router(locations_router, tags=["locations"])
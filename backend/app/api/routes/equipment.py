@@ -1,21 +1,44 @@
+import tempfile
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from pydantic import BaseModel
-from sqlalchemy import func, or_, select
+from sqlalchemy import Integer, bindparam, func, literal_column, or_, select, union_all
 from sqlalchemy.orm import Session, aliased
 
 from app.api.deps import get_current_user, get_db
+from app.api.fields import FIELDS_QUERY, parse_fields, sparse_response
+from app.api.routes.locations import _subtree_path, in_subtree
+from app.api.routes.reports import _parse_day
 from app.db.models import (
     AppUser,
     Department,
     Equipment,
     EquipmentCategory,
+    EquipmentReliabilityDaily,
+    Location,
     MaintenanceRequest,
+    MaintenanceRequestArchive,
     MaintenanceTeam,
     RequestStage,
 )
-from app.api.routes.requests import RequestOut, _normalize_stage_name
+from app.api.routes.requests import (
+    _REQUEST_FIELDS,
+    RequestOut,
+    _fields_key,
+    _request_dict,
+    _request_select,
+    _row_names,
+    _stage_map,
+)
+from app.core.config import settings
+from app.services import equipment_import, rollups
+from app.services.refcache import KINDS, refcache
+from app.services.response_cache import response_cache
+from app.services.stages import normalize_stage_name
 
 router = APIRouter(prefix="/equipment", tags=["equipment"])
 
@@ -27,6 +50,8 @@ class EquipmentOut(BaseModel):
     department: Optional[str] = None
     owner: Optional[str] = None
     category: Optional[str] = None
+    location_id: Optional[int] = None
+    location: Optional[str] = None
     team_id: int
     team: str
     default_technician_id: Optional[int] = None
@@ -37,51 +62,77 @@ class EquipmentOut(BaseModel):
         orm_mode = True
 
 
+_EQUIPMENT_FIELDS = tuple(EquipmentOut.model_fields)
+
+
 @router.get("", response_model=list[EquipmentOut])
 def list_equipment(
     department_id: Optional[int] = Query(None),
     owner_user_id: Optional[int] = Query(None),
+    location_id: Optional[int] = Query(None, description="Equipment at this location or below it"),
     q: Optional[str] = Query(None),
+    fields: Optional[str] = FIELDS_QUERY,
     db: Session = Depends(get_db),
     current_user: AppUser = Depends(get_current_user),
 ):
-    # Count open requests (not closed)
-    open_stage_ids = select(RequestStage.id).where(RequestStage.is_closed.is_(False))
-    open_counts = (
-        select(
-            MaintenanceRequest.equipment_id.label("eq_id"),
-            func.count().label("open_count"),
-        )
-        .where(MaintenanceRequest.stage_id.in_(open_stage_ids))
-        .group_by(MaintenanceRequest.equipment_id)
-        .subquery()
-    )
+    """Served from the response cache until one of the tables the requested
+    fields come from is written, or, with maintenance_open_count, for at most
+    response_cache_open_count_seconds; every role sees the same list."""
+    wanted = parse_fields(fields, _EQUIPMENT_FIELDS)
+    need = set(_EQUIPMENT_FIELDS) if wanted is None else wanted
 
-    owner_alias = aliased(AppUser)
-    tech_alias = aliased(AppUser)
-
-    stmt = (
-        select(
-            Equipment,
-            Department.name.label("dept_name"),
-            EquipmentCategory.name.label("cat_name"),
-            MaintenanceTeam.name.label("team_name"),
-            owner_alias.full_name.label("owner_name"),
-            func.coalesce(open_counts.c.open_count, 0).label("open_count"),
-            tech_alias.full_name.label("default_tech_name"),
+    # field -> (column, join it needs); joins and the open-count aggregate are
+    # only added for the fields actually requested
+    columns = {
+        "id": (Equipment.id, None),
+        "name": (Equipment.name, None),
+        "serial_number": (Equipment.serial_number, None),
+        "team_id": (Equipment.maintenance_team_id, None),
+        "location_id": (Equipment.location_id, None),
+        "default_technician_id": (Equipment.default_technician_id, None),
+    }
+    # name fields are selected as ids and resolved through the reference cache
+    ref_fields = {
+        "department": ("department", Equipment.department_id),
+        "owner": ("user", Equipment.owner_user_id),
+        "category": ("category", Equipment.category_id),
+        "location": ("location", Equipment.location_id),
+        "team": ("team", Equipment.maintenance_team_id),
+        "default_technician": ("user", Equipment.default_technician_id),
+    }
+    for name, (_, id_column) in ref_fields.items():
+        columns[name] = (id_column, None)
+    if "maintenance_open_count" in need:
+        # Count open requests (not closed)
+        open_counts = (
+            select(
+                MaintenanceRequest.equipment_id.label("eq_id"),
+                func.count().label("open_count"),
+            )
+            .where(MaintenanceRequest.is_open)
+            .group_by(MaintenanceRequest.equipment_id)
+            .subquery()
+        )
+        columns["maintenance_open_count"] = (
+            func.coalesce(open_counts.c.open_count, 0),
+            (open_counts, open_counts.c.eq_id == Equipment.id),
         )
-        .join(EquipmentCategory, EquipmentCategory.id == Equipment.category_id)
-        .join(MaintenanceTeam, MaintenanceTeam.id == Equipment.maintenance_team_id)
-        .outerjoin(Department, Department.id == Equipment.department_id)
-        .outerjoin(owner_alias, owner_alias.id == Equipment.owner_user_id)
-        .outerjoin(tech_alias, tech_alias.id == Equipment.default_technician_id)
-        .outerjoin(open_counts, open_counts.c.eq_id == Equipment.id)
-    )
+
+    selected = [name for name in columns if name in need]
+    stmt = select(*[columns[name][0].label(name) for name in selected]).select_from(Equipment)
+    for name in selected:
+        join = columns[name][1]
+        if join:
+            stmt = stmt.outerjoin(*join)
 
     if department_id:
         stmt = stmt.where(Equipment.department_id == department_id)
     if owner_user_id:
         stmt = stmt.where(Equipment.owner_user_id == owner_user_id)
+    path = _subtree_path(db, location_id)
+    if path:
+        subtree = select(Location.id).where(in_subtree(Location.path, path))
+        stmt = stmt.where(Equipment.location_id.in_(subtree))
     if q:
         like = f"%{q.lower()}%"
         stmt = stmt.where(
@@ -91,25 +142,171 @@ def list_equipment(
             )
         )
 
-    rows = db.execute(stmt).all()
-    result: list[EquipmentOut] = []
-    for eq, dept_name, cat_name, team_name, owner_name, open_count, default_tech_name in rows:
-        result.append(
-            EquipmentOut(
-                id=eq.id,
-                name=eq.name,
-                serial_number=eq.serial_number,
-                department=dept_name,
-                owner=owner_name,
-                category=cat_name,
-                team_id=eq.maintenance_team_id,
-                team=team_name,
-                default_technician_id=eq.default_technician_id,
-                default_technician=default_tech_name,
-                maintenance_open_count=open_count or 0,
+    def build():
+        rows = [dict(r._mapping) for r in db.execute(stmt).all()]
+        for name, (kind, _) in ref_fields.items():
+            if name in need:
+                names = refcache.get_many(db, kind, (r[name] for r in rows))
+                for r in rows:
+                    r[name] = names.get(r[name])
+        if wanted is not None:
+            return rows
+        return [EquipmentOut(**r).model_dump() for r in rows]
+
+    tables = {Equipment.__tablename__}
+    tables.update(KINDS[kind][0].__tablename__ for name, (kind, _) in ref_fields.items() if name in need)
+    if location_id:
+        tables.add(Location.__tablename__)
+    params = {
+        "department_id": department_id or None,
+        "owner_user_id": owner_user_id or None,
+        "location_id": location_id,
+        "q": q.lower() if q else None,
+        "fields": sorted(wanted) if wanted is not None else None,
+    }
+    if "maintenance_open_count" in need:
+        # request writes are too frequent to bump a shared counter, so the
+        # open-count variants move to a new key every few seconds instead
+        params["open_count_epoch"] = int(
+            datetime.now(timezone.utc).timestamp() // settings.response_cache_open_count_seconds
+        )
+    return response_cache.respond(
+        db,
+        "equipment",
+        tables=tables,
+        scope="all",
+        params=params,
+        build=build,
+    )
+
+
+class ImportErrorOut(BaseModel):
+    row: int
+    serial_number: Optional[str] = None
+    error: str
+
+
+class ImportResultOut(BaseModel):
+    created: int
+    updated: int
+    failed: int
+    errors: list[ImportErrorOut]
+    errors_truncated: bool
+
+
+def _import_format(content_type: str) -> str:
+    if "csv" in content_type:
+        return "csv"
+    if "json" in content_type:
+        return "jsonl"
+    raise HTTPException(
+        status_code=415, detail="Send text/csv or application/x-ndjson, or pass ?format="
+    )
+
+
+@router.post("/import", response_model=ImportResultOut)
+async def import_equipment(
+    request: Request,
+    fmt: Optional[str] = Query(None, alias="format", pattern="^(csv|jsonl)$"),
+    create_missing: bool = Query(False, description="Create unknown categories, teams and departments"),
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
+):
+    """Upsert equipment by serial_number from a CSV or JSONL request body.
+
+    Columns / keys: serial_number, name, category, team, default_technician
+    (email or full name), department, owner (email or full name), location
+    (name, qualified by parents when it repeats: "Building A/Line 1"),
+    purchase_date, warranty_end_date (YYYY-MM-DD), warranty_vendor. Rows are
+    written in chunks of import_chunk_size; rows that fail are listed in
+    `errors` and skipped.
+    """
+    if current_user.role != "manager":
+        raise HTTPException(status_code=403, detail="Not allowed")
+    fmt = fmt or _import_format(request.headers.get("content-type", ""))
+
+    # spool the upload (to disk past a few MB) so memory stays flat for large files
+    with tempfile.SpooledTemporaryFile(max_size=8 * 1024 * 1024) as spool:
+        size = 0
+        async for chunk in request.stream():
+            size += len(chunk)
+            if size > settings.import_max_bytes:
+                raise HTTPException(status_code=413, detail="Import file too large")
+            spool.write(chunk)
+        spool.seek(0)
+        try:
+            report = await run_in_threadpool(
+                equipment_import.import_equipment, db, spool, fmt, create_missing=create_missing
             )
+        except ValueError as exc:  # unusable CSV header; raised before any chunk is written
+            raise HTTPException(status_code=400, detail=str(exc))
+
+    return ImportResultOut(
+        created=report.created,
+        updated=report.updated,
+        failed=report.failed,
+        errors=[ImportErrorOut(**e) for e in report.errors],
+        errors_truncated=report.errors_truncated,
+    )
+
+
+class WarrantyOut(BaseModel):
+    id: int
+    name: str
+    serial_number: str
+    team_id: int
+    team: str
+    warranty_end_date: str
+    warranty_vendor: Optional[str] = None
+    days_left: int
+
+
+@router.get("/warranty-expiring", response_model=list[WarrantyOut])
+def warranty_expiring(
+    days: int = Query(30, ge=1, le=365),
+    include_expired: bool = Query(False),
+    team_id: Optional[int] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
+):
+    """Equipment whose warranty ends within `days`, soonest first (idx_equipment_warranty)."""
+    # UTC day, like overdue and the rollups
+    today = datetime.now(timezone.utc).date()
+    stmt = (
+        select(
+            Equipment.id,
+            Equipment.name,
+            Equipment.serial_number,
+            Equipment.maintenance_team_id,
+            MaintenanceTeam.name,
+            Equipment.warranty_end_date,
+            Equipment.warranty_vendor,
+        )
+        .join(MaintenanceTeam, MaintenanceTeam.id == Equipment.maintenance_team_id)
+        .where(
+            Equipment.warranty_end_date.is_not(None),
+            Equipment.warranty_end_date <= today + timedelta(days=days),
         )
-    return result
+        .order_by(Equipment.warranty_end_date, Equipment.id)
+    )
+    if not include_expired:
+        stmt = stmt.where(Equipment.warranty_end_date >= today)
+    if team_id:
+        stmt = stmt.where(Equipment.maintenance_team_id == team_id)
+
+    return [
+        WarrantyOut(
+            id=eid,
+            name=name,
+            serial_number=serial,
+            team_id=tid,
+            team=team,
+            warranty_end_date=end.isoformat(),
+            warranty_vendor=vendor,
+            days_left=(end - today).days,
+        )
+        for eid, name, serial, tid, team, end, vendor in db.execute(stmt).all()
+    ]
 
 
 @router.get("/{equipment_id}")
@@ -146,48 +343,348 @@ def equipment_request_count(
     return {"equipment_id": equipment_id, "open_requests": count}
 
 
+@lru_cache(maxsize=settings.hot_statement_cache_size)
+def _equipment_requests_statement(
+    archived: bool, own_only: bool, fields: Optional[frozenset[str]]
+):
+    """Prebuilt like requests._list_statement; params equipment_id, viewer_id."""
+    model = MaintenanceRequestArchive if archived else MaintenanceRequest
+    stmt = _request_select(model, fields).where(
+        model.equipment_id == bindparam("equipment_id", type_=Integer)
+    )
+    if own_only:
+        stmt = stmt.where(model.requester_id == bindparam("viewer_id", type_=Integer))
+    if archived:
+        stmt = stmt.order_by(model.created_at.desc())
+    return stmt
+
+
 @router.get("/{equipment_id}/requests", response_model=list[RequestOut])
 def equipment_requests(
-    equipment_id: int, db: Session = Depends(get_db), current_user: AppUser = Depends(get_current_user)
+    equipment_id: int,
+    include_archived: bool = Query(False),
+    fields: Optional[str] = FIELDS_QUERY,
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
 ):
     # reuse visibility like list_requests for simplicity: manager -> all; tech -> assigned or new in their teams; user -> requester
     # Here we just return all for manager/tech; for user filter by requester
-    stmt = (
-        select(
-            MaintenanceRequest,
-            RequestStage.name.label("stage_name"),
-            Equipment.name.label("equipment_name"),
-            MaintenanceTeam.name.label("team_name"),
-            AppUser.full_name.label("assigned_name"),
+    wanted = parse_fields(fields, _REQUEST_FIELDS)
+    stages = _stage_map(db)
+    result: list[dict] = []
+    params = {"equipment_id": equipment_id, "viewer_id": current_user.id}
+    for archived in (False, True):
+        if archived and not include_archived:
+            break
+        stmt = _equipment_requests_statement(
+            archived, current_user.role == "user", _fields_key(wanted)
         )
-        .join(Equipment, Equipment.id == MaintenanceRequest.equipment_id)
-        .join(RequestStage, RequestStage.id == MaintenanceRequest.stage_id)
-        .join(MaintenanceTeam, MaintenanceTeam.id == MaintenanceRequest.team_id)
-        .outerjoin(AppUser, AppUser.id == MaintenanceRequest.assigned_to_id)
-        .where(MaintenanceRequest.equipment_id == equipment_id)
+        rows = db.execute(stmt, params).all()
+        names = _row_names(db, rows, wanted, stages)
+        result.extend(_request_dict(r, wanted, names, archived=archived) for r in rows)
+
+    if wanted is not None:
+        return sparse_response(result)
+    return [RequestOut(**r) for r in result]
+
+
+class ReliabilityDayOut(BaseModel):
+    day: str
+    failures: int
+    repairs: int
+    downtime_hours: float
+
+
+class ReliabilityOut(BaseModel):
+    equipment_id: int
+    start: str
+    end: str
+    failures: int
+    repairs: int
+    open_failures: int
+    downtime_hours: float
+    uptime_hours: float
+    availability: Optional[float] = None
+    mtbf_hours: Optional[float] = None
+    mttr_hours: Optional[float] = None
+    mean_time_to_restore_hours: Optional[float] = None
+    timeline: list[ReliabilityDayOut]
+
+
+@router.get("/{equipment_id}/reliability", response_model=ReliabilityOut)
+def equipment_reliability(
+    equipment_id: int,
+    start: Optional[str] = Query(None, description="First day (YYYY-MM-DD), UTC"),
+    end: Optional[str] = Query(None, description="Last day (YYYY-MM-DD), UTC; default today"),
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
+):
+    """MTBF/MTTR and a daily downtime timeline from corrective requests.
+
+    Reads one equipment_reliability_daily row per day in the window plus the
+    asset's currently open corrective requests, whose downtime runs to now.
+    MTBF is uptime over failures; MTTR averages actual_duration_hours and
+    mean time to restore averages raised -> repaired.
+    """
+    if db.execute(select(Equipment.id).where(Equipment.id == equipment_id)).first() is None:
+        raise HTTPException(status_code=404, detail="Not found")
+    now = datetime.now(timezone.utc)
+    end_day = _parse_day(end, "end") or now.date()
+    start_day = _parse_day(start, "start") or end_day - timedelta(
+        days=settings.reliability_default_days - 1
     )
+    days = (end_day - start_day).days + 1
+    if days < 1:
+        raise HTTPException(status_code=400, detail="start after end")
+    if days > settings.reliability_max_days:
+        raise HTTPException(
+            status_code=400, detail=f"Window is limited to {settings.reliability_max_days} days"
+        )
+
+    window_start = datetime.combine(start_day, time.min, tzinfo=timezone.utc)
+    window_end = min(now, window_start + timedelta(days=days))
+    rows = {
+        r.day: r
+        for r in db.execute(
+            select(EquipmentReliabilityDaily).where(
+                EquipmentReliabilityDaily.equipment_id == equipment_id,
+                EquipmentReliabilityDaily.day.between(start_day, end_day),
+            )
+        ).scalars()
+    }
+    open_since = db.execute(
+        select(MaintenanceRequest.created_at).where(
+            MaintenanceRequest.equipment_id == equipment_id,
+            MaintenanceRequest.is_open,
+            MaintenanceRequest.request_type == "corrective",
+            MaintenanceRequest.created_at < window_end,
+        )
+    ).scalars().all()
+    open_downtime: dict[date, float] = {}
+    for created_at in open_since:
+        for day, hours in rollups.downtime_by_day(max(created_at, window_start), window_end):
+            open_downtime[day] = open_downtime.get(day, 0.0) + float(hours)
 
-    if current_user.role == "user":
-        stmt = stmt.where(MaintenanceRequest.requester_id == current_user.id)
-
-    rows = db.execute(stmt).all()
-    result: list[RequestOut] = []
-    for req, stage_name, equipment_name, team_name, assigned_name in rows:
-        result.append(
-            RequestOut(
-                id=req.id,
-                subject=req.subject,
-                request_type=req.request_type,
-                stage=_normalize_stage_name(stage_name),
-                equipment_id=req.equipment_id,
-                equipment_name=equipment_name,
-                team_id=req.team_id,
-                team_name=team_name,
-                assigned_to_id=req.assigned_to_id,
-                assigned_to_name=assigned_name,
-                scheduled_start=req.scheduled_start.isoformat()
-                if req.scheduled_start
-                else None,
+    timeline: list[ReliabilityDayOut] = []
+    failures = repairs = repair_hours_n = 0
+    repair_hours = restore_hours = downtime = 0.0
+    for i in range(days):
+        day = start_day + timedelta(days=i)
+        r = rows.get(day)
+        # overlapping failures can add up past a full day
+        down = min(24.0, (float(r.downtime_hours) if r else 0.0) + open_downtime.get(day, 0.0))
+        timeline.append(
+            ReliabilityDayOut(
+                day=day.isoformat(),
+                failures=r.failure_count if r else 0,
+                repairs=r.repair_count if r else 0,
+                downtime_hours=round(down, 2),
             )
         )
-    return result
+        downtime += down
+        if r:
+            failures += r.failure_count
+            repairs += r.repair_count
+            repair_hours += float(r.repair_hours_sum)
+            repair_hours_n += r.repair_hours_count
+            restore_hours += float(r.restore_hours_sum)
+
+    period = max(0.0, (window_end - window_start).total_seconds() / 3600)
+    uptime = max(0.0, period - downtime)
+    return ReliabilityOut(
+        equipment_id=equipment_id,
+        start=start_day.isoformat(),
+        end=end_day.isoformat(),
+        failures=failures,
+        repairs=repairs,
+        open_failures=len(open_since),
+        downtime_hours=round(downtime, 2),
+        uptime_hours=round(uptime, 2),
+        availability=round(uptime / period, 4) if period else None,
+        mtbf_hours=round(uptime / failures, 2) if failures else None,
+        mttr_hours=round(repair_hours / repair_hours_n, 2) if repair_hours_n else None,
+        mean_time_to_restore_hours=round(restore_hours / repairs, 2) if repairs else None,
+        timeline=timeline,
+    )
+
+
+OVERVIEW_SECTIONS = {"counts", "requests"}
+
+
+class StageCountsOut(BaseModel):
+    open: int
+    closed: int
+    by_stage: dict[str, int]
+
+
+class EquipmentOverviewOut(BaseModel):
+    id: int
+    name: str
+    serial_number: str
+    status: str
+    unusable_reason: Optional[str] = None
+    department_id: Optional[int] = None
+    department: Optional[str] = None
+    owner_user_id: Optional[int] = None
+    owner: Optional[str] = None
+    category_id: int
+    category: Optional[str] = None
+    location_id: Optional[int] = None
+    location: Optional[str] = None
+    team_id: int
+    team: str
+    default_technician_id: Optional[int] = None
+    default_technician: Optional[str] = None
+    counts: Optional[StageCountsOut] = None
+    requests: Optional[list[RequestOut]] = None
+    requests_has_more: Optional[bool] = None
+
+
+@router.get("/{equipment_id}/overview", response_model=EquipmentOverviewOut)
+def equipment_overview(
+    equipment_id: int,
+    include: str = Query("counts,requests", description="Comma-separated: counts, requests"),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+    include_archived: bool = Query(False, description="Count and list archived requests too"),
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
+):
+    """Equipment with its names, per-stage request counts and a page of its
+    requests, newest first. With include_archived the counts cover archived
+    requests and the page continues into them after the live ones, as in
+    GET /equipment/{id}/requests."""
+    sections = {s.strip() for s in include.split(",") if s.strip()}
+    unknown = sections - OVERVIEW_SECTIONS
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown include: {', '.join(sorted(unknown))}")
+
+    owner_alias = aliased(AppUser)
+    tech_alias = aliased(AppUser)
+    columns = [
+        Equipment,
+        Department.name.label("dept_name"),
+        EquipmentCategory.name.label("cat_name"),
+        Location.name.label("location_name"),
+        MaintenanceTeam.name.label("team_name"),
+        owner_alias.full_name.label("owner_name"),
+        tech_alias.full_name.label("default_tech_name"),
+    ]
+    if "counts" in sections:
+        # Per-stage counts folded into the same round trip as a JSON array
+        history = select(MaintenanceRequest.stage_id).where(
+            MaintenanceRequest.equipment_id == equipment_id
+        )
+        if include_archived:
+            history = union_all(
+                history,
+                select(MaintenanceRequestArchive.stage_id).where(
+                    MaintenanceRequestArchive.equipment_id == equipment_id
+                ),
+            )
+        history = history.subquery()
+        per_stage = (
+            select(history.c.stage_id, func.count().label("n"))
+            .group_by(history.c.stage_id)
+            .subquery()
+        )
+        columns.append(
+            select(
+                func.json_agg(
+                    func.json_build_object(
+                        literal_column("'stage'"), RequestStage.name,
+                        literal_column("'closed'"), RequestStage.is_closed,
+                        literal_column("'count'"), per_stage.c.n,
+                    )
+                )
+            )
+            .select_from(per_stage.join(RequestStage, RequestStage.id == per_stage.c.stage_id))
+            .scalar_subquery()
+            .label("stage_counts")
+        )
+
+    stmt = (
+        select(*columns)
+        .join(EquipmentCategory, EquipmentCategory.id == Equipment.category_id)
+        .join(MaintenanceTeam, MaintenanceTeam.id == Equipment.maintenance_team_id)
+        .outerjoin(Department, Department.id == Equipment.department_id)
+        .outerjoin(Location, Location.id == Equipment.location_id)
+        .outerjoin(owner_alias, owner_alias.id == Equipment.owner_user_id)
+        .outerjoin(tech_alias, tech_alias.id == Equipment.default_technician_id)
+        .where(Equipment.id == equipment_id)
+    )
+    row = db.execute(stmt).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Not found")
+    eq = row.Equipment
+
+    out = EquipmentOverviewOut(
+        id=eq.id,
+        name=eq.name,
+        serial_number=eq.serial_number,
+        status=eq.status,
+        unusable_reason=eq.unusable_reason,
+        department_id=eq.department_id,
+        department=row.dept_name,
+        owner_user_id=eq.owner_user_id,
+        owner=row.owner_name,
+        category_id=eq.category_id,
+        category=row.cat_name,
+        location_id=eq.location_id,
+        location=row.location_name,
+        team_id=eq.maintenance_team_id,
+        team=row.team_name,
+        default_technician_id=eq.default_technician_id,
+        default_technician=row.default_tech_name,
+    )
+
+    if "counts" in sections:
+        counts = StageCountsOut(open=0, closed=0, by_stage={})
+        for item in row.stage_counts or []:
+            stage = normalize_stage_name(item["stage"])
+            counts.by_stage[stage] = counts.by_stage.get(stage, 0) + item["count"]
+            if item["closed"]:
+                counts.closed += item["count"]
+            else:
+                counts.open += item["count"]
+        out.counts = counts
+
+    if "requests" in sections:
+        stages = _stage_map(db)
+
+        def mine(model) -> list:
+            criteria = [model.equipment_id == equipment_id]
+            if current_user.role == "user":
+                criteria.append(model.requester_id == current_user.id)
+            return criteria
+
+        cards: list[dict] = []
+        skip, room = offset, limit + 1
+        for archived in (False, True):
+            if archived and not include_archived:
+                break
+            model = MaintenanceRequestArchive if archived else MaintenanceRequest
+            if archived and skip:
+                # the page starts past the last live request
+                live = (
+                    select(func.count())
+                    .select_from(MaintenanceRequest)
+                    .where(*mine(MaintenanceRequest))
+                )
+                skip = max(0, skip - db.execute(live).scalar_one())
+            rows = db.execute(
+                _request_select(model)
+                .where(*mine(model))
+                .order_by(model.created_at.desc(), model.id.desc())
+                .offset(skip)
+                .limit(room)
+            ).all()
+            names = _row_names(db, rows, None, stages)
+            cards.extend(_request_dict(r, None, names, archived=archived) for r in rows)
+            room -= len(rows)
+            if room <= 0:
+                break
+            skip = 0 if rows else skip
+        out.requests_has_more = len(cards) > limit
+        out.requests = [RequestOut(**c) for c in cards[:limit]]
+    return out
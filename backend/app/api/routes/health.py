@@ -1,7 +1,13 @@
+import os
+
 from fastapi import APIRouter
+from fastapi.responses import JSONResponse
 from sqlalchemy import text
 
+from app.api import warmup
+from app.core import admission
 from app.db.session import SessionLocal
+from app.services.response_cache import response_cache
 
 router = APIRouter()
 
@@ -16,3 +22,22 @@ def health_db():
     with SessionLocal() as db:
         db.execute(text("SELECT 1"))
     return {"db": "ok"}
+
+
+@router.get("/health/ready")
+def health_ready():
+    """Readiness probe: 200 once this worker's warm-up has completed."""
+    ready = warmup.warm_up()
+    return JSONResponse(warmup.status(), status_code=200 if ready else 503)
+
+
+@router.get("/health/admission")
+def health_admission():
+    """Per-process queue depth and shed counts for each admission class."""
+    return {"pid": os.getpid(), "classes": admission.stats()}
+
+
+@router.get("/health/response-cache")
+def health_response_cache():
+    """Per-process hit/miss counts of the response cache, and its size."""
+    return {"pid": os.getpid(), **response_cache.stats()}
@@ -0,0 +1,140 @@
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel
+from sqlalchemy import and_, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_user, get_db
+from app.db.models import AppUser, Location
+from app.services.refcache import refcache
+
+router = APIRouter(prefix="/locations", tags=["locations"])
+
+
+class LocationOut(BaseModel):
+    id: int
+    name: str
+    details: Optional[str] = None
+    parent_id: Optional[int] = None
+    path: str
+    depth: int
+
+
+class LocationCreate(BaseModel):
+    name: str
+    details: Optional[str] = None
+    parent_id: Optional[int] = None
+
+
+class LocationUpdate(BaseModel):
+    name: Optional[str] = None
+    details: Optional[str] = None
+    parent_id: Optional[int] = None
+    # parent_id=null in the body only detaches when this is set
+    make_root: bool = False
+
+
+def in_subtree(column, path: str):
+    """`column` lies at or below the location with materialized `path`.
+
+    Paths are ids joined by '/' in C collation, and '0' sorts right after '/',
+    so the subtree of "/3/7/" is exactly the range ["/3/7/", "/3/70"): one
+    btree range scan that also works with generic (prepared) plans, which
+    LIKE 'prefix%' does not.
+    """
+    lower, upper = subtree_bounds(path)
+    return and_(column >= lower, column < upper)
+
+
+def subtree_bounds(path: str) -> tuple[str, str]:
+    """[lower, upper) range of `in_subtree`, for statements that bind it."""
+    return path, path[:-1] + "0"
+
+
+def _subtree_path(db: Session, location_id: Optional[int]) -> Optional[str]:
+    """Path of a location filter parameter; None when not filtering."""
+    if location_id is None:
+        return None
+    path = db.execute(select(Location.path).where(Location.id == location_id)).scalar_one_or_none()
+    if path is None:
+        raise HTTPException(status_code=404, detail="Location not found")
+    return path
+
+
+def _out(loc: Location) -> LocationOut:
+    return LocationOut(
+        id=loc.id,
+        name=loc.name,
+        details=loc.details,
+        parent_id=loc.parent_id,
+        path=loc.path,
+        depth=loc.path.count("/") - 1,
+    )
+
+
+def _require_manager(user: AppUser) -> None:
+    if user.role != "manager":
+        raise HTTPException(status_code=403, detail="Not allowed")
+
+
+@router.get("", response_model=list[LocationOut])
+def list_locations(
+    root_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
+):
+    """Flat list in tree order (parents before children)."""
+    stmt = select(Location).order_by(Location.path)
+    path = _subtree_path(db, root_id)
+    if path:
+        stmt = stmt.where(in_subtree(Location.path, path))
+    return [_out(loc) for loc in db.execute(stmt).scalars().all()]
+
+
+@router.post("", response_model=LocationOut, status_code=status.HTTP_201_CREATED)
+def create_location(
+    payload: LocationCreate,
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
+):
+    _require_manager(current_user)
+    if payload.parent_id is not None and db.get(Location, payload.parent_id) is None:
+        raise HTTPException(status_code=404, detail="Parent location not found")
+    loc = Location(name=payload.name, details=payload.details, parent_id=payload.parent_id)
+    db.add(loc)
+    db.commit()
+    return _out(loc)
+
+
+@router.patch("/{location_id}", response_model=LocationOut)
+def update_location(
+    location_id: int,
+    payload: LocationUpdate,
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
+):
+    """Rename and/or move a location; its subtree moves with it."""
+    _require_manager(current_user)
+    loc = db.get(Location, location_id)
+    if not loc:
+        raise HTTPException(status_code=404, detail="Location not found")
+    if payload.name is not None:
+        loc.name = payload.name
+    if payload.details is not None:
+        loc.details = payload.details
+    if payload.make_root:
+        loc.parent_id = None
+    elif payload.parent_id is not None:
+        loc.parent_id = payload.parent_id
+    try:
+        db.commit()
+    except IntegrityError as exc:
+        # unknown parent or a move under its own subtree (location_set_path trigger)
+        db.rollback()
+        message = str(getattr(exc, "orig", exc)).splitlines()[0]
+        raise HTTPException(status_code=400, detail=message)
+    db.refresh(loc)
+    refcache.invalidate("location")
+    return _out(loc)
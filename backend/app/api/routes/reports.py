@@ -0,0 +1,238 @@
+from datetime import date, datetime, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import case, func, select
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_user, get_db
+from app.api.routes.locations import _subtree_path, in_subtree
+from app.db.models import (
+    AppUser,
+    EquipmentCategory,
+    Location,
+    MaintenanceTeam,
+    RequestStage,
+    RequestStageRollup,
+)
+from app.services.stages import normalize_stage_name
+
+router = APIRouter(prefix="/reports", tags=["reports"])
+
+
+class StageCountOut(BaseModel):
+    team_id: int
+    team: str
+    category_id: int
+    category: str
+    stage: str
+    is_closed: bool
+    count: int
+
+
+class KpiOut(BaseModel):
+    id: int
+    name: str
+    open_count: int
+    closed_count: int
+    by_stage: dict[str, int]
+    mttr_hours: Optional[float] = None
+    scrap_rate: Optional[float] = None
+    backlog_avg_age_days: Optional[float] = None
+    backlog_max_age_days: Optional[int] = None
+
+
+def _require_manager(user: AppUser) -> None:
+    if user.role != "manager":
+        raise HTTPException(status_code=403, detail="Not allowed")
+
+
+def _parse_day(value: Optional[str], field: str) -> Optional[date]:
+    if not value:
+        return None
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid {field}")
+
+
+def _filtered(
+    stmt, start: Optional[date], end: Optional[date], team_id, category_id, location_path=None
+):
+    if start:
+        stmt = stmt.where(RequestStageRollup.day >= start)
+    if end:
+        stmt = stmt.where(RequestStageRollup.day <= end)
+    if team_id:
+        stmt = stmt.where(RequestStageRollup.team_id == team_id)
+    if category_id:
+        stmt = stmt.where(RequestStageRollup.equipment_category_id == category_id)
+    if location_path:
+        subtree = select(Location.id).where(in_subtree(Location.path, location_path))
+        stmt = stmt.where(RequestStageRollup.location_id.in_(subtree))
+    return stmt
+
+
+@router.get("/stage-counts", response_model=list[StageCountOut])
+def stage_counts(
+    start: Optional[str] = Query(None, description="Created on/after (YYYY-MM-DD)"),
+    end: Optional[str] = Query(None, description="Created on/before (YYYY-MM-DD)"),
+    team_id: Optional[int] = Query(None),
+    category_id: Optional[int] = Query(None),
+    location_id: Optional[int] = Query(None, description="Requests at this location or below it"),
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
+):
+    _require_manager(current_user)
+    stmt = (
+        select(
+            RequestStageRollup.team_id,
+            MaintenanceTeam.name,
+            RequestStageRollup.equipment_category_id,
+            EquipmentCategory.name,
+            RequestStage.name,
+            RequestStage.is_closed,
+            func.sum(RequestStageRollup.request_count),
+        )
+        .join(MaintenanceTeam, MaintenanceTeam.id == RequestStageRollup.team_id)
+        .join(EquipmentCategory, EquipmentCategory.id == RequestStageRollup.equipment_category_id)
+        .join(RequestStage, RequestStage.id == RequestStageRollup.stage_id)
+        .group_by(
+            RequestStageRollup.team_id,
+            MaintenanceTeam.name,
+            RequestStageRollup.equipment_category_id,
+            EquipmentCategory.name,
+            RequestStage.name,
+            RequestStage.is_closed,
+            RequestStage.sequence,
+        )
+        .order_by(MaintenanceTeam.name, EquipmentCategory.name, RequestStage.sequence)
+    )
+    stmt = _filtered(
+        stmt,
+        _parse_day(start, "start"),
+        _parse_day(end, "end"),
+        team_id,
+        category_id,
+        _subtree_path(db, location_id),
+    )
+    return [
+        StageCountOut(
+            team_id=tid,
+            team=tname,
+            category_id=cid,
+            category=cname,
+            stage=normalize_stage_name(sname),
+            is_closed=closed,
+            count=count or 0,
+        )
+        for tid, tname, cid, cname, sname, closed, count in db.execute(stmt).all()
+    ]
+
+
+@router.get("/kpis", response_model=list[KpiOut])
+def kpis(
+    group_by: str = Query("team", pattern="^(team|category)$"),
+    start: Optional[str] = Query(None, description="Created on/after (YYYY-MM-DD)"),
+    end: Optional[str] = Query(None, description="Created on/before (YYYY-MM-DD)"),
+    team_id: Optional[int] = Query(None),
+    category_id: Optional[int] = Query(None),
+    location_id: Optional[int] = Query(None, description="Requests at this location or below it"),
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
+):
+    _require_manager(current_user)
+    if group_by == "team":
+        group_col, name_col = RequestStageRollup.team_id, MaintenanceTeam.name
+        name_join = (MaintenanceTeam, MaintenanceTeam.id == RequestStageRollup.team_id)
+    else:
+        group_col, name_col = RequestStageRollup.equipment_category_id, EquipmentCategory.name
+        name_join = (
+            EquipmentCategory,
+            EquipmentCategory.id == RequestStageRollup.equipment_category_id,
+        )
+
+    today = datetime.now(timezone.utc).date()
+    count = RequestStageRollup.request_count
+    stmt = (
+        select(
+            group_col,
+            name_col,
+            RequestStage.name,
+            RequestStage.is_closed,
+            RequestStage.is_scrap,
+            func.sum(count),
+            func.sum(RequestStageRollup.duration_hours_sum),
+            func.sum(RequestStageRollup.duration_count),
+            # sum(count * age) lets us average backlog age without per-request rows
+            func.sum(count * (today - RequestStageRollup.day)),
+            func.min(case((count > 0, RequestStageRollup.day))),
+        )
+        .join(*name_join)
+        .join(RequestStage, RequestStage.id == RequestStageRollup.stage_id)
+        .group_by(
+            group_col,
+            name_col,
+            RequestStage.name,
+            RequestStage.is_closed,
+            RequestStage.is_scrap,
+        )
+    )
+    stmt = _filtered(
+        stmt,
+        _parse_day(start, "start"),
+        _parse_day(end, "end"),
+        team_id,
+        category_id,
+        _subtree_path(db, location_id),
+    )
+
+    groups: dict[int, dict] = {}
+    for gid, gname, sname, closed, scrap, n, hours, hours_n, age_sum, oldest in db.execute(stmt).all():
+        g = groups.setdefault(
+            gid,
+            {
+                "name": gname,
+                "by_stage": {},
+                "open": 0,
+                "closed": 0,
+                "scrap": 0,
+                "hours": 0.0,
+                "hours_n": 0,
+                "age_sum": 0,
+                "oldest": None,
+            },
+        )
+        n = n or 0
+        stage = normalize_stage_name(sname)
+        g["by_stage"][stage] = g["by_stage"].get(stage, 0) + n
+        if closed:
+            g["closed"] += n
+            if scrap:
+                g["scrap"] += n
+            elif hours_n:
+                g["hours"] += float(hours or 0)
+                g["hours_n"] += hours_n
+        else:
+            g["open"] += n
+            g["age_sum"] += age_sum or 0
+            if oldest and (g["oldest"] is None or oldest < g["oldest"]):
+                g["oldest"] = oldest
+
+    result: list[KpiOut] = []
+    for gid, g in sorted(groups.items(), key=lambda item: item[1]["name"]):
+        result.append(
+            KpiOut(
+                id=gid,
+                name=g["name"],
+                open_count=g["open"],
+                closed_count=g["closed"],
+                by_stage=g["by_stage"],
+                mttr_hours=round(g["hours"] / g["hours_n"], 2) if g["hours_n"] else None,
+                scrap_rate=round(g["scrap"] / g["closed"], 4) if g["closed"] else None,
+                backlog_avg_age_days=round(g["age_sum"] / g["open"], 1) if g["open"] else None,
+                backlog_max_age_days=(today - g["oldest"]).days if g["oldest"] else None,
+            )
+        )
+    return result
@@ -1,21 +1,54 @@
+import base64
 from decimal import Decimal
-from datetime import datetime
-from typing import Optional, Sequence
+from datetime import datetime, time, timedelta, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from functools import lru_cache
+from typing import NamedTuple, Optional, Sequence
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
-from sqlalchemy import and_, or_, select
+from sqlalchemy import (
+    DateTime,
+    Integer,
+    String,
+    and_,
+    bindparam,
+    cast,
+    exists,
+    false,
+    func,
+    literal_column,
+    or_,
+    select,
+    true,
+    tuple_,
+    union_all,
+    update,
+)
 from sqlalchemy.orm import Session
+from sqlalchemy.sql.elements import BindParameter
 
 from app.api.deps import get_current_user, get_db
+from app.api.fields import FIELDS_QUERY, parse_fields, sparse_response
+from app.api.routes.locations import _subtree_path, in_subtree, subtree_bounds
 from app.db.models import (
     AppUser,
     Equipment,
     MaintenanceRequest,
+    MaintenanceRequestArchive,
     MaintenanceTeam,
     MaintenanceTeamMember,
     RequestStage,
 )
+from app.core.config import settings
+from app.core.security import create_feed_token, decode_feed_token
+from app.db.session import SessionLocal
+from app.services import ical, rollups
+from app.services.assignment import technician_load
+from app.services.refcache import refcache
+from app.services.response_cache import response_cache
+from app.services.stages import normalize_stage_name
 
 router = APIRouter(prefix="/requests", tags=["requests"])
 
@@ -42,6 +75,10 @@ class RequestOut(BaseModel):
     assigned_to_id: Optional[int] = None
     assigned_to_name: Optional[str] = None
     scheduled_start: Optional[str] = None
+    due_at: Optional[str] = None
+    overdue: Optional[bool] = None  # open and past due_at; None where not computed
+    version: Optional[int] = None
+    archived: bool = False
 
     class Config:
         orm_mode = True
@@ -53,22 +90,73 @@ class RequestCreate(BaseModel):
     request_type: str = Field(pattern="^(corrective|preventive)$")
     equipment_id: int
     scheduled_start: Optional[str] = None  # ISO date string
+    scheduled_end: Optional[str] = None  # defaults to start + schedule_default_minutes
+    due_at: Optional[str] = None  # defaults to scheduled_start
 
 
 class StageUpdate(BaseModel):
     stage: str = Field(pattern="^(new|in_progress|repaired|scrap)$")
     actual_duration_hours: Optional[Decimal] = None
+    version: Optional[int] = None  # expected current version; 409 on mismatch
 
 
 class AssignPayload(BaseModel):
     assigned_to_id: int
+    version: Optional[int] = None
+
+
+class SearchResultOut(RequestOut):
+    rank: float
+    subject_highlight: str
+    snippet: Optional[str] = None
+
+
+class RemovedOut(BaseModel):
+    id: int
+    reason: str  # archived | hidden (no longer visible to the caller)
+
+
+class ChangesOut(BaseModel):
+    changed: list[RequestOut]
+    removed: list[RemovedOut]
+    cursor: str
+    has_more: bool
+
+
+class BoardColumnOut(BaseModel):
+    stage: str
+    count: int
+    # count stopped at board_count_cap
+    count_capped: bool = False
+    cards: list[RequestOut]
+    # pass back as ?stage=&cursor= to load the next cards of this column
+    next_cursor: Optional[str] = None
+
+
+class BoardOut(BaseModel):
+    columns: list[BoardColumnOut]
+    # /requests/changes?since= cursor covering everything after this snapshot
+    changes_cursor: str
+
+
+class StageInfo(NamedTuple):
+    id: int
+    name: str
+    is_closed: bool
+    is_scrap: bool
+
+
+_stage_cache: dict[str, StageInfo] = {}
 
 
-def _stage_map(db: Session) -> dict[str, RequestStage]:
+def _stage_map(db: Session) -> dict[str, StageInfo]:
+    # Stages are effectively static reference data; load them once per process
+    if _stage_cache:
+        return _stage_cache
     rows: Sequence[RequestStage] = db.execute(select(RequestStage)).scalars().all()
     by_name: dict[str, RequestStage] = {}
     for r in rows:
-        key = _normalize_stage_name(r.name)
+        key = normalize_stage_name(r.name)
         by_name[key] = r
 
     # ensure required stages exist
@@ -85,7 +173,14 @@ def _stage_map(db: Session) -> dict[str, RequestStage]:
             db.flush()
             by_name[name] = stage
         db.commit()
-    return by_name
+    _stage_cache.update(
+        {key: StageInfo(r.id, r.name, r.is_closed, r.is_scrap) for key, r in by_name.items()}
+    )
+    return _stage_cache
+
+
+def _is_open_stage(stages: dict[str, StageInfo], stage_id: int) -> bool:
+    return not any(s.id == stage_id and s.is_closed for s in stages.values())
 
 
 def _is_team_member(db: Session, team_id: int, user_id: int) -> bool:
@@ -100,98 +195,634 @@ def _is_team_member(db: Session, team_id: int, user_id: int) -> bool:
     )
 
 
+def _is_active_member(db: Session, team_id: int, user_id: int) -> bool:
+    return _is_team_member(db, team_id, user_id) and bool(
+        db.execute(select(AppUser.is_active).where(AppUser.id == user_id)).scalar_one_or_none()
+    )
+
+
+def _overdue():
+    return and_(MaintenanceRequest.is_open, MaintenanceRequest.due_at < func.now())
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """ISO date or datetime from a payload; values without an offset are UTC."""
+    parsed = datetime.fromisoformat(value)
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _is_overdue(is_open: bool, due_at: Optional[datetime]) -> bool:
+    return bool(is_open and due_at and due_at < datetime.now(timezone.utc))
+
+
+def _visible_to(stmt, current_user: AppUser, stages: dict[str, StageInfo]):
+    """Apply the request visibility rules to a select over MaintenanceRequest.
+
+    manager -> all
+    technician -> assigned_to = self OR (stage=new and team member)
+    user -> created by self (requester)
+
+    The technician OR is split into two UNION ALL branches so each can use
+    its own index (idx_req_assignee / idx_req_team_stage_open) instead of
+    falling back to a scan. The returned statement may be a compound select.
+    """
+    if current_user.role == "manager":
+        return stmt
+    if current_user.role == "technician":
+        assigned = stmt.where(MaintenanceRequest.assigned_to_id == current_user.id)
+        pickup = stmt.where(
+            MaintenanceRequest.is_open,  # bare column so the partial index predicate matches
+            MaintenanceRequest.stage_id == stages["new"].id,
+            MaintenanceRequest.team_id.in_(
+                select(MaintenanceTeamMember.team_id).where(
+                    MaintenanceTeamMember.user_id == current_user.id
+                )
+            ),
+            # rows assigned to self already come from the first branch
+            or_(
+                MaintenanceRequest.assigned_to_id.is_(None),
+                MaintenanceRequest.assigned_to_id != current_user.id,
+            ),
+        )
+        return union_all(assigned, pickup)
+    return stmt.where(MaintenanceRequest.requester_id == current_user.id)
+
+
+_REQUEST_FIELDS = tuple(RequestOut.model_fields)
+
+
+def _request_select(model, wanted: Optional[set[str]] = None):
+    """Select only what the wanted RequestOut fields need (all when None).
+
+    `equipment_name` adds its join; team, assignee and stage names are
+    resolved from their ids by `_row_names`, and `overdue` is computed in SQL. `model` is MaintenanceRequest or
+    MaintenanceRequestArchive; archive rows keep no foreign keys, so their
+    joins are outer.
+    """
+    wanted = set(_REQUEST_FIELDS) if wanted is None else wanted
+    archived = model is MaintenanceRequestArchive
+    columns = {"id": model.id}
+    for field in (
+        "subject",
+        "request_type",
+        "equipment_id",
+        "team_id",
+        "assigned_to_id",
+        "scheduled_start",
+        "due_at",
+    ):
+        if field in wanted:
+            columns[field] = getattr(model, field)
+    if "stage" in wanted:
+        columns["stage_id"] = model.stage_id
+    if "version" in wanted and not archived:
+        columns["version"] = model.version
+    if "overdue" in wanted and not archived:
+        columns["overdue"] = _overdue()
+    if "equipment_name" in wanted:
+        columns["equipment_name"] = Equipment.name
+    if "team_name" in wanted:
+        columns["team_id"] = model.team_id
+    if "assigned_to_name" in wanted:
+        columns["assigned_to_id"] = model.assigned_to_id
+
+    stmt = select(*[col.label(name) for name, col in columns.items()]).select_from(model)
+    if "equipment_name" in wanted:
+        stmt = stmt.join(Equipment, Equipment.id == model.equipment_id, isouter=archived)
+    return stmt
+
+
+def _stage_names(stages: dict[str, StageInfo]) -> dict[int, str]:
+    return {s.id: s.name for s in stages.values()}
+
+
+def _row_names(db: Session, rows, wanted: Optional[set[str]], stages: dict[str, StageInfo]) -> dict:
+    """Stage, team and user names for a batch of `_request_select` rows."""
+    wanted = set(_REQUEST_FIELDS) if wanted is None else wanted
+    names = {"stage": _stage_names(stages), "team": {}, "user": {}}
+    if "team_name" in wanted:
+        names["team"] = refcache.get_many(db, "team", (r.team_id for r in rows))
+    if "assigned_to_name" in wanted:
+        names["user"] = refcache.get_many(db, "user", (r.assigned_to_id for r in rows))
+    return names
+
+
+def _request_dict(row, wanted: Optional[set[str]], names: dict, *, archived: bool = False) -> dict:
+    """JSON-ready RequestOut fields of a `_request_select` row; `names` comes
+    from `_row_names` over the same batch."""
+    wanted = set(_REQUEST_FIELDS) if wanted is None else wanted
+    values = row._mapping
+    out = {"id": row.id}
+    for field in wanted:
+        if field == "stage":
+            out["stage"] = normalize_stage_name(names["stage"].get(values["stage_id"], ""))
+        elif field in ("scheduled_start", "due_at"):
+            out[field] = values[field].isoformat() if values[field] else None
+        elif field == "equipment_name":
+            out[field] = values[field] or ""
+        elif field == "team_name":
+            out[field] = names["team"].get(values["team_id"], "")
+        elif field == "assigned_to_name":
+            out[field] = names["user"].get(values["assigned_to_id"])
+        elif field == "overdue":
+            out[field] = False if archived else bool(values["overdue"])
+        elif field == "version":
+            out[field] = None if archived else values["version"]
+        elif field == "archived":
+            out[field] = archived
+        elif field != "id":
+            out[field] = values[field]
+    return out
+
+
+def _list_query(
+    current_user: AppUser,
+    stages: dict[str, StageInfo],
+    *criteria,
+    fields: Optional[set[str]] = None,
+):
+    stmt = _request_select(MaintenanceRequest, fields)
+    if criteria:
+        stmt = stmt.where(*criteria)
+    return _visible_to(stmt, current_user, stages)
+
+
+class _Viewer(NamedTuple):
+    """Stands in for the current user in prebuilt statements; the id is bound
+    per call as `viewer_id`."""
+    role: str
+    id: BindParameter
+
+
+def _fields_key(wanted: Optional[set[str]]) -> Optional[frozenset[str]]:
+    return None if wanted is None else frozenset(wanted)
+
+
+# The hot list statements are built once per shape (role, fields, which
+# filters are present) with every per-call value as a bound parameter. The
+# same construct is then reused, so SQLAlchemy finds it in its compiled cache
+# without rebuilding it, and psycopg prepares it server-side per connection
+# (db_prepare_threshold). Stage ids are fixed for the life of the process.
+
+
+@lru_cache(maxsize=settings.hot_statement_cache_size)
+def _list_statement(
+    role: str,
+    new_stage: StageInfo,
+    fields: Optional[frozenset[str]],
+    open_only: Optional[bool],
+    subtree: bool,
+):
+    """GET /requests; params viewer_id, and subtree_lower/upper when `subtree`."""
+    criteria = []
+    if open_only is True:
+        criteria.append(MaintenanceRequest.is_open)  # bare column: matches the partial indexes
+    elif open_only is False:
+        criteria.append(~MaintenanceRequest.is_open)
+    if subtree:
+        criteria.append(
+            and_(
+                MaintenanceRequest.location_path >= bindparam("subtree_lower"),
+                MaintenanceRequest.location_path < bindparam("subtree_upper"),
+            )
+        )
+    viewer = _Viewer(role, bindparam("viewer_id", type_=Integer))
+    return _list_query(viewer, {"new": new_stage}, *criteria, fields=fields)
+
+
+@lru_cache(maxsize=settings.hot_statement_cache_size)
+def _calendar_statement(
+    role: str,
+    new_stage: StageInfo,
+    fields: Optional[frozenset[str]],
+    has_start: bool,
+    has_end: bool,
+    has_team: bool = False,
+):
+    """GET /requests/calendar and calendar.ics; params viewer_id, and start,
+    end and team_id when present."""
+    criteria = [MaintenanceRequest.request_type == "preventive"]
+    if has_team:
+        criteria.append(MaintenanceRequest.team_id == bindparam("team_id", type_=Integer))
+    if has_start:
+        criteria.append(
+            MaintenanceRequest.scheduled_start >= bindparam("start", type_=DateTime(timezone=True))
+        )
+    if has_end:
+        criteria.append(
+            MaintenanceRequest.scheduled_start <= bindparam("end", type_=DateTime(timezone=True))
+        )
+    viewer = _Viewer(role, bindparam("viewer_id", type_=Integer))
+    return _list_query(viewer, {"new": new_stage}, *criteria, fields=fields)
+
+
+def _request_list(
+    db: Session,
+    stmt,
+    wanted: Optional[set[str]],
+    stages: dict[str, StageInfo],
+    params: Optional[dict] = None,
+):
+    result = db.execute(stmt, params).all()
+    names = _row_names(db, result, wanted, stages)
+    rows = [_request_dict(r, wanted, names) for r in result]
+    if wanted is not None:
+        return sparse_response(rows)
+    return [RequestOut(**r) for r in rows]
+
+
+def _location_criteria(db: Session, location_id: Optional[int], open_only: Optional[bool]) -> list:
+    criteria = []
+    if open_only is True:
+        criteria.append(MaintenanceRequest.is_open)  # bare column: matches the partial indexes
+    elif open_only is False:
+        criteria.append(~MaintenanceRequest.is_open)
+    path = _subtree_path(db, location_id)
+    if path:
+        criteria.append(in_subtree(MaintenanceRequest.location_path, path))
+    return criteria
+
+
 @router.get("", response_model=list[RequestOut])
 def list_requests(
-    db: Session = Depends(get_db), current_user: AppUser = Depends(get_current_user)
+    location_id: Optional[int] = Query(None, description="Only requests at this location or below it"),
+    open: Optional[bool] = Query(None, description="true: open stages only, false: closed only"),
+    fields: Optional[str] = FIELDS_QUERY,
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
 ):
+    wanted = parse_fields(fields, _REQUEST_FIELDS)
     stages = _stage_map(db)
-    # Visibility rules:
-    # manager -> all
-    # technician -> assigned_to = self OR (stage=new and team member)
-    # user -> created by self (requester)
+    path = _subtree_path(db, location_id)
+    stmt = _list_statement(
+        current_user.role, stages["new"], _fields_key(wanted), open, path is not None
+    )
+    params = {"viewer_id": current_user.id}
+    if path:
+        params["subtree_lower"], params["subtree_upper"] = subtree_bounds(path)
+    return _request_list(db, stmt, wanted, stages, params)
+
+
+def _encode_cursor(ts: datetime, request_id: int) -> str:
+    raw = f"{ts.isoformat()}|{request_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def _decode_cursor(cursor: str) -> tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        ts, request_id = raw.rsplit("|", 1)
+        parsed = datetime.fromisoformat(ts), int(request_id)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if parsed[0].tzinfo is None:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return parsed
+
+
+def _requests_by_id(db: Session, ids: list[int]) -> list[RequestOut]:
+    if not ids:
+        return []
+    rows = db.execute(
+        _request_select(MaintenanceRequest).where(MaintenanceRequest.id.in_(ids))
+    ).all()
+    names = _row_names(db, rows, None, _stage_map(db))
+    by_id = {r.id: RequestOut(**_request_dict(r, None, names)) for r in rows}
+    return [by_id[i] for i in ids if i in by_id]
+
+
+@router.get("/changes", response_model=ChangesOut)
+def request_changes(
+    since: Optional[str] = Query(None, description="Cursor from the previous response"),
+    limit: int = Query(500, ge=1, le=2000),
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
+):
+    """Requests created or updated after `since`, plus tombstones.
+
+    Without `since` this pages through everything visible (initial sync).
+    Changes are ordered by (updated_at, id) and read via idx_req_updated;
+    archived requests, and requests the caller can no longer see, come back
+    in `removed`. Keep calling with the returned cursor while has_more.
+    """
+    stages = _stage_map(db)
+    # rows stamped later may belong to transactions that have not committed yet
+    upper = db.execute(select(func.now())).scalar_one() - timedelta(
+        seconds=settings.changes_settle_seconds
+    )
+    after = _decode_cursor(since) if since else None
+
+    def scoped(model):
+        """(rows worth reporting, rows the caller can currently see)"""
+        if current_user.role == "manager":
+            return true(), true()
+        if current_user.role == "technician":
+            my_teams = select(MaintenanceTeamMember.team_id).where(
+                MaintenanceTeamMember.user_id == current_user.id
+            )
+            visible = or_(
+                model.assigned_to_id == current_user.id,
+                and_(model.stage_id == stages["new"].id, model.team_id.in_(my_teams)),
+            )
+            return or_(model.assigned_to_id == current_user.id, model.team_id.in_(my_teams)), visible
+        mine = model.requester_id == current_user.id
+        return mine, mine
+
+    scope, visible = scoped(MaintenanceRequest)
+    live = select(
+        MaintenanceRequest.updated_at.label("ts"),
+        MaintenanceRequest.id.label("id"),
+        visible.label("visible"),
+        false().label("archived"),
+    ).where(MaintenanceRequest.updated_at < upper)
+    if after:
+        live = live.where(
+            scope, tuple_(MaintenanceRequest.updated_at, MaintenanceRequest.id) > tuple_(*after)
+        )
+        archive_scope, _ = scoped(MaintenanceRequestArchive)
+        archived = select(
+            MaintenanceRequestArchive.archived_at,
+            MaintenanceRequestArchive.id,
+            false(),
+            true(),
+        ).where(
+            archive_scope,
+            MaintenanceRequestArchive.archived_at < upper,
+            tuple_(MaintenanceRequestArchive.archived_at, MaintenanceRequestArchive.id)
+            > tuple_(*after),
+        )
+        keys = union_all(live, archived).subquery("keys")
+    else:
+        # initial sync: nothing to retract yet
+        keys = live.where(visible).subquery("keys")
+
+    rows = db.execute(
+        select(keys).order_by(keys.c.ts, keys.c.id).limit(limit + 1)
+    ).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    if has_more:
+        next_cursor = (rows[-1].ts, rows[-1].id)
+    else:
+        # everything stamped before `upper` has been handed out
+        next_cursor = max(after or (upper, 0), (upper, 0))
+
+    return ChangesOut(
+        changed=_requests_by_id(db, [r.id for r in rows if r.visible and not r.archived]),
+        removed=[
+            RemovedOut(id=r.id, reason="archived" if r.archived else "hidden")
+            for r in rows
+            if r.archived or not r.visible
+        ],
+        cursor=_encode_cursor(*next_cursor),
+        has_more=has_more,
+    )
+
+
+@router.get("/overdue", response_model=list[RequestOut])
+def overdue_requests(
+    team_id: Optional[int] = Query(None),
+    location_id: Optional[int] = Query(None, description="Only requests at this location or below it"),
+    limit: int = Query(100, ge=1, le=500),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
+):
+    """Open requests past their due_at, most overdue first (idx_req_overdue)."""
+    stages = _stage_map(db)
+    criteria = [
+        # spelled out so the planner can match the partial index predicate
+        MaintenanceRequest.is_open,
+        MaintenanceRequest.due_at.is_not(None),
+        MaintenanceRequest.due_at < func.now(),
+    ]
+    if team_id:
+        criteria.append(MaintenanceRequest.team_id == team_id)
+    criteria.extend(_location_criteria(db, location_id, None))
+    matches = _visible_to(
+        select(MaintenanceRequest.id, MaintenanceRequest.due_at).where(*criteria),
+        current_user,
+        stages,
+    ).subquery("matches")
+    ids = db.execute(
+        select(matches.c.id)
+        .order_by(matches.c.due_at, matches.c.id)
+        .limit(limit)
+        .offset(offset)
+    ).scalars().all()
+    return _requests_by_id(db, list(ids))
+
+
+def _board_statements(
+    current_user: AppUser,
+    stages: dict[str, StageInfo],
+    criteria: list,
+    *,
+    limit: int,
+    after: Optional[tuple[datetime, int]] = None,
+    stage_id: Optional[int] = None,
+):
+    """(per-stage counts, per-stage card keys) selects for GET /requests/board.
+
+    Both run once per request_stage row: the cards as a LATERAL ORDER BY
+    updated_at DESC LIMIT (a backward walk of idx_req_board), the counts as a
+    scalar subquery that stops at board_count_cap. Neither grows with the
+    number of requests in a column.
+    """
+    columns = select(RequestStage.id, RequestStage.name).order_by(RequestStage.sequence, RequestStage.id)
+    if stage_id is not None:
+        columns = columns.where(RequestStage.id == stage_id)
+
+    def in_column(*extra):
+        return _visible_to(
+            select(MaintenanceRequest.id, MaintenanceRequest.updated_at)
+            .where(MaintenanceRequest.stage_id == RequestStage.id, *criteria, *extra)
+            .correlate(RequestStage),
+            current_user,
+            stages,
+        )
+
+    capped = in_column().limit(settings.board_count_cap + 1).subquery("capped")
+    counts = columns.add_columns(
+        select(func.count()).select_from(capped).scalar_subquery().label("count")
+    )
+
+    page_criteria = []
+    if after:
+        page_criteria.append(tuple_(MaintenanceRequest.updated_at, MaintenanceRequest.id) < tuple_(*after))
+    page = in_column(*page_criteria).subquery("page")
+    cards = (
+        select(page.c.id, page.c.updated_at)
+        .order_by(page.c.updated_at.desc(), page.c.id.desc())
+        .limit(limit + 1)
+        .lateral("cards")
+    )
+    keys = columns.with_only_columns(
+        RequestStage.id.label("stage_id"), cards.c.id, cards.c.updated_at
+    ).join(cards, true())
+    return counts, keys
+
+
+@router.get("/board", response_model=BoardOut)
+def board(
+    stage: Optional[str] = Query(None, description="Only this column (with cursor: load more)"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the column being extended"),
+    limit: int = Query(settings.board_page_size, ge=1, le=100),
+    team_id: Optional[int] = Query(None),
+    location_id: Optional[int] = Query(None, description="Only requests at this location or below it"),
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
+):
+    """Kanban columns in stage sequence order: each with its request count and
+    first `limit` cards, most recently updated first.
+
+    Opening the board costs the same however many requests there are; see
+    `_board_statements`.
+    """
+    stages = _stage_map(db)
+    if cursor and not stage:
+        raise HTTPException(status_code=400, detail="cursor needs stage")
+    after = _decode_cursor(cursor) if cursor else None
+    stage_id = None
+    if stage:
+        info = stages.get(normalize_stage_name(stage))
+        if info is None:
+            raise HTTPException(status_code=400, detail="Unknown stage")
+        stage_id = info.id
+
+    criteria = []
+    if team_id:
+        criteria.append(MaintenanceRequest.team_id == team_id)
+    criteria.extend(_location_criteria(db, location_id, None))
+    counts_stmt, keys_stmt = _board_statements(
+        current_user, stages, criteria, limit=limit, after=after, stage_id=stage_id
+    )
+    # same settle window as /requests/changes, so nothing in flight is missed
+    snapshot = db.execute(select(func.now())).scalar_one() - timedelta(
+        seconds=settings.changes_settle_seconds
+    )
+    counts = db.execute(counts_stmt).all()
+    keys = db.execute(keys_stmt).all()
+
+    by_stage: dict[int, list] = {}
+    for row in keys:
+        by_stage.setdefault(row.stage_id, []).append(row)
+    requests = {r.id: r for r in _requests_by_id(db, [row.id for row in keys])}
+
+    columns = []
+    for column_stage_id, name, count in counts:
+        rows = by_stage.get(column_stage_id, [])
+        more = len(rows) > limit
+        rows = rows[:limit]
+        columns.append(
+            BoardColumnOut(
+                stage=normalize_stage_name(name),
+                count=min(count, settings.board_count_cap),
+                count_capped=count > settings.board_count_cap,
+                cards=[requests[r.id] for r in rows if r.id in requests],
+                next_cursor=_encode_cursor(rows[-1].updated_at, rows[-1].id) if more else None,
+            )
+        )
+    return BoardOut(columns=columns, changes_cursor=_encode_cursor(snapshot, 0))
+
+
+# must match the config used by the search_vector generated column
+_TS_CONFIG = literal_column("'english'")
+
+
+@router.get("/search", response_model=list[SearchResultOut])
+def search_requests(
+    q: str = Query(..., min_length=2, max_length=200),
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0, le=1000),
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
+):
+    """Ranked full-text search over subject and description.
+
+    `q` uses web-search syntax ("quoted phrases", -exclusions, OR). Matching
+    goes through the GIN index on search_vector and respects the same
+    visibility as the list; highlights are only computed for the returned page.
+    """
+    stages = _stage_map(db)
+    tsq = func.websearch_to_tsquery(_TS_CONFIG, q)
+    document = MaintenanceRequest.__table__.c.search_vector
+
+    matches = _visible_to(
+        select(
+            MaintenanceRequest.id,
+            func.ts_rank_cd(document, tsq).label("rank"),
+        ).where(document.bool_op("@@")(tsq)),
+        current_user,
+        stages,
+    ).subquery("matches")
+    page = (
+        select(matches.c.id, matches.c.rank)
+        .order_by(matches.c.rank.desc(), matches.c.id.desc())
+        .limit(limit)
+        .offset(offset)
+        .cte("page")
+    )
     stmt = (
         select(
+            page.c.rank,
             MaintenanceRequest.id,
             MaintenanceRequest.subject,
             MaintenanceRequest.request_type,
-            MaintenanceRequest.stage_id,
             MaintenanceRequest.equipment_id,
             MaintenanceRequest.team_id,
             MaintenanceRequest.assigned_to_id,
             MaintenanceRequest.scheduled_start,
+            MaintenanceRequest.due_at,
+            MaintenanceRequest.version,
+            _overdue().label("overdue"),
             Equipment.name.label("equipment_name"),
+            RequestStage.name.label("stage_name"),
+            func.ts_headline(
+                _TS_CONFIG, MaintenanceRequest.subject, tsq, literal_column("'HighlightAll=true'")
+            ).label("subject_highlight"),
+            func.ts_headline(
+                _TS_CONFIG,
+                MaintenanceRequest.description,
+                tsq,
+                literal_column("'MaxFragments=2, MinWords=5, MaxWords=20'"),
+            ).label("snippet"),
         )
+        .select_from(page)
+        .join(MaintenanceRequest, MaintenanceRequest.id == page.c.id)
         .join(Equipment, Equipment.id == MaintenanceRequest.equipment_id)
+        .join(RequestStage, RequestStage.id == MaintenanceRequest.stage_id)
+        .order_by(page.c.rank.desc(), MaintenanceRequest.id.desc())
     )
-
-    if current_user.role == "manager":
-        pass
-    elif current_user.role == "technician":
-        # Allow assigned or new for their teams
-        stmt = stmt.where(
-            or_(
-                MaintenanceRequest.assigned_to_id == current_user.id,
-                and_(
-                    MaintenanceRequest.stage_id == stages["new"].id,
-                    MaintenanceRequest.team_id.in_(
-                        select(MaintenanceTeamMember.team_id).where(
-                            MaintenanceTeamMember.user_id == current_user.id
-                        )
-                    ),
-                ),
-            )
-        )
-    else:
-        stmt = stmt.where(MaintenanceRequest.requester_id == current_user.id)
-
-    # include team name and assigned name via separate fetch
     rows = db.execute(stmt).all()
-    # map stage_id -> name
-    stages = db.execute(select(RequestStage.id, RequestStage.name)).all()
-    stage_lookup = {sid: sname for sid, sname in stages}
-
-    # Get team names
-    team_names = dict(db.execute(select(MaintenanceTeam.id, MaintenanceTeam.name)).all())
-
-    # assigned names
-    assigned_ids = [r.assigned_to_id for r in rows if r.assigned_to_id]
-    assigned_map = {}
-    if assigned_ids:
-        assigned_map = dict(
-            db.execute(
-                select(AppUser.id, AppUser.full_name).where(AppUser.id.in_(assigned_ids))
-            ).all()
-        )
+    team_names = refcache.get_many(db, "team", (r.team_id for r in rows))
+    user_names = refcache.get_many(db, "user", (r.assigned_to_id for r in rows))
 
-    result: list[RequestOut] = []
-    for r in rows:
-        result.append(
-            RequestOut(
-                id=r.id,
-                subject=r.subject,
-                request_type=r.request_type,
-                stage=_normalize_stage_name(stage_lookup.get(r.stage_id, "")),
-                equipment_id=r.equipment_id,
-                equipment_name=r.equipment_name,
-                team_id=r.team_id,
-                team_name=team_names.get(r.team_id, ""),
-                assigned_to_id=r.assigned_to_id,
-                assigned_to_name=assigned_map.get(r.assigned_to_id),
-                scheduled_start=r.scheduled_start.isoformat() if r.scheduled_start else None,
-            )
+    return [
+        SearchResultOut(
+            id=r.id,
+            subject=r.subject,
+            request_type=r.request_type,
+            stage=normalize_stage_name(r.stage_name),
+            equipment_id=r.equipment_id,
+            equipment_name=r.equipment_name,
+            team_id=r.team_id,
+            team_name=team_names.get(r.team_id, ""),
+            assigned_to_id=r.assigned_to_id,
+            assigned_to_name=user_names.get(r.assigned_to_id),
+            scheduled_start=r.scheduled_start.isoformat() if r.scheduled_start else None,
+            due_at=r.due_at.isoformat() if r.due_at else None,
+            overdue=bool(r.overdue),
+            version=r.version,
+            rank=r.rank,
+            subject_highlight=r.subject_highlight,
+            snippet=r.snippet,
         )
-    return result
-
-
-def _normalize_stage_name(name: str) -> str:
-    lowered = name.lower()
-    if lowered in ("new", "in progress", "in_progress", "in-progress"):
-        return "in_progress" if "progress" in lowered else "new"
-    if lowered.startswith("repaired"):
-        return "repaired"
-    if lowered.startswith("scrap"):
-        return "scrap"
-    return lowered
+        for r in rows
+    ]
 
 
 @router.post("", response_model=RequestOut, status_code=status.HTTP_201_CREATED)
@@ -207,18 +838,54 @@ def create_request(
     if not equipment:
         raise HTTPException(status_code=404, detail="Equipment not found")
 
-    assigned_to_id: Optional[int] = None
-    if equipment.default_technician_id and _is_team_member(
-        db, equipment.maintenance_team_id, equipment.default_technician_id
-    ):
-        assigned_to_id = equipment.default_technician_id
-
     scheduled_dt = None
+    scheduled_end_dt = None
     if payload.scheduled_start:
         try:
-            scheduled_dt = datetime.fromisoformat(payload.scheduled_start)
+            scheduled_dt = _parse_timestamp(payload.scheduled_start)
         except ValueError:
             raise HTTPException(status_code=400, detail="Invalid scheduled_start")
+        if payload.scheduled_end:
+            try:
+                scheduled_end_dt = _parse_timestamp(payload.scheduled_end)
+            except ValueError:
+                raise HTTPException(status_code=400, detail="Invalid scheduled_end")
+            if scheduled_end_dt < scheduled_dt:
+                raise HTTPException(status_code=400, detail="scheduled_end before scheduled_start")
+        else:
+            scheduled_end_dt = scheduled_dt + timedelta(minutes=settings.schedule_default_minutes)
+
+    due_dt = scheduled_dt
+    if payload.due_at:
+        try:
+            due_dt = _parse_timestamp(payload.due_at)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid due_at")
+
+    assigned_to_id: Optional[int] = None
+    if settings.assignment_strategy == "least_loaded":
+        # rosters are a per-worker snapshot that sees roster changes made in
+        # other workers only at its next reconcile: confirm the pick against
+        # the database and retry once on a fresh snapshot
+        for _ in range(2):
+            assigned_to_id = technician_load.pick(
+                db,
+                team_id=equipment.maintenance_team_id,
+                default_technician_id=equipment.default_technician_id,
+                scheduled_start=scheduled_dt,
+                scheduled_end=scheduled_end_dt,
+            )
+            if assigned_to_id is None or _is_active_member(
+                db, equipment.maintenance_team_id, assigned_to_id
+            ):
+                break
+            technician_load.reconcile(db)
+        else:
+            assigned_to_id = None
+    elif equipment.default_technician_id and _is_team_member(
+        db, equipment.maintenance_team_id, equipment.default_technician_id
+    ):
+        assigned_to_id = equipment.default_technician_id
 
     req = MaintenanceRequest(
         request_type=payload.request_type,
@@ -226,24 +893,24 @@ def create_request(
         description=payload.description,
         equipment_id=equipment.id,
         equipment_category_id=equipment.category_id,
+        location_id=equipment.location_id,
         team_id=equipment.maintenance_team_id,
         requester_id=current_user.id,
         assigned_to_id=assigned_to_id,
         stage_id=stages["new"].id,
         scheduled_start=scheduled_dt,
+        scheduled_end=scheduled_end_dt,
+        due_at=due_dt,
     )
     db.add(req)
+    db.flush()
+    rollups.record_created(db, req)
     db.commit()
     db.refresh(req)
+    technician_load.assigned(req.assigned_to_id, req.id, req.scheduled_start, req.scheduled_end)
 
-    team_name = db.execute(
-        select(MaintenanceTeam.name).where(MaintenanceTeam.id == req.team_id)
-    ).scalar_one_or_none()
-    assigned_name = None
-    if req.assigned_to_id:
-        assigned_name = db.execute(
-            select(AppUser.full_name).where(AppUser.id == req.assigned_to_id)
-        ).scalar_one_or_none()
+    team_name = refcache.get(db, "team", req.team_id)
+    assigned_name = refcache.get(db, "user", req.assigned_to_id)
 
     return RequestOut(
         id=req.id,
@@ -257,6 +924,9 @@ def create_request(
         assigned_to_id=req.assigned_to_id,
         assigned_to_name=assigned_name,
         scheduled_start=req.scheduled_start.isoformat() if req.scheduled_start else None,
+        due_at=req.due_at.isoformat() if req.due_at else None,
+        overdue=_is_overdue(req.is_open, req.due_at),
+        version=req.version,
     )
 
 
@@ -269,10 +939,14 @@ def assign_request(
 ):
     stages = _stage_map(db)
     req = db.execute(
-        select(MaintenanceRequest).where(MaintenanceRequest.id == request_id)
+        select(MaintenanceRequest)
+        .where(MaintenanceRequest.id == request_id)
+        .with_for_update()
     ).scalar_one_or_none()
     if not req:
         raise HTTPException(status_code=404, detail="Request not found")
+    if payload.version is not None and payload.version != req.version:
+        raise HTTPException(status_code=409, detail="Request was modified concurrently")
 
     # RBAC
     if current_user.role == "user":
@@ -286,30 +960,39 @@ def assign_request(
     if not _is_team_member(db, req.team_id, payload.assigned_to_id):
         raise HTTPException(status_code=400, detail="Assignee not in team")
 
+    old_assignee = req.assigned_to_id
+    was_open = _is_open_stage(stages, req.stage_id)
     req.assigned_to_id = payload.assigned_to_id
+    req.version = req.version + 1
     # move to in_progress if currently new
-    current_stage = _normalize_stage_name(
+    current_stage = normalize_stage_name(
         db.execute(select(RequestStage.name).where(RequestStage.id == req.stage_id)).scalar_one()
     )
     if current_stage == "new":
+        old_stage_id = req.stage_id
         req.stage_id = stages["in_progress"].id
+        rollups.record_transition(
+            db, req, old_stage_id=old_stage_id, old_duration=req.actual_duration_hours
+        )
 
     db.commit()
     db.refresh(req)
+    technician_load.moved(
+        req,
+        old_assignee=old_assignee,
+        was_open=was_open,
+        is_open=_is_open_stage(stages, req.stage_id),
+    )
 
     equipment = db.get(Equipment, req.equipment_id)
-    assigned_name = db.execute(
-        select(AppUser.full_name).where(AppUser.id == req.assigned_to_id)
-    ).scalar_one_or_none()
-    team_name = db.execute(
-        select(MaintenanceTeam.name).where(MaintenanceTeam.id == req.team_id)
-    ).scalar_one_or_none()
+    assigned_name = refcache.get(db, "user", req.assigned_to_id)
+    team_name = refcache.get(db, "team", req.team_id)
 
     return RequestOut(
         id=req.id,
         subject=req.subject,
         request_type=req.request_type,
-        stage=_normalize_stage_name(
+        stage=normalize_stage_name(
             db.execute(select(RequestStage.name).where(RequestStage.id == req.stage_id)).scalar_one()
         ),
         equipment_id=req.equipment_id,
@@ -319,6 +1002,9 @@ def assign_request(
         assigned_to_id=req.assigned_to_id,
         assigned_to_name=assigned_name,
         scheduled_start=req.scheduled_start.isoformat() if req.scheduled_start else None,
+        due_at=req.due_at.isoformat() if req.due_at else None,
+        overdue=_is_overdue(req.is_open, req.due_at),
+        version=req.version,
     )
 
 
@@ -329,147 +1015,405 @@ def update_stage(
     db: Session = Depends(get_db),
     current_user: AppUser = Depends(get_current_user),
 ):
-    stages = _stage_map(db)
-    req = db.execute(
-        select(MaintenanceRequest).where(MaintenanceRequest.id == request_id)
-    ).scalar_one_or_none()
-    if not req:
-        raise HTTPException(status_code=404, detail="Request not found")
-
-    target_stage = payload.stage
-
     # RBAC: manager all; tech must be member of team; user cannot change stage
-    if current_user.role == "technician" and not _is_team_member(
-        db, req.team_id, current_user.id
-    ):
-        raise HTTPException(status_code=403, detail="Not allowed")
     if current_user.role == "user":
         raise HTTPException(status_code=403, detail="Not allowed")
 
+    target_stage = payload.stage
     # repaired requires duration
     if target_stage == "repaired" and payload.actual_duration_hours is None:
         raise HTTPException(status_code=400, detail="Duration required for repaired")
 
-    # in_progress requires assignment to team member
-    if target_stage == "in_progress":
-        # Managers can move to in_progress even if they are not in the team and without auto-assign.
-        if not req.assigned_to_id and current_user.role != "manager":
-            req.assigned_to_id = current_user.id
-        if req.assigned_to_id and current_user.role != "manager":
-            if not _is_team_member(db, req.team_id, req.assigned_to_id):
-                raise HTTPException(status_code=400, detail="Assignee not in team")
+    stages = _stage_map(db)
+    is_manager = current_user.role == "manager"
 
-    # scrap side-effect
-    if target_stage == "scrap":
-        equipment = db.get(Equipment, req.equipment_id)
-        if equipment:
-            equipment.status = "unusable"
-            equipment.unusable_reason = f"Request {req.id} moved to scrap"
+    def member(user_id):
+        return exists().where(
+            MaintenanceTeamMember.team_id == MaintenanceRequest.team_id,
+            MaintenanceTeamMember.user_id == user_id,
+        )
 
-    req.stage_id = stages[target_stage].id
+    # Pre-update values, read from the same snapshot the UPDATE applies to
+    prev = (
+        select(
+            MaintenanceRequest.id,
+            MaintenanceRequest.stage_id,
+            MaintenanceRequest.assigned_to_id,
+            MaintenanceRequest.actual_duration_hours,
+            MaintenanceRequest.repaired_at,
+            MaintenanceRequest.version,
+        )
+        .where(MaintenanceRequest.id == request_id)
+        .subquery("prev")
+    )
+    values = {
+        "stage_id": stages[target_stage].id,
+        "is_open": not stages[target_stage].is_closed,
+        "version": MaintenanceRequest.version + 1,
+        "updated_at": func.now(),
+    }
+    # matching prev.version guarantees the returned "old" values belong to the
+    # row version actually updated, even if a concurrent write got there first
+    conditions = [
+        MaintenanceRequest.id == prev.c.id,
+        MaintenanceRequest.version == prev.c.version,
+    ]
+    if payload.version is not None:
+        conditions.append(MaintenanceRequest.version == payload.version)
+    if not is_manager:
+        conditions.append(member(current_user.id))
     if target_stage == "repaired":
-        req.actual_duration_hours = payload.actual_duration_hours
-    db.commit()
-    db.refresh(req)
+        values["actual_duration_hours"] = payload.actual_duration_hours
+        values["repaired_at"] = func.now()
+    if target_stage == "in_progress" and not is_manager:
+        # in_progress requires assignment to a team member; pick it up if unassigned.
+        # Managers can move to in_progress even if they are not in the team.
+        values["assigned_to_id"] = func.coalesce(MaintenanceRequest.assigned_to_id, current_user.id)
+        conditions.append(
+            or_(
+                MaintenanceRequest.assigned_to_id.is_(None),
+                member(MaintenanceRequest.assigned_to_id),
+            )
+        )
 
-    equipment = db.get(Equipment, req.equipment_id)
-    assigned_name = None
-    if req.assigned_to_id:
-        assigned_name = db.execute(
-            select(AppUser.full_name).where(AppUser.id == req.assigned_to_id)
-        ).scalar_one_or_none()
+    upd = (
+        update(MaintenanceRequest)
+        .where(*conditions)
+        .values(**values)
+        .returning(
+            MaintenanceRequest.id,
+            MaintenanceRequest.subject,
+            MaintenanceRequest.request_type,
+            MaintenanceRequest.stage_id,
+            MaintenanceRequest.equipment_id,
+            MaintenanceRequest.equipment_category_id,
+            MaintenanceRequest.team_id,
+            MaintenanceRequest.location_id,
+            MaintenanceRequest.assigned_to_id,
+            MaintenanceRequest.scheduled_start,
+            MaintenanceRequest.scheduled_end,
+            MaintenanceRequest.due_at,
+            MaintenanceRequest.is_open,
+            MaintenanceRequest.actual_duration_hours,
+            MaintenanceRequest.repaired_at,
+            MaintenanceRequest.created_at,
+            MaintenanceRequest.version,
+            prev.c.stage_id.label("old_stage_id"),
+            prev.c.assigned_to_id.label("old_assignee"),
+            prev.c.actual_duration_hours.label("old_duration"),
+            prev.c.repaired_at.label("old_repaired_at"),
+        )
+        .cte("upd")
+    )
+    stmt = (
+        select(
+            upd,
+            Equipment.name.label("equipment_name"),
+            MaintenanceTeam.name.label("team_name"),
+            AppUser.full_name.label("assigned_name"),
+        )
+        .join(Equipment, Equipment.id == upd.c.equipment_id)
+        .join(MaintenanceTeam, MaintenanceTeam.id == upd.c.team_id)
+        .outerjoin(AppUser, AppUser.id == upd.c.assigned_to_id)
+    )
+    if target_stage == "scrap":
+        # scrap side-effect, in the same statement, so the equipment is never
+        # usable after its request is scrapped
+        stmt = stmt.add_cte(
+            update(Equipment)
+            .where(Equipment.id == upd.c.equipment_id)
+            .values(
+                status="unusable",
+                unusable_reason="Request " + cast(upd.c.id, String) + " moved to scrap",
+                unusable_at=func.now(),
+            )
+            .cte("scrapped")
+        )
 
-    team_name = db.execute(
-        select(MaintenanceTeam.name).where(MaintenanceTeam.id == req.team_id)
-    ).scalar_one_or_none()
+    row = db.execute(stmt).first()
+    if row is None:
+        db.rollback()
+        _raise_stage_update_error(db, request_id, payload, current_user)
+
+    rollups.record_transition(db, row, old_stage_id=row.old_stage_id, old_duration=row.old_duration)
+    repaired_id = stages["repaired"].id
+    rollups.record_repair(
+        db,
+        row,
+        was_repaired=row.old_stage_id == repaired_id,
+        is_repaired=row.stage_id == repaired_id,
+        old_repaired_at=row.old_repaired_at,
+        old_duration=row.old_duration,
+    )
+    db.commit()
+    technician_load.moved(
+        row,
+        old_assignee=row.old_assignee,
+        was_open=_is_open_stage(stages, row.old_stage_id),
+        is_open=_is_open_stage(stages, row.stage_id),
+    )
 
     return RequestOut(
-        id=req.id,
-        subject=req.subject,
-        request_type=req.request_type,
+        id=row.id,
+        subject=row.subject,
+        request_type=row.request_type,
         stage=target_stage,
-        equipment_id=req.equipment_id,
-        equipment_name=equipment.name if equipment else "",
-        team_id=req.team_id,
-        team_name=team_name or "",
-        assigned_to_id=req.assigned_to_id,
-        assigned_to_name=assigned_name,
-        scheduled_start=req.scheduled_start.isoformat() if req.scheduled_start else None,
+        equipment_id=row.equipment_id,
+        equipment_name=row.equipment_name,
+        team_id=row.team_id,
+        team_name=row.team_name,
+        assigned_to_id=row.assigned_to_id,
+        assigned_to_name=row.assigned_name,
+        scheduled_start=row.scheduled_start.isoformat() if row.scheduled_start else None,
+        due_at=row.due_at.isoformat() if row.due_at else None,
+        overdue=_is_overdue(row.is_open, row.due_at),
+        version=row.version,
     )
 
 
+def _raise_stage_update_error(
+    db: Session, request_id: int, payload: StageUpdate, current_user: AppUser
+) -> None:
+    """Work out why the conditional UPDATE matched nothing. Only runs on failure."""
+    req = db.execute(
+        select(
+            MaintenanceRequest.team_id,
+            MaintenanceRequest.assigned_to_id,
+            MaintenanceRequest.version,
+        ).where(MaintenanceRequest.id == request_id)
+    ).first()
+    if not req:
+        raise HTTPException(status_code=404, detail="Request not found")
+    if current_user.role == "technician" and not _is_team_member(
+        db, req.team_id, current_user.id
+    ):
+        raise HTTPException(status_code=403, detail="Not allowed")
+    if payload.version is not None and req.version != payload.version:
+        raise HTTPException(status_code=409, detail="Request was modified concurrently")
+    # the only assignee condition the UPDATE applies; anything else is a lost race
+    if (
+        payload.stage == "in_progress"
+        and current_user.role != "manager"
+        and req.assigned_to_id
+        and not _is_team_member(db, req.team_id, req.assigned_to_id)
+    ):
+        raise HTTPException(status_code=400, detail="Assignee not in team")
+    raise HTTPException(status_code=409, detail="Request was modified concurrently")
+
+
 @router.get("/calendar", response_model=list[RequestOut])
 def calendar(
     start: Optional[str] = Query(None),
     end: Optional[str] = Query(None),
+    fields: Optional[str] = FIELDS_QUERY,
     db: Session = Depends(get_db),
     current_user: AppUser = Depends(get_current_user),
 ):
     try:
-        start_dt = datetime.fromisoformat(start) if start else None
-        end_dt = datetime.fromisoformat(end) if end else None
+        start_dt = _parse_timestamp(start) if start else None
+        end_dt = _parse_timestamp(end) if end else None
     except ValueError:
         raise HTTPException(status_code=400, detail="Invalid date range")
+    wanted = parse_fields(fields, _REQUEST_FIELDS)
 
     stages = _stage_map(db)
-    stmt = (
-        select(
-            MaintenanceRequest,
-            Equipment.name.label("equipment_name"),
-            MaintenanceTeam.name.label("team_name"),
-            RequestStage.name.label("stage_name"),
-            AppUser.full_name.label("assigned_name"),
-        )
-        .join(Equipment, Equipment.id == MaintenanceRequest.equipment_id)
-        .join(MaintenanceTeam, MaintenanceTeam.id == MaintenanceRequest.team_id)
-        .join(RequestStage, RequestStage.id == MaintenanceRequest.stage_id)
-        .outerjoin(AppUser, AppUser.id == MaintenanceRequest.assigned_to_id)
-        .where(MaintenanceRequest.request_type == "preventive")
+    # visibility same as list
+    stmt = _calendar_statement(
+        current_user.role, stages["new"], _fields_key(wanted), start_dt is not None, end_dt is not None
     )
+    params = {"viewer_id": current_user.id, "start": start_dt, "end": end_dt}
+    return _request_list(db, stmt, wanted, stages, params)
 
-    if start_dt:
-        stmt = stmt.where(MaintenanceRequest.scheduled_start >= start_dt)
-    if end_dt:
-        stmt = stmt.where(MaintenanceRequest.scheduled_start <= end_dt)
 
-    # visibility same as list
-    if current_user.role == "manager":
-        pass
-    elif current_user.role == "technician":
-        stmt = stmt.where(
-            or_(
-                MaintenanceRequest.assigned_to_id == current_user.id,
-                and_(
-                    MaintenanceRequest.stage_id == stages["new"].id,
-                    MaintenanceRequest.team_id.in_(
-                        select(MaintenanceTeamMember.team_id).where(
-                            MaintenanceTeamMember.user_id == current_user.id
-                        )
-                    ),
-                ),
-            )
-        )
-    else:
-        stmt = stmt.where(MaintenanceRequest.requester_id == current_user.id)
+class CalendarFeedOut(BaseModel):
+    url: str
+    team_id: Optional[int] = None
 
-    rows = db.execute(stmt).all()
-    result: list[RequestOut] = []
-    for req, equip_name, team_name, stage_name, assigned_name in rows:
-        result.append(
-            RequestOut(
-                id=req.id,
-                subject=req.subject,
-                request_type=req.request_type,
-                stage=_normalize_stage_name(stage_name),
-                equipment_id=req.equipment_id,
-                equipment_name=equip_name,
-                team_id=req.team_id,
-                team_name=team_name,
-                assigned_to_id=req.assigned_to_id,
-                assigned_to_name=assigned_name,
-                scheduled_start=req.scheduled_start.isoformat()
-                if req.scheduled_start
-                else None,
-            )
-        )
-    return result
+
+def _require_team_access(db: Session, user: AppUser, team_id: int) -> None:
+    if user.role != "manager" and not _is_team_member(db, team_id, user.id):
+        raise HTTPException(status_code=403, detail="Not allowed")
+
+
+@router.get("/calendar/feed", response_model=CalendarFeedOut)
+def calendar_feed(
+    request: Request,
+    team_id: Optional[int] = Query(None, description="A team's schedule instead of your own"),
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
+):
+    """Subscription URL of the preventive schedule for calendar apps.
+
+    The URL carries a feed token, since calendar apps cannot send an
+    Authorization header. It only opens the feed, and lasts
+    ics_token_exp_days.
+    """
+    if team_id is not None:
+        if db.get(MaintenanceTeam, team_id) is None:
+            raise HTTPException(status_code=404, detail="Team not found")
+        _require_team_access(db, current_user, team_id)
+    token = create_feed_token(user_id=current_user.id, team_id=team_id)
+    url = request.url_for("calendar_ics").include_query_params(token=token)
+    return CalendarFeedOut(url=str(url), team_id=team_id)
+
+
+def _not_modified(request: Request, etag: str, last_modified: datetime) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        tags = {t.strip().removeprefix("W/") for t in if_none_match.split(",")}
+        return etag in tags or "*" in tags
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def _ics_events(
+    key: str,
+    title: str,
+    role: str,
+    params: dict,
+    has_team: bool,
+):
+    """Calendar body, one batch of VEVENTs at a time; the complete body is
+    stored under `key` once the last batch is out. Runs in the threadpool
+    with its own session, after the request's session has closed."""
+    chunks = [ical.header(title).encode()]
+    yield chunks[-1]
+    with SessionLocal() as db:
+        stages = _stage_map(db)
+        by_id = {s.id: s for s in stages.values()}
+        stmt = _calendar_statement(role, stages["new"], frozenset({"id"}), True, True, has_team)
+        ids = sorted(db.execute(stmt, params).scalars().all())
+        for i in range(0, len(ids), settings.ics_batch_size):
+            rows = db.execute(
+                select(
+                    MaintenanceRequest.id,
+                    MaintenanceRequest.subject,
+                    MaintenanceRequest.scheduled_start,
+                    MaintenanceRequest.scheduled_end,
+                    MaintenanceRequest.updated_at,
+                    MaintenanceRequest.version,
+                    MaintenanceRequest.stage_id,
+                    MaintenanceRequest.team_id,
+                    MaintenanceRequest.assigned_to_id,
+                    Equipment.name.label("equipment_name"),
+                )
+                .join(Equipment, Equipment.id == MaintenanceRequest.equipment_id)
+                .where(MaintenanceRequest.id.in_(ids[i : i + settings.ics_batch_size]))
+                .order_by(MaintenanceRequest.id)
+            ).all()
+            teams = refcache.get_many(db, "team", (r.team_id for r in rows))
+            users = refcache.get_many(db, "user", (r.assigned_to_id for r in rows))
+            events = []
+            for r in rows:
+                stage = by_id.get(r.stage_id)
+                details = [
+                    f"Equipment: {r.equipment_name}",
+                    f"Team: {teams.get(r.team_id, '')}",
+                    f"Stage: {stage.name if stage else ''}",
+                ]
+                if r.assigned_to_id:
+                    details.append(f"Assigned to: {users.get(r.assigned_to_id, '')}")
+                events.append(
+                    ical.event(
+                        uid=f"request-{r.id}@gearguard",
+                        start=r.scheduled_start,
+                        end=r.scheduled_end,
+                        summary=r.subject,
+                        description_lines=details,
+                        updated_at=r.updated_at,
+                        sequence=r.version,
+                        cancelled=bool(stage and stage.is_scrap),
+                    )
+                )
+            if events:
+                chunks.append("".join(events).encode())
+                yield chunks[-1]
+    chunks.append(ical.footer().encode())
+    yield chunks[-1]
+    response_cache.put(key, b"".join(chunks))
+
+
+@router.get("/calendar.ics", name="calendar_ics")
+def calendar_ics(
+    request: Request,
+    token: str = Query(..., description="Feed token from /requests/calendar/feed"),
+    db: Session = Depends(get_db),
+):
+    """Preventive schedule as iCalendar, for the token's user or team.
+
+    Same requests and visibility as GET /requests/calendar, within
+    ics_past_days before and ics_future_days after today. The ETag folds
+    together the scope, the window and the write counters of every table an
+    event shows. So a poll when nothing changed costs one ref_version lookup
+    and returns 304, and a changed feed is rendered once per scope and then
+    served from the response cache.
+    """
+    try:
+        user_id, team_id = decode_feed_token(token)
+    except ValueError:
+        raise HTTPException(status_code=401, detail="Invalid feed token")
+    user = db.get(AppUser, user_id)
+    if user is None or not user.is_active:
+        raise HTTPException(status_code=401, detail="Invalid feed token")
+    if team_id is not None:
+        _require_team_access(db, user, team_id)
+
+    today = datetime.now(timezone.utc).date()
+    start = datetime.combine(today - timedelta(days=settings.ics_past_days), time.min, timezone.utc)
+    end = datetime.combine(today + timedelta(days=settings.ics_future_days), time.min, timezone.utc)
+    tables = [
+        "maintenance_request_schedule",
+        Equipment.__tablename__,
+        MaintenanceTeam.__tablename__,
+        AppUser.__tablename__,
+    ]
+    if user.role == "technician":
+        tables.append(MaintenanceTeamMember.__tablename__)
+    # managers see every request, so they share one entry per team
+    scope = "all" if user.role == "manager" else f"{user.role}:{user.id}"
+    key, changed_at = response_cache.versioned_key(
+        db,
+        "calendar.ics",
+        tables=tables,
+        scope=scope,
+        params={"team_id": team_id, "start": start.isoformat(), "end": end.isoformat()},
+    )
+    etag = f'"{key}"'
+    # the window moves at midnight even when nothing was written
+    midnight = datetime.combine(today, time.min, timezone.utc)
+    last_modified = max(changed_at or midnight, midnight)
+    headers = {
+        "ETag": etag,
+        "Last-Modified": format_datetime(last_modified, usegmt=True),
+        "Cache-Control": "private, no-cache",
+    }
+    if _not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+
+    media_type = "text/calendar; charset=utf-8"
+    body = response_cache.get("calendar.ics", key)
+    if body is not None:
+        return Response(content=body, media_type=media_type, headers={**headers, "X-Cache": "hit"})
+
+    # team and user names come from refcache, which can trail the versions
+    # in the key (and ETag) by refcache_poll_seconds; catch it up first so a
+    # rename is never stored, and then 304'd, under the new key
+    refcache.refresh(db)
+    if team_id is not None:
+        title = f"GearGuard: {refcache.get(db, 'team', team_id) or 'team'} maintenance"
+    else:
+        title = f"GearGuard: {user.full_name} maintenance"
+    params = {"viewer_id": user.id, "start": start, "end": end, "team_id": team_id}
+    return StreamingResponse(
+        _ics_events(key, title, user.role, params, team_id is not None),
+        media_type=media_type,
+        headers={**headers, "X-Cache": "miss"},
+    )
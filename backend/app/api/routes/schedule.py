@@ -0,0 +1,227 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from pydantic import BaseModel
+from sqlalchemy import and_, func, select
+from sqlalchemy.orm import Session, aliased
+
+from app.api.deps import get_current_user, get_db
+from app.core.config import settings
+from app.db.models import (
+    AppUser,
+    MaintenanceRequest,
+    MaintenanceTeamMember,
+    RequestStage,
+)
+
+router = APIRouter(prefix="/schedule", tags=["schedule"])
+
+
+class ScheduledItem(BaseModel):
+    request_id: int
+    subject: str
+    start: str
+    end: str
+
+
+class ConflictOut(BaseModel):
+    technician_id: int
+    technician_name: Optional[str] = None
+    first: ScheduledItem
+    second: ScheduledItem
+
+
+class FreeSlotOut(BaseModel):
+    technician_id: int
+    technician_name: Optional[str] = None
+    start: str
+    end: str
+
+
+def _schedule_range(model):
+    # must match the idx_req_tech_schedule expression for the GiST index to apply
+    return func.tstzrange(model.scheduled_start, model.scheduled_end)
+
+
+def _indexed(model):
+    return and_(
+        model.assigned_to_id.is_not(None),
+        model.scheduled_start.is_not(None),
+        model.scheduled_end.is_not(None),
+    )
+
+
+def _window(start: Optional[str], end: Optional[str]) -> tuple[datetime, datetime]:
+    try:
+        start_dt = datetime.fromisoformat(start) if start else datetime.now(timezone.utc)
+        end_dt = datetime.fromisoformat(end) if end else start_dt + timedelta(days=14)
+        if start_dt.tzinfo is None:
+            start_dt = start_dt.replace(tzinfo=timezone.utc)
+        if end_dt.tzinfo is None:
+            end_dt = end_dt.replace(tzinfo=timezone.utc)
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid date range")
+    if end_dt <= start_dt or end_dt - start_dt > timedelta(days=settings.schedule_max_window_days):
+        raise HTTPException(status_code=400, detail="Invalid date range")
+    return start_dt, end_dt
+
+
+def _technicians(
+    db: Session,
+    current_user: AppUser,
+    technician_id: Optional[int],
+    team_id: Optional[int],
+) -> list[int]:
+    if current_user.role == "user":
+        raise HTTPException(status_code=403, detail="Not allowed")
+    if team_id:
+        members = list(
+            db.execute(
+                select(MaintenanceTeamMember.user_id).where(MaintenanceTeamMember.team_id == team_id)
+            ).scalars()
+        )
+        if current_user.role == "technician" and current_user.id not in members:
+            raise HTTPException(status_code=403, detail="Not allowed")
+        return members
+    if technician_id:
+        if current_user.role == "technician" and technician_id != current_user.id:
+            raise HTTPException(status_code=403, detail="Not allowed")
+        return [technician_id]
+    if current_user.role == "technician":
+        return [current_user.id]
+    raise HTTPException(status_code=400, detail="technician_id or team_id required")
+
+
+def _open_stage_ids():
+    return select(RequestStage.id).where(RequestStage.is_closed.is_(False))
+
+
+@router.get("/conflicts", response_model=list[ConflictOut])
+def conflicts(
+    technician_id: Optional[int] = Query(None),
+    team_id: Optional[int] = Query(None),
+    start: Optional[str] = Query(None),
+    end: Optional[str] = Query(None),
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
+):
+    """Pairs of open requests assigned to the same technician whose windows overlap."""
+    tech_ids = _technicians(db, current_user, technician_id, team_id)
+    if not tech_ids:
+        return []
+    start_dt, end_dt = _window(start, end)
+    window = func.tstzrange(start_dt, end_dt)
+
+    a = aliased(MaintenanceRequest)
+    b = aliased(MaintenanceRequest)
+    stmt = (
+        select(
+            a.assigned_to_id,
+            AppUser.full_name,
+            a.id, a.subject, a.scheduled_start, a.scheduled_end,
+            b.id, b.subject, b.scheduled_start, b.scheduled_end,
+        )
+        .select_from(a)
+        .join(
+            b,
+            and_(
+                b.assigned_to_id == a.assigned_to_id,
+                b.id > a.id,
+                _indexed(b),
+                _schedule_range(b).op("&&")(_schedule_range(a)),
+                b.stage_id.in_(_open_stage_ids()),
+            ),
+        )
+        .outerjoin(AppUser, AppUser.id == a.assigned_to_id)
+        .where(
+            a.assigned_to_id.in_(tech_ids),
+            _indexed(a),
+            _schedule_range(a).op("&&")(window),
+            a.stage_id.in_(_open_stage_ids()),
+        )
+        .order_by(a.scheduled_start, a.id, b.id)
+    )
+
+    return [
+        ConflictOut(
+            technician_id=tech,
+            technician_name=name,
+            first=ScheduledItem(
+                request_id=a_id, subject=a_subj, start=a_start.isoformat(), end=a_end.isoformat()
+            ),
+            second=ScheduledItem(
+                request_id=b_id, subject=b_subj, start=b_start.isoformat(), end=b_end.isoformat()
+            ),
+        )
+        for tech, name, a_id, a_subj, a_start, a_end, b_id, b_subj, b_start, b_end in db.execute(
+            stmt
+        ).all()
+    ]
+
+
+@router.get("/free-slots", response_model=list[FreeSlotOut])
+def free_slots(
+    duration_minutes: int = Query(..., ge=5, le=24 * 60),
+    team_id: Optional[int] = Query(None),
+    technician_id: Optional[int] = Query(None),
+    start: Optional[str] = Query(None),
+    end: Optional[str] = Query(None),
+    limit: int = Query(5, ge=1, le=50),
+    db: Session = Depends(get_db),
+    current_user: AppUser = Depends(get_current_user),
+):
+    """Earliest gaps of at least `duration_minutes` across the team's technicians."""
+    tech_ids = _technicians(db, current_user, technician_id, team_id)
+    if not tech_ids:
+        return []
+    start_dt, end_dt = _window(start, end)
+    duration = timedelta(minutes=duration_minutes)
+
+    # Only windows that intersect [start, end) are read, via the GiST index
+    busy = db.execute(
+        select(
+            MaintenanceRequest.assigned_to_id,
+            MaintenanceRequest.scheduled_start,
+            MaintenanceRequest.scheduled_end,
+        )
+        .where(
+            MaintenanceRequest.assigned_to_id.in_(tech_ids),
+            _indexed(MaintenanceRequest),
+            _schedule_range(MaintenanceRequest).op("&&")(func.tstzrange(start_dt, end_dt)),
+            MaintenanceRequest.stage_id.in_(_open_stage_ids()),
+        )
+        .order_by(MaintenanceRequest.assigned_to_id, MaintenanceRequest.scheduled_start)
+    ).all()
+    names = dict(
+        db.execute(select(AppUser.id, AppUser.full_name).where(AppUser.id.in_(tech_ids))).all()
+    )
+
+    by_tech: dict[int, list[tuple[datetime, datetime]]] = {tid: [] for tid in tech_ids}
+    for tech, s, e in busy:
+        by_tech[tech].append((s, e))
+
+    slots: list[tuple[datetime, int, datetime]] = []
+    for tech, intervals in by_tech.items():
+        found = 0
+        cursor = start_dt
+        for s, e in intervals:  # sorted by start; sweep the merged busy time
+            if found == limit:
+                break
+            if s - cursor >= duration:
+                slots.append((cursor, tech, s))
+                found += 1
+            cursor = max(cursor, e)
+        if found < limit and end_dt - cursor >= duration:
+            slots.append((cursor, tech, end_dt))
+
+    slots.sort()
+    return [
+        FreeSlotOut(
+            technician_id=tech,
+            technician_name=names.get(tech),
+            start=slot_start.isoformat(),
+            end=slot_end.isoformat(),
+        )
+        for slot_start, tech, slot_end in slots[:limit]
+    ]
@@ -5,6 +5,8 @@ from sqlalchemy.orm import Session
 
 from app.api.deps import get_current_user, get_db
 from app.db.models import AppUser, MaintenanceTeam, MaintenanceTeamMember
+from app.services.assignment import technician_load
+from app.services.response_cache import response_cache
 
 router = APIRouter(prefix="/teams", tags=["teams"])
 
@@ -23,10 +25,9 @@ class MemberPayload(BaseModel):
     user_id: int
 
 
-@router.get("", response_model=list[TeamOut])
-def list_teams(db: Session = Depends(get_db), current_user: AppUser = Depends(get_current_user)):
+def _team_list(db: Session) -> list[dict]:
     teams = db.execute(select(MaintenanceTeam)).scalars().all()
-    result: list[TeamOut] = []
+    result: list[dict] = []
     for t in teams:
         members = db.execute(
             select(MaintenanceTeamMember.user_id, AppUser.full_name)
@@ -38,11 +39,28 @@ def list_teams(db: Session = Depends(get_db), current_user: AppUser = Depends(ge
                 id=t.id,
                 name=t.name,
                 members=[{"id": uid, "name": name} for uid, name in members],
-            )
+            ).model_dump()
         )
     return result
 
 
+@router.get("", response_model=list[TeamOut])
+def list_teams(db: Session = Depends(get_db), current_user: AppUser = Depends(get_current_user)):
+    # same for every role; cached until a team, membership or user changes
+    return response_cache.respond(
+        db,
+        "teams",
+        tables=[
+            MaintenanceTeam.__tablename__,
+            MaintenanceTeamMember.__tablename__,
+            AppUser.__tablename__,
+        ],
+        scope="all",
+        params={},
+        build=lambda: _team_list(db),
+    )
+
+
 @router.post("", response_model=TeamOut, status_code=status.HTTP_201_CREATED)
 def create_team(
     payload: TeamCreate,
@@ -83,6 +101,7 @@ def add_member(
         return
     db.add(MaintenanceTeamMember(team_id=team_id, user_id=payload.user_id))
     db.commit()
+    technician_load.invalidate()
 
 
 @router.delete("/{team_id}/members/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -103,3 +122,4 @@ def remove_member(
     if membership:
         db.delete(membership)
         db.commit()
+        technician_load.invalidate()
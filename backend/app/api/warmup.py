@@ -0,0 +1,86 @@
+"""Worker warm-up: open pool connections and prime caches before serving.
+
+Without it the first requests after a deploy pay for TCP/TLS and auth to
+Postgres, the stage map and reference-name loads, building and compiling the
+hot request statements, and preparing them server-side. `warm_up` does all of
+that once, from the app lifespan (uvicorn starts accepting connections only
+after it returns) and again from GET /health/ready if the database was not
+reachable at boot.
+
+The hot statements are run for viewer id 0, which exists for no user, so
+every run is an index probe that returns nothing.
+"""
+import logging
+import threading
+import time
+
+from sqlalchemy.orm import Session
+
+from app.api.routes.equipment import _equipment_requests_statement
+from app.api.routes.requests import _calendar_statement, _list_statement, _stage_map
+from app.core.config import settings
+from app.db.session import engine
+from app.services.refcache import refcache
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+state: dict = {"ready": False, "connections": 0, "statements": 0, "seconds": None, "error": None}
+
+
+def _hot_statements(db: Session) -> list[tuple]:
+    """(statement, params) for the shapes requests hit first."""
+    new_stage = _stage_map(db)["new"]
+    viewer = {"viewer_id": 0}
+    cases = []
+    for role in ("technician", "user"):
+        cases.append((_list_statement(role, new_stage, None, None, False), viewer))
+        cases.append((_calendar_statement(role, new_stage, None, False, False), viewer))
+    for own_only in (False, True):
+        cases.append((_equipment_requests_statement(False, own_only, None), {**viewer, "equipment_id": 0}))
+    return cases
+
+
+def warm_up() -> bool:
+    """Warm this worker once; later calls return the recorded outcome."""
+    with _lock:
+        if state["ready"]:
+            return True
+        started = time.perf_counter()
+        try:
+            wanted = min(settings.db_warm_connections, engine.pool.size())
+            # check out all of them at once so the pool really opens `wanted`
+            connections = [engine.connect() for _ in range(wanted)]
+            statements = 0
+            try:
+                # executions needed before psycopg prepares a statement
+                runs = (settings.db_prepare_threshold or 0) + 1
+                for index, conn in enumerate(connections):
+                    with Session(bind=conn) as db:
+                        if index == 0:
+                            refcache.refresh(db)
+                        cases = _hot_statements(db)
+                        for stmt, params in cases:
+                            for _ in range(runs):
+                                db.execute(stmt, params).all()
+                        statements = len(cases)
+                        db.rollback()
+            finally:
+                for conn in connections:
+                    conn.close()
+        except Exception as exc:
+            state["error"] = str(exc).splitlines()[0] if str(exc) else type(exc).__name__
+            logger.warning("warm-up failed", exc_info=True)
+            return False
+        state.update(
+            ready=True,
+            connections=wanted,
+            statements=statements,
+            seconds=round(time.perf_counter() - started, 3),
+            error=None,
+        )
+        return True
+
+
+def status() -> dict:
+    return dict(state)
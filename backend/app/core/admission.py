@@ -0,0 +1,152 @@
+"""Admission control: per-route-class concurrency limits with bounded queues.
+
+Each worker process has a small DB pool and threadpool. Without a cap, a
+burst of exports or logins takes every slot and cheap endpoints (health
+checks, card moves) time out behind them. Requests are sorted into classes
+by method and path; each class admits at most `limit` requests at once and
+lets at most `queue` more wait, each for up to `timeout` seconds:
+
+* queue full -> 429 immediately, since this class already has its share
+* waited past the timeout -> 503, since the server is saturated
+
+Both carry Retry-After. Unclassified requests are never held back. Counters
+are per process and served by GET /health/admission.
+"""
+import asyncio
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.core.config import settings
+
+WRITE_METHODS = {"POST", "PUT", "PATCH", "DELETE"}
+
+# (class, methods, path pattern), first match wins
+RULES: list[tuple[str, set[str], re.Pattern]] = [
+    ("auth", {"POST"}, re.compile(r"^/auth/login$")),
+    ("heavy", {"POST"}, re.compile(r"^/equipment/import$")),
+    (
+        "heavy",
+        {"GET"},
+        re.compile(
+            r"^/(requests(/calendar|/search|/overdue)?"
+            r"|equipment(/\d+/requests)?"
+            r"|reports/.*|schedule/.*)$"
+        ),
+    ),
+    ("writes", WRITE_METHODS, re.compile(r"^/")),
+]
+
+
+@dataclass
+class Gate:
+    name: str
+    limit: int
+    queue: int
+    timeout: float
+    active: int = 0
+    waiting: int = 0
+    admitted: int = 0
+    rejected: int = 0
+    timed_out: int = 0
+    _slots: asyncio.Semaphore = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._slots = asyncio.Semaphore(self.limit)
+
+    async def acquire(self) -> Optional[int]:
+        """None once admitted, otherwise the status code to shed with."""
+        if not self._slots.locked():
+            await self._slots.acquire()  # a slot is free; returns without waiting
+        elif self.waiting >= self.queue:
+            self.rejected += 1
+            return 429
+        else:
+            self.waiting += 1
+            try:
+                await asyncio.wait_for(self._slots.acquire(), self.timeout)
+            except asyncio.TimeoutError:
+                self.timed_out += 1
+                return 503
+            finally:
+                self.waiting -= 1
+        self.active += 1
+        self.admitted += 1
+        return None
+
+    def release(self) -> None:
+        self.active -= 1
+        self._slots.release()
+
+    def snapshot(self) -> dict:
+        return {
+            "limit": self.limit,
+            "queue": self.queue,
+            "timeout_seconds": self.timeout,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "timed_out": self.timed_out,
+        }
+
+
+def _gates() -> dict[str, Gate]:
+    configured = {
+        "auth": (settings.admission_auth_limit, settings.admission_auth_queue, settings.admission_auth_timeout_seconds),
+        "heavy": (settings.admission_heavy_limit, settings.admission_heavy_queue, settings.admission_heavy_timeout_seconds),
+        "writes": (settings.admission_writes_limit, settings.admission_writes_queue, settings.admission_writes_timeout_seconds),
+    }
+    # a limit of 0 leaves the class unrestricted
+    return {
+        name: Gate(name, limit, queue, timeout)
+        for name, (limit, queue, timeout) in configured.items()
+        if limit > 0
+    }
+
+
+gates: dict[str, Gate] = _gates()
+
+
+def classify(method: str, path: str) -> Optional[str]:
+    for name, methods, pattern in RULES:
+        if method in methods and pattern.match(path):
+            return name
+    return None
+
+
+def stats() -> dict:
+    return {name: gate.snapshot() for name, gate in gates.items()}
+
+
+class AdmissionMiddleware:
+    def __init__(self, app: ASGIApp, *, enabled: bool = True) -> None:
+        self.app = app
+        self.enabled = enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if not self.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        gate = gates.get(classify(scope["method"], scope["path"]) or "")
+        if gate is None:
+            await self.app(scope, receive, send)
+            return
+
+        status = await gate.acquire()
+        if status is not None:
+            detail = "Too many concurrent requests" if status == 429 else "Server busy"
+            response = JSONResponse(
+                {"detail": detail},
+                status_code=status,
+                headers={"Retry-After": str(settings.admission_retry_after_seconds)},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            gate.release()
@@ -0,0 +1,286 @@
+"""Negotiated response compression with an ETag-keyed cache of compressed bodies.
+
+Buffered responses get a weak ETag computed over the uncompressed body. A
+route's own strong ETag is weakened whenever the body is sent encoded, since
+it would otherwise label several byte representations. A matching
+If-None-Match (weak comparison) short-circuits to 304, and the compressed bytes for a
+given (ETag, encoding) pair are kept in a bounded LRU so an unchanged payload
+is never recompressed. Streaming responses are compressed chunk by chunk.
+"""
+import gzip
+import hashlib
+import zlib
+from collections import OrderedDict
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:  # optional codecs; gzip is always available
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "text/",
+)
+
+
+class _GzipStream:
+    def __init__(self) -> None:
+        self._obj = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def send(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+class _BrotliStream:
+    def __init__(self) -> None:
+        self._obj = brotli.Compressor(quality=5)
+
+    def send(self, data: bytes) -> bytes:
+        return self._obj.process(data) + self._obj.flush()
+
+    def finish(self) -> bytes:
+        return self._obj.finish()
+
+
+class _ZstdStream:
+    def __init__(self) -> None:
+        self._obj = zstandard.ZstdCompressor(level=3).compressobj()
+
+    def send(self, data: bytes) -> bytes:
+        return self._obj.compress(data) + self._obj.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._obj.flush()
+
+
+def _available_codecs() -> dict:
+    codecs = {"gzip": (lambda body: gzip.compress(body, compresslevel=6, mtime=0), _GzipStream)}
+    if brotli is not None:
+        codecs["br"] = (lambda body: brotli.compress(body, quality=5), _BrotliStream)
+    if zstandard is not None:
+        codecs["zstd"] = (lambda body: zstandard.ZstdCompressor(level=3).compress(body), _ZstdStream)
+    return codecs
+
+
+def negotiate(accept_encoding: str, preference: list[str]) -> Optional[str]:
+    """Pick the first server-preferred encoding the client accepts with q > 0."""
+    accepted: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+    for enc in preference:
+        q = accepted.get(enc, accepted.get("*", 0.0))
+        if q > 0:
+            return enc
+    return None
+
+
+def _etag_matches(if_none_match: str, etag: str) -> bool:
+    def opaque(tag: str) -> str:
+        tag = tag.strip()
+        return tag[2:] if tag.startswith("W/") else tag
+
+    target = opaque(etag)
+    return any(t.strip() == "*" or opaque(t) == target for t in if_none_match.split(","))
+
+
+def _weak(etag: str) -> str:
+    """A strong ETag names one byte representation; once we re-encode the
+    body the route's validator may only describe it weakly."""
+    return etag if etag.startswith("W/") else f"W/{etag}"
+
+
+class CompressedBodyCache:
+    """Byte-bounded LRU of compressed bodies keyed by (etag, encoding)."""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self._size = 0
+        self._items: "OrderedDict[tuple[str, str], bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: tuple[str, str]) -> Optional[bytes]:
+        body = self._items.get(key)
+        if body is None:
+            self.misses += 1
+            return None
+        self._items.move_to_end(key)
+        self.hits += 1
+        return body
+
+    def put(self, key: tuple[str, str], body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        old = self._items.pop(key, None)
+        if old is not None:
+            self._size -= len(old)
+        self._items[key] = body
+        self._size += len(body)
+        while self._size > self.max_bytes:
+            _, evicted = self._items.popitem(last=False)
+            self._size -= len(evicted)
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        *,
+        minimum_size: int = 1024,
+        encodings: str = "zstd,br,gzip",
+        streaming: bool = True,
+        cache_bytes: int = 32 * 1024 * 1024,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.streaming = streaming
+        self.codecs = _available_codecs()
+        self.preference = [
+            e.strip() for e in encodings.split(",") if e.strip() in self.codecs
+        ]
+        self.cache = CompressedBodyCache(cache_bytes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] not in ("GET", "POST", "PATCH"):
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        responder = _Responder(
+            self,
+            send,
+            encoding=negotiate(headers.get("accept-encoding", ""), self.preference),
+            if_none_match=headers.get("if-none-match") if scope["method"] == "GET" else None,
+        )
+        await self.app(scope, receive, responder)
+
+
+class _Responder:
+    def __init__(
+        self,
+        owner: CompressionMiddleware,
+        send: Send,
+        *,
+        encoding: Optional[str],
+        if_none_match: Optional[str],
+    ) -> None:
+        self.owner = owner
+        self.send = send
+        self.encoding = encoding
+        self.if_none_match = if_none_match
+        self.start: Optional[Message] = None
+        self.eligible = False
+        self.stream = None
+        self.started = False
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            headers = Headers(raw=message["headers"])
+            content_type = headers.get("content-type", "")
+            self.eligible = (
+                "content-encoding" not in headers
+                and "no-transform" not in headers.get("cache-control", "")
+                and content_type.startswith(COMPRESSIBLE_TYPES)
+            )
+            return
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        if self.started:
+            await self._send_chunk(message)
+            return
+
+        self.started = True
+        body: bytes = message.get("body", b"")
+        if message.get("more_body", False):
+            await self._begin_stream(message)
+        else:
+            await self._send_buffered(body)
+
+    async def _send_buffered(self, body: bytes) -> None:
+        start = self.start
+        headers = MutableHeaders(raw=start["headers"])
+        etag = None
+        if self.eligible:
+            headers.add_vary_header("Accept-Encoding")
+        if start["status"] == 200 and self.eligible:
+            etag = headers.get("etag")
+            if etag is None:
+                etag = f'W/"{hashlib.sha1(body).hexdigest()}"'
+                headers["ETag"] = etag
+            if self.if_none_match and _etag_matches(self.if_none_match, etag):
+                for name in ("content-length", "content-type"):
+                    if name in headers:
+                        del headers[name]
+                start["status"] = 304
+                await self.send(start)
+                await self.send({"type": "http.response.body", "body": b""})
+                return
+
+        if self.eligible and self.encoding and len(body) >= self.owner.minimum_size:
+            compressed = None
+            key = (etag, self.encoding) if etag else None
+            if key:
+                compressed = self.owner.cache.get(key)
+            if compressed is None:
+                compressed = self.owner.codecs[self.encoding][0](body)
+                if key:
+                    self.owner.cache.put(key, compressed)
+            if len(compressed) < len(body):
+                body = compressed
+                headers["Content-Encoding"] = self.encoding
+                headers["Content-Length"] = str(len(body))
+                headers["ETag"] = _weak(etag)
+
+        await self.send(start)
+        await self.send({"type": "http.response.body", "body": body})
+
+    async def _begin_stream(self, message: Message) -> None:
+        start = self.start
+        if self.eligible and self.encoding and self.owner.streaming:
+            headers = MutableHeaders(raw=start["headers"])
+            headers["Content-Encoding"] = self.encoding
+            headers.add_vary_header("Accept-Encoding")
+            if "content-length" in headers:
+                del headers["content-length"]
+            if "etag" in headers:
+                headers["ETag"] = _weak(headers["etag"])
+            self.stream = self.owner.codecs[self.encoding][1]()
+        await self.send(start)
+        await self._send_chunk(message)
+
+    async def _send_chunk(self, message: Message) -> None:
+        if self.stream is None:
+            await self.send(message)
+            return
+        more_body = message.get("more_body", False)
+        data = self.stream.send(message.get("body", b""))
+        if not more_body:
+            data += self.stream.finish()
+        await self.send({"type": "http.response.body", "body": data, "more_body": more_body})
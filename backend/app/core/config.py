@@ -1,3 +1,6 @@
+import os
+from typing import Optional
+
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -5,6 +8,34 @@ class Settings(BaseSettings):
     model_config = SettingsConfigDict(extra="ignore")
 
     app_name: str = "GearGuard API"
+    app_env: str = "development"  # development | production
+
+    # Production server (gunicorn + uvicorn workers, see gunicorn.conf.py)
+    web_concurrency: int = 0  # 0 = derive from CPU cores
+    max_requests: int = 1000
+    max_requests_jitter: int = 100
+    graceful_timeout: int = 30
+
+    # Per-worker pools are capped so all workers together fit in
+    # db_max_connections minus connections kept free for migrations/psql and
+    # the pools of the background processes (job worker, archiver), which
+    # run with DB_POOL_ROLE=background and a fixed db_background_pool_size.
+    db_pool_size: int = 5
+    db_max_overflow: int = 10
+    db_max_connections: int = 100
+    db_reserved_connections: int = 10
+    db_pool_role: str = "web"  # web | background
+    db_background_processes: int = 2
+    db_background_pool_size: int = 2
+
+    # Startup warm-up (app.api.warmup): pool connections opened and primed
+    # before the worker reports ready (0 = skip). psycopg prepares a statement
+    # server-side once a connection has run it this many times; None turns
+    # that off (needed behind a transaction-pooling pgbouncer).
+    db_warm_connections: int = 5
+    db_prepare_threshold: Optional[int] = 1
+    # distinct shapes of the prebuilt hot request statements kept per worker
+    hot_statement_cache_size: int = 256
 
     postgres_db: str = "gearguard"
     postgres_user: str = "gearguard"
@@ -18,5 +49,120 @@ class Settings(BaseSettings):
 
     cors_origins: str = "http://localhost:3000,http://frontend:3000"
 
+    # Response compression (see app.core.compression)
+    compression_minimum_size: int = 1024
+    compression_encodings: str = "zstd,br,gzip"
+    compression_streaming: bool = True
+    compression_cache_bytes: int = 32 * 1024 * 1024
+
+    # Technician auto-assignment: least_loaded | default (equipment's default technician)
+    assignment_strategy: str = "least_loaded"
+    assignment_reconcile_seconds: int = 60
+    assignment_overlap_weight: float = 2.0
+
+    # Scheduling: requests without an explicit end occupy this long
+    schedule_default_minutes: int = 60
+    schedule_max_window_days: int = 90
+
+    # Closed requests older than this move to maintenance_request_archive
+    archive_retention_days: int = 365
+    archive_batch_size: int = 500
+    archive_interval_seconds: int = 3600
+
+    # /requests/changes only hands out rows older than this, so writes from
+    # transactions still in flight (updated_at = their start time) are not skipped
+    changes_settle_seconds: int = 2
+
+    # Background jobs (app.scripts.job_worker); retry delay doubles per attempt
+    job_poll_seconds: float = 1.0
+    job_batch_size: int = 20
+    job_max_attempts: int = 5
+    job_backoff_seconds: int = 10
+    job_backoff_max_seconds: int = 3600
+    job_lock_timeout_seconds: int = 300
+
+    # POST /equipment/import
+    import_chunk_size: int = 1000
+    import_max_bytes: int = 200 * 1024 * 1024
+    import_max_errors: int = 1000
+
+    # Admission control (app.core.admission): concurrent requests per route
+    # class and how many may queue, and for how long, before being shed.
+    # Keep the sum of limits within db_pool_size + db_max_overflow; 0 = no limit.
+    admission_enabled: bool = True
+    admission_retry_after_seconds: int = 2
+    admission_auth_limit: int = 4
+    admission_auth_queue: int = 16
+    admission_auth_timeout_seconds: float = 3.0
+    admission_heavy_limit: int = 4
+    admission_heavy_queue: int = 8
+    admission_heavy_timeout_seconds: float = 5.0
+    admission_writes_limit: int = 6
+    admission_writes_queue: int = 32
+    admission_writes_timeout_seconds: float = 5.0
+
+    # GET /requests/calendar.ics: event window around today, lifetime of the
+    # feed tokens in subscription URLs, and requests rendered per batch
+    ics_past_days: int = 30
+    ics_future_days: int = 365
+    ics_token_exp_days: int = 365
+    ics_batch_size: int = 500
+
+    # GET /requests/board: default cards per column, and where column counts
+    # stop counting (reported as count_capped)
+    board_page_size: int = 25
+    board_count_cap: int = 10000
+
+    # Idempotency-Key support on writes (app.core.idempotency): how long
+    # outcomes are kept, how long a duplicate waits for the original to
+    # finish, when an unfinished claim is considered abandoned, and the
+    # largest response body worth storing
+    idempotency_ttl_seconds: int = 24 * 3600
+    idempotency_wait_seconds: float = 10.0
+    idempotency_lock_seconds: int = 120
+    idempotency_max_response_bytes: int = 256 * 1024
+
+    # GET /equipment/{id}/reliability: default and maximum window in days
+    reliability_default_days: int = 90
+    reliability_max_days: int = 731
+
+    # Response cache for GET /equipment and GET /teams (app.services.response_cache):
+    # "memory" (per worker), "file" (one file per entry in response_cache_dir;
+    # on a tmpfs such as /dev/shm the workers of a host share it) or "off"
+    response_cache_backend: str = "memory"
+    response_cache_dir: str = "/dev/shm/gearguard-response-cache"
+    response_cache_max_entries: int = 512
+    response_cache_max_bytes: int = 64 * 1024 * 1024
+    # GET /equipment with maintenance_open_count: request writes bump no
+    # counter, so these entries live at most this long
+    response_cache_open_count_seconds: float = 15.0
+
+    # Reference-name cache (app.services.refcache): how often each worker checks
+    # ref_version for writes made elsewhere, i.e. the worst-case staleness
+    refcache_poll_seconds: float = 5.0
+
 
 settings = Settings()
+
+
+def worker_count() -> int:
+    if settings.app_env != "production":
+        return 1
+    if settings.web_concurrency > 0:
+        return settings.web_concurrency
+    return (os.cpu_count() or 1) * 2 + 1
+
+
+def db_pool_limits(workers: int) -> tuple[int, int]:
+    """(pool_size, max_overflow) for this process: one web worker out of
+    `workers`, or a background process with its fixed pool."""
+    if settings.db_pool_role == "background":
+        return settings.db_background_pool_size, 0
+    shared = (
+        settings.db_max_connections
+        - settings.db_reserved_connections
+        - settings.db_background_processes * settings.db_background_pool_size
+    )
+    budget = max(1, shared // max(workers, 1))
+    pool_size = min(settings.db_pool_size, budget)
+    return pool_size, max(0, min(settings.db_max_overflow, budget - pool_size))
@@ -0,0 +1,208 @@
+"""Idempotency-Key support for write endpoints.
+
+Clients that may retry a write (flaky network, a timeout after the server
+already committed) send an `Idempotency-Key` header, unique per logical
+operation. The first request with a key claims it in the idempotency_key
+table, runs normally, and its response is stored. A retry with the same key
+gets the stored response back, marked `Idempotent-Replayed: true`, without
+running the handler again:
+
+* a duplicate that arrives while the first is still running waits for it
+  (up to idempotency_wait_seconds, then 409 with Retry-After)
+* reusing a key for a different route or body is a 422
+* 5xx and retryable 4xx outcomes are not stored, so a retry runs again
+
+Keys are scoped per user and kept for idempotency_ttl_seconds. Requests
+without the header, or without a valid bearer token, pass straight through.
+"""
+import asyncio
+import hashlib
+import re
+import time
+from typing import Optional
+
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from app.core.config import settings
+from app.core.security import decode_access_token
+from app.services import idempotency as store
+
+# (methods, path pattern) of the writes that honour the header
+RULES: list[tuple[set[str], re.Pattern]] = [
+    ({"POST"}, re.compile(r"^/requests$")),
+    ({"PATCH"}, re.compile(r"^/requests/\d+/(assign|stage)$")),
+    ({"POST"}, re.compile(r"^/equipment/import$")),
+]
+
+MAX_KEY_LENGTH = 255
+POLL_SECONDS = 0.2
+# outcomes worth retrying are never replayed
+UNSTORED_STATUSES = {408, 409, 425, 429}
+# recomputed on replay
+SKIPPED_HEADERS = {"content-length", "date", "server"}
+
+
+def applies(method: str, path: str) -> bool:
+    return any(method in methods and pattern.match(path) for methods, pattern in RULES)
+
+
+def _header(scope: Scope, name: bytes) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == name:
+            return value.decode("latin-1")
+    return None
+
+
+def _user_id(scope: Scope) -> Optional[int]:
+    auth = _header(scope, b"authorization") or ""
+    scheme, _, token = auth.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return decode_access_token(token)
+    except ValueError:
+        return None
+
+
+def _error(status: int, detail: str, headers: Optional[dict] = None) -> JSONResponse:
+    return JSONResponse({"detail": detail}, status_code=status, headers=headers)
+
+
+class IdempotencyMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not applies(scope["method"], scope["path"]):
+            await self.app(scope, receive, send)
+            return
+        key = _header(scope, b"idempotency-key")
+        user_id = _user_id(scope) if key is not None else None
+        if user_id is None:
+            await self.app(scope, receive, send)
+            return
+        if not key or len(key) > MAX_KEY_LENGTH:
+            await _error(400, f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters")(scope, receive, send)
+            return
+
+        route = f"{scope['method']} {scope['path']}"
+        digest = hashlib.sha256(scope.get("query_string", b"") + b"\n")
+
+        if await run_in_threadpool(store.claim, user_id, key, route):
+            await self._run(scope, receive, send, user_id, key, digest)
+            return
+
+        # someone already holds this key: read our body so it can be compared
+        # with the stored request, then wait for that outcome
+        chunks: list[bytes] = []
+        more_body = True
+        while more_body:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                return
+            chunks.append(message.get("body", b""))
+            digest.update(chunks[-1])
+            more_body = message.get("more_body", False)
+        request_hash = digest.hexdigest()
+
+        deadline = time.monotonic() + settings.idempotency_wait_seconds
+        while True:
+            stored = await run_in_threadpool(store.load, user_id, key)
+            if stored is None:
+                # released (the first attempt failed) or expired: run it ourselves
+                if await run_in_threadpool(store.claim, user_id, key, route):
+                    await self._run(scope, _replay_body(chunks), send, user_id, key, digest)
+                    return
+            elif stored.route != route:
+                response = _error(422, "Idempotency-Key was already used for a different request")
+                break
+            elif stored.status_code is not None:
+                if stored.request_hash != request_hash:
+                    response = _error(422, "Idempotency-Key was already used for a different request")
+                    break
+                await _send_stored(send, stored)
+                return
+            if time.monotonic() >= deadline:
+                response = _error(
+                    409,
+                    "A request with this Idempotency-Key is still in progress",
+                    {"Retry-After": str(settings.admission_retry_after_seconds)},
+                )
+                break
+            await asyncio.sleep(POLL_SECONDS)
+        await response(scope, receive, send)
+
+    async def _run(self, scope: Scope, receive: Receive, send: Send, user_id: int, key: str, digest) -> None:
+        """Run the handler as the owner of `key` and store its outcome."""
+        body_complete = False
+        status: Optional[int] = None
+        headers: list[list[str]] = []
+        body = bytearray()
+        too_large = False
+
+        async def hashing_receive() -> Message:
+            nonlocal body_complete
+            message = await receive()
+            if message["type"] == "http.request":
+                digest.update(message.get("body", b""))
+                body_complete = not message.get("more_body", False)
+            return message
+
+        async def capturing_send(message: Message) -> None:
+            nonlocal status, too_large
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers.extend(
+                    [k.decode("latin-1"), v.decode("latin-1")]
+                    for k, v in message.get("headers", [])
+                    if k.decode("latin-1").lower() not in SKIPPED_HEADERS
+                )
+            elif message["type"] == "http.response.body" and not too_large:
+                body.extend(message.get("body", b""))
+                too_large = len(body) > settings.idempotency_max_response_bytes
+            await send(message)
+
+        try:
+            await self.app(scope, hashing_receive, capturing_send)
+        except BaseException:
+            await run_in_threadpool(store.release, user_id, key)
+            raise
+
+        storable = (
+            status is not None
+            and status < 500
+            and status not in UNSTORED_STATUSES
+            and body_complete
+            and not too_large
+        )
+        if storable:
+            await run_in_threadpool(
+                store.complete, user_id, key, digest.hexdigest(), status, headers, bytes(body)
+            )
+        else:
+            await run_in_threadpool(store.release, user_id, key)
+
+
+def _replay_body(chunks: list[bytes]) -> Receive:
+    """A receive callable that hands back an already-read request body."""
+    pending = [
+        {"type": "http.request", "body": chunk, "more_body": i < len(chunks) - 1}
+        for i, chunk in enumerate(chunks)
+    ]
+
+    async def receive() -> Message:
+        if pending:
+            return pending.pop(0)
+        return {"type": "http.disconnect"}
+
+    return receive
+
+
+async def _send_stored(send: Send, stored: store.StoredResponse) -> None:
+    raw_headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in stored.headers]
+    raw_headers.append((b"content-length", str(len(stored.body)).encode("latin-1")))
+    raw_headers.append((b"idempotent-replayed", b"true"))
+    await send({"type": "http.response.start", "status": stored.status_code, "headers": raw_headers})
+    await send({"type": "http.response.body", "body": stored.body})
@@ -1,22 +1,31 @@
 from datetime import datetime, timedelta, timezone
-
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from functools import lru_cache
+from typing import Optional
 
 from app.core.config import settings
 
-_pwd = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# passlib/bcrypt and jose/cryptography are imported on first use rather than at
+# module import; together they are a large share of app boot time.
+
+
+@lru_cache(maxsize=1)
+def _pwd():
+    from passlib.context import CryptContext
+
+    return CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
 def hash_password(password: str) -> str:
-    return _pwd.hash(password)
+    return _pwd().hash(password)
 
 
 def verify_password(password: str, password_hash: str) -> bool:
-    return _pwd.verify(password, password_hash)
+    return _pwd().verify(password, password_hash)
 
 
 def create_access_token(*, user_id: int) -> str:
+    from jose import jwt
+
     exp = datetime.now(timezone.utc) + timedelta(
         minutes=settings.jwt_access_token_exp_minutes
     )
@@ -25,13 +34,46 @@ def create_access_token(*, user_id: int) -> str:
 
 
 def decode_access_token(token: str) -> int:
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(
             token, settings.jwt_secret, algorithms=[settings.jwt_algorithm]
         )
     except JWTError as exc:
         raise ValueError("invalid token") from exc
+    if payload.get("purpose"):
+        # feed tokens end up in calendar URLs; they must not unlock the API
+        raise ValueError("not an access token")
     sub = payload.get("sub")
     if not sub:
         raise ValueError("missing sub")
     return int(sub)
+
+
+def create_feed_token(*, user_id: int, team_id: Optional[int] = None) -> str:
+    """Long-lived token for GET /requests/calendar.ics?token=, which calendar
+    apps poll without an Authorization header. Only accepted by that feed."""
+    from jose import jwt
+
+    exp = datetime.now(timezone.utc) + timedelta(days=settings.ics_token_exp_days)
+    payload = {"sub": str(user_id), "purpose": "ics", "exp": exp}
+    if team_id is not None:
+        payload["team"] = team_id
+    return jwt.encode(payload, settings.jwt_secret, algorithm=settings.jwt_algorithm)
+
+
+def decode_feed_token(token: str) -> tuple[int, Optional[int]]:
+    """(user_id, team_id or None) of a feed token."""
+    from jose import JWTError, jwt
+
+    try:
+        payload = jwt.decode(
+            token, settings.jwt_secret, algorithms=[settings.jwt_algorithm]
+        )
+    except JWTError as exc:
+        raise ValueError("invalid token") from exc
+    if payload.get("purpose") != "ics" or not payload.get("sub"):
+        raise ValueError("not a feed token")
+    team = payload.get("team")
+    return int(payload["sub"]), int(team) if team is not None else None
@@ -1,7 +1,8 @@
 from sqlalchemy import (
-    Column, String, Text, Boolean, Date, DateTime, Integer, Numeric,
-    ForeignKey, CheckConstraint, Index, func
+    Column, String, Text, Boolean, Date, DateTime, BigInteger, Integer, LargeBinary, Numeric,
+    ForeignKey, CheckConstraint, Computed, Index, func, text
 )
+from sqlalchemy.dialects.postgresql import JSONB, TSVECTOR
 from sqlalchemy.orm import relationship
 from app.db.base import Base
 
@@ -22,10 +23,25 @@ class Department(Base):
     name = Column(String, nullable=False, unique=True)
 
 class Location(Base):
+    """Site -> building -> line -> cell tree.
+
+    `path` is the materialized chain of ids ("/3/7/12/"), set by a trigger
+    from parent_id; moving a location rewrites its subtree's paths (and the
+    copies on maintenance_request). C collation makes a subtree a plain
+    btree range, see app.api.routes.locations.in_subtree.
+    """
     __tablename__ = "location"
     id = Column(Integer, primary_key=True)
     name = Column(String, nullable=False)
     details = Column(Text, nullable=True)
+    parent_id = Column(Integer, ForeignKey("location.id", ondelete="RESTRICT"), nullable=True)
+    path = Column(String(collation="C"), nullable=False, server_default="")
+
+    __table_args__ = (
+        Index("idx_location_parent", "parent_id"),
+        Index("idx_location_path", "path"),
+    )
+    __mapper_args__ = {"eager_defaults": True}
 
 class EquipmentCategory(Base):
     __tablename__ = "equipment_category"
@@ -77,6 +93,12 @@ class Equipment(Base):
     __table_args__ = (
         CheckConstraint("(department_id IS NOT NULL) OR (owner_user_id IS NOT NULL)", name="equipment_owner_check"),
         Index("idx_equipment_team", "maintenance_team_id"),
+        Index("idx_equipment_location", "location_id"),
+        Index(
+            "idx_equipment_warranty",
+            "warranty_end_date",
+            postgresql_where=text("warranty_end_date IS NOT NULL"),
+        ),
     )
 
 class RequestStage(Base):
@@ -87,6 +109,11 @@ class RequestStage(Base):
     is_closed = Column(Boolean, nullable=False, default=False)
     is_scrap = Column(Boolean, nullable=False, default=False)
 
+# non-key columns of the request list projection, carried by the visibility indexes
+_REQUEST_LIST_COLUMNS = [
+    "request_type", "subject", "equipment_id", "scheduled_start", "due_at", "is_open", "version",
+]
+
 class MaintenanceRequest(Base):
     __tablename__ = "maintenance_request"
 
@@ -112,16 +139,87 @@ class MaintenanceRequest(Base):
     actual_duration_hours = Column(Numeric(10, 2), nullable=True)
     repaired_at = Column(DateTime(timezone=True), nullable=True)
 
+    # full-text search document; subject hits rank above description hits
+    search_vector = Column(
+        TSVECTOR,
+        Computed(
+            "setweight(to_tsvector('english', coalesce(subject, '')), 'A') || "
+            "setweight(to_tsvector('english', coalesce(description, '')), 'B')",
+            persisted=True,
+        ),
+    )
+
+    # mirrors request_stage.is_closed so open-work indexes can be partial
+    is_open = Column(Boolean, nullable=False, default=True, server_default=text("true"))
+
+    # optimistic concurrency: bumped by every write, checked by stage/assign updates
+    version = Column(Integer, nullable=False, default=1, server_default="1")
+
+    # equipment's location when the request was raised; location_path follows
+    # it (trigger) and tracks moves of that location in the tree
+    location_id = Column(Integer, ForeignKey("location.id"), nullable=True)
+    location_path = Column(String(collation="C"), nullable=True)
+
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
     updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     __table_args__ = (
         CheckConstraint("request_type IN ('corrective','preventive')", name="request_type_check"),
+        CheckConstraint("scheduled_end IS NULL OR scheduled_end >= scheduled_start", name="request_schedule_check"),
         Index("idx_req_equipment", "equipment_id"),
         Index("idx_req_team_stage", "team_id", "stage_id"),
-        Index("idx_req_stage", "stage_id"),
+        # GET /requests/board walks each column newest-first
+        Index("idx_req_board", "stage_id", "updated_at", "id"),
         Index("idx_req_scheduled", "scheduled_start"),
+        Index("idx_req_updated", "updated_at", "id"),
+        # visibility branches; INCLUDE the list projection for index-only scans
+        Index(
+            "idx_req_assignee",
+            "assigned_to_id",
+            postgresql_include=["id", "stage_id", "team_id", *_REQUEST_LIST_COLUMNS],
+        ),
+        Index(
+            "idx_req_requester",
+            "requester_id",
+            postgresql_include=["id", "stage_id", "team_id", "assigned_to_id", *_REQUEST_LIST_COLUMNS],
+        ),
+        Index(
+            "idx_req_team_stage_open",
+            "team_id",
+            "stage_id",
+            postgresql_include=["id", "assigned_to_id", *_REQUEST_LIST_COLUMNS],
+            postgresql_where=text("is_open"),
+        ),
+        # /requests/overdue walks this in due_at order
+        Index(
+            "idx_req_overdue",
+            "due_at",
+            "id",
+            postgresql_where=text("is_open AND due_at IS NOT NULL"),
+        ),
+        Index(
+            "idx_req_open_assignee",
+            "assigned_to_id",
+            postgresql_where=text("is_open AND assigned_to_id IS NOT NULL"),
+        ),
+        Index("idx_req_search", "search_vector", postgresql_using="gin"),
+        # location subtree filters are range scans on these
+        Index("idx_req_location", "location_path"),
+        Index("idx_req_location_open", "location_path", postgresql_where=text("is_open")),
+        # overlap (&&) lookups per technician; needs the btree_gist extension
+        Index(
+            "idx_req_tech_schedule",
+            "assigned_to_id",
+            text("tstzrange(scheduled_start, scheduled_end)"),
+            postgresql_using="gist",
+            postgresql_where=text(
+                "assigned_to_id IS NOT NULL AND scheduled_start IS NOT NULL AND scheduled_end IS NOT NULL"
+            ),
+        ),
     )
+    # fetch created_at/updated_at via RETURNING so rollups can key on them;
+    # search_vector stays unmapped so it is never loaded or returned
+    __mapper_args__ = {"eager_defaults": True, "exclude_properties": ["search_vector"]}
 
 class MaintenanceRequestLog(Base):
     __tablename__ = "maintenance_request_log"
@@ -132,3 +230,154 @@ class MaintenanceRequestLog(Base):
     old_value = Column(Text, nullable=True)
     new_value = Column(Text, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class MaintenanceRequestArchive(Base):
+    """Cold storage for requests in closed stages past the retention age.
+
+    Same columns as maintenance_request (ids preserved) without foreign keys, so
+    the mover never contends with hot-table writes.
+    """
+    __tablename__ = "maintenance_request_archive"
+
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    request_type = Column(String, nullable=False)
+    subject = Column(String, nullable=False)
+    description = Column(Text, nullable=True)
+    equipment_id = Column(Integer, nullable=False)
+    equipment_category_id = Column(Integer, nullable=False)
+    team_id = Column(Integer, nullable=False)
+    requester_id = Column(Integer, nullable=False)
+    assigned_to_id = Column(Integer, nullable=True)
+    stage_id = Column(Integer, nullable=False)
+    location_id = Column(Integer, nullable=True)
+    scheduled_start = Column(DateTime(timezone=True), nullable=True)
+    scheduled_end = Column(DateTime(timezone=True), nullable=True)
+    due_at = Column(DateTime(timezone=True), nullable=True)
+    actual_duration_hours = Column(Numeric(10, 2), nullable=True)
+    repaired_at = Column(DateTime(timezone=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+    updated_at = Column(DateTime(timezone=True), nullable=False)
+    archived_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("idx_req_archive_equipment", "equipment_id", "created_at"),
+        Index("idx_req_archive_requester", "requester_id"),
+        # tombstone feed for /requests/changes
+        Index("idx_req_archive_archived", "archived_at", "id"),
+    )
+
+class MaintenanceRequestLogArchive(Base):
+    __tablename__ = "maintenance_request_log_archive"
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    request_id = Column(Integer, nullable=False, index=True)
+    changed_by = Column(Integer, nullable=True)
+    field_name = Column(String, nullable=False)
+    old_value = Column(Text, nullable=True)
+    new_value = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), nullable=False)
+
+class RequestStageRollup(Base):
+    """Request counts per (created day, team, category, current stage, location).
+
+    Each request lives in exactly one cell; stage transitions move it between
+    cells so dashboards never have to scan maintenance_request.
+    """
+    __tablename__ = "request_stage_rollup"
+    day = Column(Date, nullable=False)
+    team_id = Column(Integer, ForeignKey("maintenance_team.id", ondelete="CASCADE"), nullable=False)
+    equipment_category_id = Column(Integer, ForeignKey("equipment_category.id", ondelete="CASCADE"), nullable=False)
+    stage_id = Column(Integer, ForeignKey("request_stage.id", ondelete="CASCADE"), nullable=False)
+    location_id = Column(Integer, ForeignKey("location.id"), nullable=True)
+    request_count = Column(Integer, nullable=False, default=0)
+    duration_hours_sum = Column(Numeric(14, 2), nullable=False, default=0)
+    duration_count = Column(Integer, nullable=False, default=0)
+
+    # location is optional, so the cell key is a unique index where NULLs
+    # compare equal (ON CONFLICT arbiter) rather than a primary key
+    __table_args__ = (
+        Index(
+            "uq_rollup_cell",
+            "day",
+            "team_id",
+            "equipment_category_id",
+            "stage_id",
+            "location_id",
+            unique=True,
+            postgresql_nulls_not_distinct=True,
+        ),
+    )
+    __mapper_args__ = {
+        "primary_key": [day, team_id, equipment_category_id, stage_id, location_id]
+    }
+
+class EquipmentReliabilityDaily(Base):
+    """Corrective-maintenance history per (equipment, UTC day).
+
+    failure_count counts corrective requests raised that day; repairs are
+    booked on the day they reached the repaired stage, and the downtime of a
+    repaired failure (raised -> repaired) is split over the days it spans.
+    Kept in step by app.services.rollups so /equipment/{id}/reliability
+    reads one row per day instead of the request history.
+    """
+    __tablename__ = "equipment_reliability_daily"
+    equipment_id = Column(Integer, ForeignKey("equipment.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    failure_count = Column(Integer, nullable=False, default=0)
+    repair_count = Column(Integer, nullable=False, default=0)
+    repair_hours_sum = Column(Numeric(14, 2), nullable=False, default=0)  # actual_duration_hours
+    repair_hours_count = Column(Integer, nullable=False, default=0)
+    restore_hours_sum = Column(Numeric(14, 2), nullable=False, default=0)  # raised -> repaired
+    downtime_hours = Column(Numeric(14, 2), nullable=False, default=0)
+
+class BackgroundJob(Base):
+    """Durable job queue. Enqueued in the same transaction as the write that
+    needs it; workers claim rows with FOR UPDATE SKIP LOCKED. Finished jobs are
+    deleted, failed ones are retried with backoff and end up `dead`."""
+    __tablename__ = "background_job"
+    id = Column(Integer, primary_key=True)
+    kind = Column(String, nullable=False)
+    payload = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    status = Column(String, nullable=False, default="queued", server_default="queued")  # queued | running | dead
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    max_attempts = Column(Integer, nullable=False, default=5, server_default="5")
+    run_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    locked_at = Column(DateTime(timezone=True), nullable=True)
+    locked_by = Column(String, nullable=True)
+    last_error = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        CheckConstraint("status IN ('queued','running','dead')", name="background_job_status_check"),
+        Index("idx_job_ready", "run_at", "id", postgresql_where=text("status = 'queued'")),
+        Index("idx_job_running", "locked_at", postgresql_where=text("status = 'running'")),
+    )
+
+class RefVersion(Base):
+    """Write counter per table, bumped by triggers (migrations 3d8b6e1f9a42,
+    8d5a3c1f7e29, 9e6b4d2a8c71 and a4f7c2e9b816). app.services.refcache polls it to decide
+    which cached name maps to reload; app.services.response_cache keys entries
+    on it. table_name is usually a table, but a trigger may bump a named
+    counter instead (maintenance_request_schedule)."""
+    __tablename__ = "ref_version"
+    table_name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0, server_default="0")
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+class IdempotencyKey(Base):
+    """Stored outcome of a write sent with an Idempotency-Key header, per user
+    (app.core.idempotency). status_code is NULL while the first request is
+    still running; rows live until expires_at."""
+    __tablename__ = "idempotency_key"
+    user_id = Column(Integer, ForeignKey("app_user.id", ondelete="CASCADE"), primary_key=True)
+    key = Column(String(255), primary_key=True)
+    route = Column(String, nullable=False)  # "PATCH /requests/12/stage"
+    request_hash = Column(String, nullable=True)  # sha256 of query + body, set on completion
+    status_code = Column(Integer, nullable=True)
+    response_headers = Column(JSONB, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    __table_args__ = (
+        Index("idx_idempotency_expires", "expires_at"),
+    )
@@ -1,7 +1,7 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 
-from app.core.config import settings
+from app.core.config import db_pool_limits, settings, worker_count
 
 
 def _db_url() -> str:
@@ -13,5 +13,12 @@ def _db_url() -> str:
     )
 
 
-engine = create_engine(_db_url(), pool_pre_ping=True)
+_pool_size, _max_overflow = db_pool_limits(worker_count())
+engine = create_engine(
+    _db_url(),
+    pool_pre_ping=True,
+    pool_size=_pool_size,
+    max_overflow=_max_overflow,
+    connect_args={"prepare_threshold": settings.db_prepare_threshold},
+)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
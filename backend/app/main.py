@@ -1,19 +1,50 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api import warmup
 from app.api.router import api_router
+from app.core.admission import AdmissionMiddleware
+from app.core.compression import CompressionMiddleware
 from app.core.config import settings
+from app.core.idempotency import IdempotencyMiddleware
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # open pool connections and prime caches before taking traffic; if the
+    # database is not reachable yet, GET /health/ready retries
+    await run_in_threadpool(warmup.warm_up)
+    yield
 
-app = FastAPI(title=settings.app_name)
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 
 origins = [o.strip() for o in settings.cors_origins.split(",") if o.strip()]
 
+# innermost, so shed responses still get CORS headers
+app.add_middleware(AdmissionMiddleware, enabled=settings.admission_enabled)
+
+# outside admission: a duplicate waiting on the original holds no slot
+app.add_middleware(IdempotencyMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Retry-After", "Idempotent-Replayed"],
+)
+
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.compression_minimum_size,
+    encodings=settings.compression_encodings,
+    streaming=settings.compression_streaming,
+    cache_bytes=settings.compression_cache_bytes,
 )
 
 app.include_router(api_router)
@@ -0,0 +1,31 @@
+"""Move closed requests past the retention age into the archive tables.
+
+Run once, or with --loop to keep draining every archive_interval_seconds.
+"""
+import sys
+import time
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.archive import archive_all
+
+
+def run(loop: bool = False) -> None:
+    while True:
+        db = SessionLocal()
+        try:
+            moved = archive_all(
+                db,
+                retention_days=settings.archive_retention_days,
+                batch_size=settings.archive_batch_size,
+            )
+            print(f"Archived {moved} requests.")
+        finally:
+            db.close()
+        if not loop:
+            return
+        time.sleep(settings.archive_interval_seconds)
+
+
+if __name__ == "__main__":
+    run(loop="--loop" in sys.argv[1:])
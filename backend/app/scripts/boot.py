@@ -0,0 +1,82 @@
+"""Container boot: migrate and seed only when there is something to do.
+
+The common case (schema at head, demo users present) costs one psycopg query
+for the migration check and one for the seed check, instead of importing
+Alembic with every model and bcrypt-hashing passwords on every start.
+"""
+import ast
+import re
+import sys
+from pathlib import Path
+
+import psycopg
+
+from app.core.config import settings
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+VERSIONS_DIR = BACKEND_DIR / "alembic" / "versions"
+
+_REVISION = re.compile(r"^revision\s*=\s*(.+)$", re.M)
+_DOWN_REVISION = re.compile(r"^down_revision\s*=\s*(.+)$", re.M)
+
+
+def script_heads(versions_dir: Path = VERSIONS_DIR) -> set[str]:
+    """Head revisions found by reading the version files, without importing Alembic."""
+    revisions: set[str] = set()
+    parents: set[str] = set()
+    for path in versions_dir.glob("*.py"):
+        source = path.read_text()
+        rev = _REVISION.search(source)
+        if not rev:
+            continue
+        revisions.add(ast.literal_eval(rev.group(1).strip()))
+        down = _DOWN_REVISION.search(source)
+        down_value = ast.literal_eval(down.group(1).strip()) if down else None
+        if isinstance(down_value, str):
+            parents.add(down_value)
+        elif down_value:
+            parents.update(down_value)
+    return revisions - parents
+
+
+def db_revisions() -> set[str]:
+    try:
+        with psycopg.connect(
+            host=settings.postgres_host,
+            port=settings.postgres_port,
+            dbname=settings.postgres_db,
+            user=settings.postgres_user,
+            password=settings.postgres_password,
+        ) as conn:
+            return {row[0] for row in conn.execute("SELECT version_num FROM alembic_version")}
+    except psycopg.errors.UndefinedTable:
+        return set()
+
+
+def migrate() -> bool:
+    """Upgrade to head if needed. Returns True when an upgrade ran."""
+    if db_revisions() == script_heads():
+        print("Schema at head; skipping migrations.")
+        return False
+    from alembic.config import main as alembic_main
+
+    alembic_main(argv=["-c", str(BACKEND_DIR / "alembic.ini"), "upgrade", "head"])
+    return True
+
+
+def run(check_only: bool = False) -> None:
+    if check_only:
+        current = db_revisions() == script_heads()
+        print("Schema at head." if current else "Migrations pending.")
+        return
+    migrate()
+    from app.scripts import seed_users
+
+    try:
+        seed_users.run()
+    except Exception as exc:  # seeding is best-effort, as before
+        print(f"Seeding skipped: {exc}")
+
+
+if __name__ == "__main__":
+    run(check_only="--check" in sys.argv[1:])
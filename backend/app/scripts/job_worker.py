@@ -0,0 +1,49 @@
+"""Run background jobs from the background_job table.
+
+Start as many of these as needed; claims use SKIP LOCKED so workers never
+pick up the same job. Pass --once to drain the ready queue and exit.
+"""
+import os
+import socket
+import sys
+import time
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services import idempotency, jobs
+from app.services import job_handlers  # noqa: F401  (registers handlers)
+
+STALE_CHECK_SECONDS = 60
+
+
+def run(once: bool = False) -> None:
+    worker = f"{socket.gethostname()}:{os.getpid()}"
+    last_stale_check = 0.0
+    db = SessionLocal()
+    try:
+        while True:
+            if time.monotonic() - last_stale_check > STALE_CHECK_SECONDS:
+                requeued, dead = jobs.requeue_stale(db)
+                if requeued:
+                    print(f"Requeued {requeued} stale jobs.")
+                if dead:
+                    print(f"Parked {dead} stale jobs as dead after their last attempt.")
+                purged = idempotency.purge_expired(db)
+                if purged:
+                    print(f"Purged {purged} expired idempotency keys.")
+                last_stale_check = time.monotonic()
+
+            claimed = jobs.claim(db, worker=worker, limit=settings.job_batch_size)
+            for job in claimed:
+                if not jobs.run(db, job):
+                    print(f"Job {job.id} ({job.kind}) failed, attempt {job.attempts}/{job.max_attempts}.")
+            if not claimed:
+                if once:
+                    return
+                time.sleep(settings.job_poll_seconds)
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run(once="--once" in sys.argv[1:])
@@ -0,0 +1,19 @@
+"""Backfill or rebuild the KPI rollup tables from maintenance_request."""
+from app.db.session import SessionLocal
+from app.services import rollups
+
+
+def run() -> None:
+    db = SessionLocal()
+    try:
+        rows = rollups.rebuild(db)
+        reliability_rows = rollups.rebuild_reliability(db)
+        db.commit()
+        print(f"Rebuilt request_stage_rollup ({rows} rows).")
+        print(f"Rebuilt equipment_reliability_daily ({reliability_rows} rows).")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    run()
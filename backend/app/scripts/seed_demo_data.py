@@ -9,12 +9,14 @@ from app.db.models import (
     Department,
     Equipment,
     EquipmentCategory,
+    Location,
     MaintenanceRequest,
     MaintenanceTeam,
     MaintenanceTeamMember,
     RequestStage,
 )
 from app.db.session import SessionLocal
+from app.services import rollups
 
 
 def ensure_user(db, *, email: str, full_name: str, password: str, role: str) -> AppUser:
@@ -68,6 +70,20 @@ def ensure_simple(db, model, name_field: str, name: str):
     return obj
 
 
+def ensure_location(db, name: str, parent: Location | None = None) -> Location:
+    parent_id = parent.id if parent else None
+    existing = db.execute(
+        select(Location).where(Location.name == name, Location.parent_id.is_not_distinct_from(parent_id))
+    ).scalar_one_or_none()
+    if existing:
+        return existing
+    loc = Location(name=name, parent_id=parent_id)
+    db.add(loc)
+    db.commit()
+    db.refresh(loc)
+    return loc
+
+
 def ensure_team_member(db, team_id: int, user_id: int):
     exists = db.execute(
         select(MaintenanceTeamMember).where(
@@ -105,6 +121,7 @@ def ensure_request(
 
     if existing:
         return existing
+    repaired = stage.is_closed and not stage.is_scrap
     req = MaintenanceRequest(
         request_type=req_type,
         subject=subject,
@@ -112,12 +129,27 @@ def ensure_request(
         equipment_id=equipment.id,
         equipment_category_id=equipment.category_id,
         team_id=equipment.maintenance_team_id,
+        location_id=equipment.location_id,
         requester_id=requester_id,
         assigned_to_id=assigned_to_id,
         stage_id=stage.id,
+        is_open=not stage.is_closed,
         scheduled_start=scheduled_start,
+        due_at=scheduled_start,
+        repaired_at=datetime.now(timezone.utc) if repaired else None,
     )
     db.add(req)
+    db.flush()
+    # book it like the API does, so reports and reliability include it
+    rollups.record_created(db, req)
+    rollups.record_repair(
+        db,
+        req,
+        was_repaired=False,
+        is_repaired=repaired,
+        old_repaired_at=None,
+        old_duration=None,
+    )
     db.commit()
     db.refresh(req)
     return req
@@ -153,6 +185,14 @@ def run() -> None:
         ensure_team_member(db, mech.id, tech2.id)
         ensure_team_member(db, it_team.id, tech2.id)
 
+        # Locations: site -> building -> line -> cell
+        site = ensure_location(db, "Main Plant")
+        building_a = ensure_location(db, "Building A", site)
+        line_1 = ensure_location(db, "Line 1", building_a)
+        cell_3 = ensure_location(db, "Cell 3", line_1)
+        building_b = ensure_location(db, "Building B", site)
+        it_office = ensure_location(db, "IT Office", building_b)
+
         # Equipment
         cnc = db.execute(
             select(Equipment).where(Equipment.serial_number == "CNC-001")
@@ -164,6 +204,7 @@ def run() -> None:
                 category_id=cat_machine.id,
                 department_id=dept_prod.id,
                 owner_user_id=manager.id,
+                location_id=cell_3.id,
                 maintenance_team_id=mech.id,
                 default_technician_id=tech1.id,
                 status="active",
@@ -182,6 +223,7 @@ def run() -> None:
                 category_id=cat_laptop.id,
                 department_id=dept_it.id,
                 owner_user_id=requester.id,
+                location_id=it_office.id,
                 maintenance_team_id=it_team.id,
                 default_technician_id=tech2.id,
                 status="active",
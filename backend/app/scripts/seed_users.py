@@ -1,11 +1,34 @@
 """Seed initial users for login tests."""
-from sqlalchemy import select
+from sqlalchemy import func, select
 
 from app.core.security import hash_password
 from app.db.models import AppUser, RequestStage
 from app.db.session import SessionLocal
 
 
+SEED_USERS = [
+    ("manager@demo.com", "Demo Manager", "manager"),
+    ("tech1@demo.com", "Tech One", "technician"),
+    ("user1@demo.com", "Requester One", "user"),
+]
+SEED_STAGES = ["new", "in progress", "repaired", "scrap"]
+
+
+def already_seeded(db) -> bool:
+    """One round trip; lets container boots skip seeding (and bcrypt) entirely."""
+    users, stages = db.execute(
+        select(
+            select(func.count())
+            .where(AppUser.email.in_([email for email, _, _ in SEED_USERS]))
+            .scalar_subquery(),
+            select(func.count())
+            .where(func.lower(RequestStage.name).in_(SEED_STAGES))
+            .scalar_subquery(),
+        )
+    ).one()
+    return users == len(SEED_USERS) and stages == len(SEED_STAGES)
+
+
 def ensure_stages(db) -> None:
     existing = {
         s.name.lower(): s
@@ -57,28 +80,12 @@ def ensure_user(
 def run() -> None:
     db = SessionLocal()
     try:
+        if already_seeded(db):
+            print("Users already seeded.")
+            return
         ensure_stages(db)
-        ensure_user(
-            db,
-            email="manager@demo.com",
-            full_name="Demo Manager",
-            password="demo",
-            role="manager",
-        )
-        ensure_user(
-            db,
-            email="tech1@demo.com",
-            full_name="Tech One",
-            password="demo",
-            role="technician",
-        )
-        ensure_user(
-            db,
-            email="user1@demo.com",
-            full_name="Requester One",
-            password="demo",
-            role="user",
-        )
+        for email, full_name, role in SEED_USERS:
+            ensure_user(db, email=email, full_name=full_name, password="demo", role=role)
         print("Seeded users.")
     finally:
         db.close()
@@ -0,0 +1,78 @@
+"""Batched mover from maintenance_request to the archive tables."""
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import Table, delete, insert, select
+from sqlalchemy.orm import Session
+
+from app.db.models import (
+    MaintenanceRequest,
+    MaintenanceRequestArchive,
+    MaintenanceRequestLog,
+    MaintenanceRequestLogArchive,
+    RequestStage,
+)
+
+
+def _copy_columns(table: Table) -> list[str]:
+    # generated columns are recomputed by the database and cannot be inserted
+    return [c.name for c in table.columns if c.computed is None]
+
+
+def archive_batch(db: Session, *, retention_days: int, batch_size: int) -> int:
+    """Move one batch of old closed requests (and their logs). Returns rows moved.
+
+    Rows are claimed with FOR UPDATE SKIP LOCKED so several movers can run
+    side by side and never block on requests a handler is touching.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    closed_stage_ids = select(RequestStage.id).where(RequestStage.is_closed.is_(True))
+    ids = (
+        db.execute(
+            select(MaintenanceRequest.id)
+            .where(
+                MaintenanceRequest.stage_id.in_(closed_stage_ids),
+                MaintenanceRequest.updated_at < cutoff,
+            )
+            .order_by(MaintenanceRequest.updated_at, MaintenanceRequest.id)
+            .limit(batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        .scalars()
+        .all()
+    )
+    if not ids:
+        return 0
+
+    log_cols = _copy_columns(MaintenanceRequestLog.__table__)
+    db.execute(
+        insert(MaintenanceRequestLogArchive).from_select(
+            log_cols,
+            select(*[MaintenanceRequestLog.__table__.c[c] for c in log_cols]).where(
+                MaintenanceRequestLog.request_id.in_(ids)
+            ),
+        )
+    )
+    req_cols = _copy_columns(MaintenanceRequestArchive.__table__)
+    req_cols.remove("archived_at")
+    db.execute(
+        insert(MaintenanceRequestArchive).from_select(
+            req_cols,
+            select(*[MaintenanceRequest.__table__.c[c] for c in req_cols]).where(
+                MaintenanceRequest.id.in_(ids)
+            ),
+        )
+    )
+    # log rows go with the request via ON DELETE CASCADE
+    db.execute(delete(MaintenanceRequest).where(MaintenanceRequest.id.in_(ids)))
+    return len(ids)
+
+
+def archive_all(db: Session, *, retention_days: int, batch_size: int) -> int:
+    """Drain every eligible request, committing after each batch."""
+    total = 0
+    while True:
+        moved = archive_batch(db, retention_days=retention_days, batch_size=batch_size)
+        db.commit()
+        total += moved
+        if moved < batch_size:
+            return total
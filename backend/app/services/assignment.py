@@ -0,0 +1,159 @@
+"""Workload-aware technician auto-assignment.
+
+Each process keeps per-technician counters of open assigned requests (plus
+their scheduled windows) and team rosters in memory. Handlers adjust the
+counters after each committed assign/stage change; a full reconcile against
+the database runs at most every `assignment_reconcile_seconds`, which also
+bounds drift between workers. Picking a technician is O(team size) with no
+aggregate query on the request path.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import AppUser, MaintenanceRequest, MaintenanceTeamMember
+
+DEFAULT_WINDOW = timedelta(hours=1)
+
+Window = tuple[datetime, datetime]
+
+
+def _window(start: Optional[datetime], end: Optional[datetime]) -> Optional[Window]:
+    if start is None:
+        return None
+    return start, end if end and end > start else start + DEFAULT_WINDOW
+
+
+class TechnicianLoad:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._open: dict[int, int] = {}
+        self._windows: dict[int, dict[int, Window]] = {}
+        self._members: dict[int, list[int]] = {}
+        self._loaded_at: Optional[float] = None
+
+    def reconcile(self, db: Session) -> None:
+        """Reload counters and rosters from the database."""
+        counts = db.execute(
+            select(MaintenanceRequest.assigned_to_id, func.count())
+            .where(
+                MaintenanceRequest.assigned_to_id.is_not(None),
+                MaintenanceRequest.is_open,
+            )
+            .group_by(MaintenanceRequest.assigned_to_id)
+        ).all()
+        scheduled = db.execute(
+            select(
+                MaintenanceRequest.id,
+                MaintenanceRequest.assigned_to_id,
+                MaintenanceRequest.scheduled_start,
+                MaintenanceRequest.scheduled_end,
+            ).where(
+                MaintenanceRequest.assigned_to_id.is_not(None),
+                MaintenanceRequest.is_open,
+                MaintenanceRequest.scheduled_start.is_not(None),
+            )
+        ).all()
+        members = db.execute(
+            select(MaintenanceTeamMember.team_id, MaintenanceTeamMember.user_id)
+            .join(AppUser, AppUser.id == MaintenanceTeamMember.user_id)
+            .where(AppUser.is_active.is_(True))
+            .order_by(MaintenanceTeamMember.team_id, MaintenanceTeamMember.user_id)
+        ).all()
+
+        windows: dict[int, dict[int, Window]] = {}
+        for req_id, tech_id, start, end in scheduled:
+            windows.setdefault(tech_id, {})[req_id] = _window(start, end)
+        rosters: dict[int, list[int]] = {}
+        for team_id, user_id in members:
+            rosters.setdefault(team_id, []).append(user_id)
+
+        with self._lock:
+            self._open = dict(counts)
+            self._windows = windows
+            self._members = rosters
+            self._loaded_at = time.monotonic()
+
+    def _ensure_fresh(self, db: Session) -> None:
+        loaded_at = self._loaded_at
+        if loaded_at is None or time.monotonic() - loaded_at > settings.assignment_reconcile_seconds:
+            self.reconcile(db)
+
+    def invalidate(self) -> None:
+        """Force a reconcile on next use (e.g. after a roster change)."""
+        self._loaded_at = None
+
+    def pick(
+        self,
+        db: Session,
+        *,
+        team_id: int,
+        default_technician_id: Optional[int],
+        scheduled_start: Optional[datetime] = None,
+        scheduled_end: Optional[datetime] = None,
+    ) -> Optional[int]:
+        """Least-loaded team member; schedule overlaps add `assignment_overlap_weight`."""
+        self._ensure_fresh(db)
+        window = _window(scheduled_start, scheduled_end)
+        weight = settings.assignment_overlap_weight
+        with self._lock:
+            best: Optional[int] = None
+            best_key = None
+            for tech_id in self._members.get(team_id, []):
+                score = float(self._open.get(tech_id, 0))
+                if window and weight:
+                    start, end = window
+                    score += weight * sum(
+                        1
+                        for w_start, w_end in self._windows.get(tech_id, {}).values()
+                        if w_start < end and start < w_end
+                    )
+                # ties go to the equipment's default technician, then lowest id
+                key = (score, tech_id != default_technician_id, tech_id)
+                if best_key is None or key < best_key:
+                    best, best_key = tech_id, key
+            return best
+
+    def assigned(
+        self,
+        tech_id: Optional[int],
+        request_id: int,
+        scheduled_start: Optional[datetime] = None,
+        scheduled_end: Optional[datetime] = None,
+    ) -> None:
+        if tech_id is None:
+            return
+        with self._lock:
+            self._open[tech_id] = self._open.get(tech_id, 0) + 1
+            window = _window(scheduled_start, scheduled_end)
+            if window:
+                self._windows.setdefault(tech_id, {})[request_id] = window
+
+    def released(self, tech_id: Optional[int], request_id: int) -> None:
+        if tech_id is None:
+            return
+        with self._lock:
+            self._open[tech_id] = max(0, self._open.get(tech_id, 0) - 1)
+            self._windows.get(tech_id, {}).pop(request_id, None)
+
+    def moved(
+        self,
+        req: MaintenanceRequest,
+        *,
+        old_assignee: Optional[int],
+        was_open: bool,
+        is_open: bool,
+    ) -> None:
+        """Apply a committed assignee and/or stage change of one request."""
+        if was_open:
+            self.released(old_assignee, req.id)
+        if is_open:
+            self.assigned(req.assigned_to_id, req.id, req.scheduled_start, req.scheduled_end)
+
+
+technician_load = TechnicianLoad()
@@ -0,0 +1,373 @@
+"""Bulk equipment upsert from CSV or JSONL, keyed by serial_number.
+
+Rows are processed in chunks: the names referenced by a chunk are resolved
+with one query per lookup table (cached for the rest of the file), then the
+chunk is written with a single INSERT ... ON CONFLICT (serial_number) DO
+UPDATE and committed. Bad rows are reported and skipped; they never abort
+the rest of the import.
+"""
+import codecs
+import csv
+import json
+from dataclasses import dataclass, field
+from datetime import date
+from typing import IO, Iterator, Optional
+
+from sqlalchemy import func, literal_column, or_, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import (
+    AppUser,
+    Department,
+    Equipment,
+    EquipmentCategory,
+    Location,
+    MaintenanceTeam,
+)
+
+# lookup tables that create_missing may add rows to (all have unique names)
+CREATABLE = {
+    "category": EquipmentCategory,
+    "team": MaintenanceTeam,
+    "department": Department,
+}
+
+# marks a user name that matches several accounts, or a location name that
+# matches several locations
+AMBIGUOUS = -1
+
+UPSERT_COLUMNS = (
+    "name",
+    "category_id",
+    "maintenance_team_id",
+    "default_technician_id",
+    "department_id",
+    "owner_user_id",
+    "location_id",
+    "purchase_date",
+    "warranty_end_date",
+    "warranty_vendor",
+)
+
+
+@dataclass
+class ImportReport:
+    created: int = 0
+    updated: int = 0
+    failed: int = 0
+    errors: list[dict] = field(default_factory=list)
+    errors_truncated: bool = False
+
+    def error(self, row: int, serial_number: Optional[str], message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < settings.import_max_errors:
+            self.errors.append({"row": row, "serial_number": serial_number, "error": message})
+        else:
+            self.errors_truncated = True
+
+
+def _key(value, kind: Optional[str] = None) -> Optional[str]:
+    if value is None:
+        return None
+    value = str(value).strip()
+    if kind == "location":
+        # "Building A/Line 1": the location and as many ancestors as needed
+        value = "/".join(part.strip() for part in value.split("/") if part.strip())
+    return value.lower() or None
+
+
+def _serial(record: dict) -> Optional[str]:
+    """serial_number as reported back: JSONL values need not be strings."""
+    value = record.get("serial_number")
+    if value is None:
+        return None
+    return str(value).strip() or None
+
+
+def _lines(fp: IO[bytes], bad: set[int]) -> Iterator[str]:
+    """Decoded lines of `fp`. A line that is not UTF-8 is decoded with
+    replacement characters and its number added to `bad`, so one bad byte
+    fails its row instead of the rest of the file."""
+    for n, raw in enumerate(fp, start=1):
+        if n == 1 and raw.startswith(codecs.BOM_UTF8):
+            raw = raw[len(codecs.BOM_UTF8) :]
+        try:
+            yield raw.decode("utf-8")
+        except UnicodeDecodeError:
+            bad.add(n)
+            yield raw.decode("utf-8", errors="replace")
+
+
+def read_rows(fp: IO[bytes], fmt: str) -> Iterator[tuple[int, Optional[dict], Optional[str]]]:
+    """Yield (row number, fields or None, parse error or None).
+
+    Raises ValueError only for an unusable CSV header, before any row.
+    """
+    bad: set[int] = set()
+    lines = _lines(fp, bad)
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        fieldnames = reader.fieldnames or ()
+        if bad:
+            raise ValueError("CSV header is not valid UTF-8")
+        missing = {"serial_number", "name"} - set(fieldnames)
+        if missing:
+            raise ValueError(f"CSV header is missing: {', '.join(sorted(missing))}")
+        consumed = reader.line_num
+        for n, record in enumerate(reader, start=1):
+            # a quoted field may span several physical lines
+            span = range(consumed + 1, reader.line_num + 1)
+            consumed = reader.line_num
+            if not bad.isdisjoint(span):
+                yield n, None, "not valid UTF-8"
+                continue
+            yield n, {k.strip(): v for k, v in record.items() if k}, None
+        return
+    for n, line in enumerate(lines, start=1):
+        if n in bad:
+            yield n, None, "not valid UTF-8"
+            continue
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as exc:
+            yield n, None, f"invalid JSON: {exc}"
+            continue
+        if not isinstance(record, dict):
+            yield n, None, "expected a JSON object"
+            continue
+        yield n, record, None
+
+
+class _Lookups:
+    """Lower-cased name -> id maps, filled lazily per chunk."""
+
+    def __init__(self, db: Session, create_missing: bool) -> None:
+        self.db = db
+        self.create_missing = create_missing
+        self.ids: dict[str, dict[str, Optional[int]]] = {
+            "category": {},
+            "team": {},
+            "department": {},
+            "location": {},
+            "user": {},
+        }
+        self._originals: dict[str, dict[str, str]] = {}
+
+    def _load(self, kind: str, model, names: set[str]) -> None:
+        rows = self.db.execute(
+            select(func.lower(model.name), func.min(model.id))
+            .where(func.lower(model.name).in_(names))
+            .group_by(func.lower(model.name))
+        ).all()
+        found = dict(rows)
+        if self.create_missing and kind in CREATABLE and len(found) < len(names):
+            # names are unique per table, so concurrent imports cannot duplicate them
+            originals = self._originals[kind]
+            created = self.db.execute(
+                pg_insert(model)
+                .values([{"name": originals[n]} for n in names if n not in found])
+                .on_conflict_do_nothing(index_elements=["name"])
+                .returning(func.lower(model.name), model.id)
+            ).all()
+            found.update(dict(created))
+        for name in names:
+            self.ids[kind][name] = found.get(name)
+
+    def _load_users(self, names: set[str]) -> None:
+        rows = self.db.execute(
+            select(AppUser.id, func.lower(AppUser.email), func.lower(AppUser.full_name)).where(
+                or_(func.lower(AppUser.email).in_(names), func.lower(AppUser.full_name).in_(names))
+            )
+        ).all()
+        by_email = {email: uid for uid, email, _ in rows}
+        by_name: dict[str, list[int]] = {}
+        for uid, _, full_name in rows:
+            by_name.setdefault(full_name, []).append(uid)
+        for name in names:
+            if name in by_email:
+                self.ids["user"][name] = by_email[name]
+            elif len(by_name.get(name, [])) == 1:
+                self.ids["user"][name] = by_name[name][0]
+            elif name in by_name:
+                self.ids["user"][name] = AMBIGUOUS
+            else:
+                self.ids["user"][name] = None
+
+    def _load_locations(self, names: set[str]) -> None:
+        """Match a location name, optionally qualified by its parents, against
+        the tail of each location's name chain. Names repeat across the
+        hierarchy ("Line 1" in several buildings), so several matches are
+        ambiguous rather than an arbitrary pick."""
+        leaves = {name.rsplit("/", 1)[-1] for name in names}
+        candidates = self.db.execute(
+            select(Location.id, Location.path).where(func.lower(Location.name).in_(leaves))
+        ).all()
+        chain_ids = {
+            int(part) for _, path in candidates for part in path.strip("/").split("/") if part
+        }
+        names_by_id: dict[int, str] = {}
+        if chain_ids:
+            names_by_id = dict(
+                self.db.execute(
+                    select(Location.id, func.lower(Location.name)).where(Location.id.in_(chain_ids))
+                ).all()
+            )
+        chains = [
+            (loc_id, [names_by_id.get(int(part), "") for part in path.strip("/").split("/") if part])
+            for loc_id, path in candidates
+        ]
+        for name in names:
+            parts = name.split("/")
+            matches = [loc_id for loc_id, chain in chains if chain[-len(parts) :] == parts]
+            if len(matches) == 1:
+                self.ids["location"][name] = matches[0]
+            elif matches:
+                self.ids["location"][name] = AMBIGUOUS
+            else:
+                self.ids["location"][name] = None
+
+    def resolve(self, records: list[dict]) -> None:
+        wanted: dict[str, set[str]] = {kind: set() for kind in self.ids}
+        self._originals = {kind: {} for kind in CREATABLE}
+        for record in records:
+            for kind, column in (
+                ("category", "category"),
+                ("team", "team"),
+                ("department", "department"),
+                ("location", "location"),
+                ("user", "default_technician"),
+                ("user", "owner"),
+            ):
+                key = _key(record.get(column), kind)
+                if key and key not in self.ids[kind]:
+                    wanted[kind].add(key)
+                    if kind in CREATABLE:
+                        self._originals[kind][key] = str(record[column]).strip()
+        for kind, model in (
+            ("category", EquipmentCategory),
+            ("team", MaintenanceTeam),
+            ("department", Department),
+        ):
+            if wanted[kind]:
+                self._load(kind, model, wanted[kind])
+        if wanted["location"]:
+            self._load_locations(wanted["location"])
+        if wanted["user"]:
+            self._load_users(wanted["user"])
+
+    def get(self, kind: str, value) -> tuple[Optional[int], Optional[str]]:
+        key = _key(value, kind)
+        if key is None:
+            return None, None
+        found = self.ids[kind].get(key)
+        if found is None:
+            return None, f"unknown {kind} {value!r}"
+        if found == AMBIGUOUS and kind == "location":
+            return None, f"ambiguous location {value!r}; qualify it with its parents, e.g. 'Building A/Line 1'"
+        if found == AMBIGUOUS:
+            return None, f"ambiguous user {value!r}; use the email address"
+        return found, None
+
+
+def _date(value) -> Optional[date]:
+    if value in (None, ""):
+        return None
+    return date.fromisoformat(str(value).strip())
+
+
+def _build(record: dict, lookups: _Lookups) -> tuple[Optional[dict], Optional[str]]:
+    serial = _serial(record) or ""
+    name = str(record.get("name") or "").strip()
+    if not serial:
+        return None, "serial_number is required"
+    if not name:
+        return None, "name is required"
+
+    values = {"serial_number": serial, "name": name}
+    for column, kind, source, required in (
+        ("category_id", "category", "category", True),
+        ("maintenance_team_id", "team", "team", True),
+        ("default_technician_id", "user", "default_technician", True),
+        ("department_id", "department", "department", False),
+        ("owner_user_id", "user", "owner", False),
+        ("location_id", "location", "location", False),
+    ):
+        resolved, error = lookups.get(kind, record.get(source))
+        if error:
+            return None, error
+        if resolved is None and required:
+            return None, f"{source} is required"
+        values[column] = resolved
+    if values["department_id"] is None and values["owner_user_id"] is None:
+        return None, "department or owner is required"
+
+    try:
+        values["purchase_date"] = _date(record.get("purchase_date"))
+        values["warranty_end_date"] = _date(record.get("warranty_end_date"))
+    except ValueError:
+        return None, "dates must be YYYY-MM-DD"
+    values["warranty_vendor"] = (str(record.get("warranty_vendor") or "").strip()) or None
+    return values, None
+
+
+def _flush(db: Session, chunk: list[tuple[int, dict]], lookups: _Lookups, report: ImportReport) -> None:
+    lookups.resolve([record for _, record in chunk])
+    by_serial: dict[str, tuple[int, dict]] = {}
+    for n, record in chunk:
+        values, error = _build(record, lookups)
+        if error:
+            report.error(n, _serial(record), error)
+            continue
+        previous = by_serial.get(values["serial_number"])
+        if previous:
+            # ON CONFLICT cannot touch the same row twice in one statement
+            report.error(previous[0], values["serial_number"], "duplicate serial_number; later row wins")
+        by_serial[values["serial_number"]] = (n, values)
+    if not by_serial:
+        db.commit()  # keep lookup rows created for this chunk
+        return
+
+    stmt = pg_insert(Equipment).values([values for _, values in by_serial.values()])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Equipment.serial_number],
+        set_={
+            **{column: stmt.excluded[column] for column in UPSERT_COLUMNS},
+            "updated_at": func.now(),
+        },
+    ).returning(literal_column("xmax = 0").label("inserted"))
+    try:
+        inserted = db.execute(stmt).scalars().all()
+        db.commit()
+    except SQLAlchemyError as exc:
+        db.rollback()
+        message = str(getattr(exc, "orig", exc)).splitlines()[0]
+        for n, values in by_serial.values():
+            report.error(n, values["serial_number"], f"chunk rejected: {message}")
+        # cached ids may refer to lookup rows that were just rolled back
+        lookups.ids = {kind: {} for kind in lookups.ids}
+        return
+    created = sum(1 for flag in inserted if flag)
+    report.created += created
+    report.updated += len(inserted) - created
+
+
+def import_equipment(db: Session, fp: IO[bytes], fmt: str, *, create_missing: bool = False) -> ImportReport:
+    report = ImportReport()
+    lookups = _Lookups(db, create_missing)
+    chunk: list[tuple[int, dict]] = []
+    for n, record, error in read_rows(fp, fmt):
+        if error:
+            report.error(n, None, error)
+            continue
+        chunk.append((n, record))
+        if len(chunk) >= settings.import_chunk_size:
+            _flush(db, chunk, lookups, report)
+            chunk = []
+    if chunk:
+        _flush(db, chunk, lookups, report)
+    return report
@@ -0,0 +1,87 @@
+"""Minimal RFC 5545 writer for the preventive maintenance feed.
+
+Only what GET /requests/calendar.ics needs: a VCALENDAR wrapper and one
+VEVENT per request, with text escaping and 75-octet line folding.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+PRODID = "-//GearGuard//Maintenance Schedule//EN"
+# requests scheduled without an end show as one-hour events
+DEFAULT_DURATION = timedelta(hours=1)
+
+
+def _escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Split a content line into 75-octet pieces joined by CRLF + space,
+    never inside a UTF-8 sequence."""
+    raw = line.encode("utf-8")
+    if len(raw) <= 75:
+        return line + "\r\n"
+    parts = []
+    start, limit = 0, 75
+    while start < len(raw):
+        end = min(start + limit, len(raw))
+        while end < len(raw) and raw[end] & 0xC0 == 0x80:
+            end -= 1
+        parts.append(raw[start:end].decode("utf-8"))
+        start, limit = end, 74  # continuation lines start with the space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _utc(value: datetime) -> str:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def header(name: str) -> str:
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(name)}",
+    ]
+    return "".join(_fold(line) for line in lines)
+
+
+def footer() -> str:
+    return "END:VCALENDAR\r\n"
+
+
+def event(
+    *,
+    uid: str,
+    start: datetime,
+    end: Optional[datetime],
+    summary: str,
+    description_lines: Iterable[str],
+    updated_at: datetime,
+    sequence: int,
+    cancelled: bool = False,
+) -> str:
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{_utc(updated_at)}",
+        f"LAST-MODIFIED:{_utc(updated_at)}",
+        f"SEQUENCE:{sequence}",
+        f"DTSTART:{_utc(start)}",
+        f"DTEND:{_utc(end if end and end > start else start + DEFAULT_DURATION)}",
+        f"SUMMARY:{_escape(summary)}",
+        f"DESCRIPTION:{_escape(chr(10).join(description_lines))}",
+        f"STATUS:{'CANCELLED' if cancelled else 'CONFIRMED'}",
+        "END:VEVENT",
+    ]
+    return "".join(_fold(line) for line in lines)
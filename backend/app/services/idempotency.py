@@ -0,0 +1,110 @@
+"""Idempotency-key store backing app.core.idempotency.
+
+Each helper opens its own short session so the middleware can call them from
+the threadpool around the request without holding a connection while the
+handler runs.
+"""
+from datetime import datetime, timedelta, timezone
+from typing import NamedTuple, Optional
+
+from sqlalchemy import delete, func, null, or_, select, true, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import IdempotencyKey
+from app.db.session import SessionLocal
+
+
+class StoredResponse(NamedTuple):
+    route: str
+    request_hash: Optional[str]
+    status_code: Optional[int]  # None while the original is still running
+    headers: list[list[str]]
+    body: bytes
+
+
+def claim(user_id: int, key: str, route: str) -> bool:
+    """Reserve the key for this request. False if a live entry already exists.
+
+    Expired entries, and claims abandoned by a crashed worker, are taken over
+    in the same statement.
+    """
+    now = datetime.now(timezone.utc)
+    stmt = pg_insert(IdempotencyKey).values(
+        user_id=user_id,
+        key=key,
+        route=route,
+        expires_at=now + timedelta(seconds=settings.idempotency_ttl_seconds),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[IdempotencyKey.user_id, IdempotencyKey.key],
+        set_={
+            "route": stmt.excluded.route,
+            "request_hash": null(),
+            "status_code": null(),
+            "response_headers": null(),
+            "response_body": null(),
+            "created_at": func.now(),
+            "expires_at": stmt.excluded.expires_at,
+        },
+        where=or_(
+            IdempotencyKey.expires_at < func.now(),
+            IdempotencyKey.status_code.is_(None)
+            & (IdempotencyKey.created_at < now - timedelta(seconds=settings.idempotency_lock_seconds)),
+        ),
+    ).returning(true())
+    with SessionLocal() as db:
+        claimed = db.execute(stmt).first() is not None
+        db.commit()
+    return claimed
+
+
+def load(user_id: int, key: str) -> Optional[StoredResponse]:
+    with SessionLocal() as db:
+        row = db.execute(
+            select(
+                IdempotencyKey.route,
+                IdempotencyKey.request_hash,
+                IdempotencyKey.status_code,
+                IdempotencyKey.response_headers,
+                IdempotencyKey.response_body,
+            ).where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+        ).first()
+    if row is None:
+        return None
+    return StoredResponse(row[0], row[1], row[2], row[3] or [], row[4] or b"")
+
+
+def complete(
+    user_id: int, key: str, request_hash: str, status_code: int, headers: list[list[str]], body: bytes
+) -> None:
+    with SessionLocal() as db:
+        db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            .values(
+                request_hash=request_hash,
+                status_code=status_code,
+                response_headers=headers,
+                response_body=body,
+            )
+        )
+        db.commit()
+
+
+def release(user_id: int, key: str) -> None:
+    """Forget a claim whose outcome should not be replayed, so a retry runs again."""
+    with SessionLocal() as db:
+        db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id, IdempotencyKey.key == key
+            )
+        )
+        db.commit()
+
+
+def purge_expired(db: Session) -> int:
+    result = db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < func.now()))
+    db.commit()
+    return result.rowcount
@@ -0,0 +1,30 @@
+"""Handlers for background job kinds. Imported by the job worker."""
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+
+from app.db.models import Equipment
+from app.services import rollups
+from app.services.jobs import handler
+
+
+@handler("equipment.scrap")
+def mark_equipment_unusable(db: Session, payload: dict) -> None:
+    """Scrap side effect of a request: take its equipment out of service.
+
+    update_stage now does this in the scrap statement itself; the handler
+    stays for jobs queued before that change."""
+    db.execute(
+        update(Equipment)
+        .where(Equipment.id == payload["equipment_id"])
+        .values(
+            status="unusable",
+            unusable_reason=f"Request {payload['request_id']} moved to scrap",
+            unusable_at=func.now(),
+        )
+    )
+
+
+@handler("rollups.rebuild")
+def rebuild_rollups(db: Session, payload: dict) -> None:
+    rollups.rebuild(db)
+    rollups.rebuild_reliability(db)
@@ -0,0 +1,154 @@
+"""Postgres-backed background jobs.
+
+`enqueue` adds a row to the caller's session, so the job commits (or rolls
+back) together with the business write. Workers (app.scripts.job_worker)
+claim ready rows with FOR UPDATE SKIP LOCKED, so any number of them can run
+side by side without a broker. A handler's writes and the deletion of its
+job commit in one transaction; failures are retried with exponential
+backoff until max_attempts, after which the job is parked as `dead`.
+"""
+import random
+import traceback
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, NamedTuple, Optional
+
+from sqlalchemy import case, delete, func, literal_column, select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import BackgroundJob
+
+Handler = Callable[[Session, dict], None]
+
+# inlined rather than bound so the partial indexes' predicates always match
+QUEUED = literal_column("'queued'")
+RUNNING = literal_column("'running'")
+
+_handlers: dict[str, Handler] = {}
+
+
+class ClaimedJob(NamedTuple):
+    id: int
+    kind: str
+    payload: dict
+    attempts: int
+    max_attempts: int
+
+
+def handler(kind: str) -> Callable[[Handler], Handler]:
+    """Register the function that runs jobs of `kind`."""
+
+    def register(fn: Handler) -> Handler:
+        _handlers[kind] = fn
+        return fn
+
+    return register
+
+
+def enqueue(
+    db: Session,
+    kind: str,
+    payload: Optional[dict[str, Any]] = None,
+    *,
+    run_at: Optional[datetime] = None,
+    max_attempts: Optional[int] = None,
+) -> BackgroundJob:
+    """Queue a job in the current transaction; it becomes visible on commit."""
+    job = BackgroundJob(
+        kind=kind,
+        payload=payload or {},
+        max_attempts=max_attempts or settings.job_max_attempts,
+    )
+    if run_at is not None:
+        job.run_at = run_at
+    db.add(job)
+    return job
+
+
+def backoff(attempts: int) -> timedelta:
+    # jitter keeps retries of a burst of failures from landing together
+    ceiling = min(
+        settings.job_backoff_max_seconds,
+        settings.job_backoff_seconds * 2 ** max(attempts - 1, 0),
+    )
+    return timedelta(seconds=random.uniform(ceiling / 2, ceiling))
+
+
+def claim(db: Session, *, worker: str, limit: int) -> list[ClaimedJob]:
+    """Mark up to `limit` ready jobs as running for `worker` and commit."""
+    ready = (
+        select(BackgroundJob.id)
+        .where(BackgroundJob.status == QUEUED, BackgroundJob.run_at <= func.now())
+        .order_by(BackgroundJob.run_at, BackgroundJob.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    rows = db.execute(
+        update(BackgroundJob)
+        .where(BackgroundJob.id.in_(ready))
+        .values(
+            status="running",
+            locked_at=func.now(),
+            locked_by=worker,
+            attempts=BackgroundJob.attempts + 1,
+        )
+        .returning(
+            BackgroundJob.id,
+            BackgroundJob.kind,
+            BackgroundJob.payload,
+            BackgroundJob.attempts,
+            BackgroundJob.max_attempts,
+        )
+    ).all()
+    db.commit()
+    return sorted((ClaimedJob(*r) for r in rows), key=lambda j: j.id)
+
+
+def requeue_stale(db: Session) -> tuple[int, int]:
+    """Return jobs whose worker died mid-run to the queue, or park them as
+    dead once they have used their attempts: a job that kills its worker
+    (OOM, segfault) never reaches run()'s own dead-letter check.
+    Returns (requeued, dead)."""
+    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.job_lock_timeout_seconds)
+    exhausted = BackgroundJob.attempts >= BackgroundJob.max_attempts
+    statuses = db.execute(
+        update(BackgroundJob)
+        .where(BackgroundJob.status == RUNNING, BackgroundJob.locked_at < cutoff)
+        .values(
+            status=case((exhausted, literal_column("'dead'")), else_=QUEUED),
+            locked_at=None,
+            locked_by=None,
+            run_at=func.now(),
+            last_error=f"worker stopped mid-run (lock older than {settings.job_lock_timeout_seconds}s)",
+        )
+        .returning(BackgroundJob.status)
+    ).scalars().all()
+    db.commit()
+    dead = statuses.count("dead")
+    return len(statuses) - dead, dead
+
+
+def run(db: Session, job: ClaimedJob) -> bool:
+    """Execute one claimed job. Returns True on success."""
+    fn = _handlers.get(job.kind)
+    try:
+        if fn is None:
+            raise LookupError(f"no handler registered for job kind {job.kind!r}")
+        fn(db, job.payload)
+        db.execute(delete(BackgroundJob).where(BackgroundJob.id == job.id))
+        db.commit()
+        return True
+    except Exception:
+        db.rollback()
+        error = traceback.format_exc(limit=5)
+
+    values: dict[str, Any] = {"locked_at": None, "locked_by": None, "last_error": error}
+    if job.attempts >= job.max_attempts or fn is None:
+        values["status"] = "dead"
+    else:
+        values["status"] = "queued"
+        values["run_at"] = func.now() + backoff(job.attempts)
+    db.execute(update(BackgroundJob).where(BackgroundJob.id == job.id).values(**values))
+    db.commit()
+    return False
@@ -0,0 +1,101 @@
+"""Process-wide id -> name cache for reference tables.
+
+Teams, users, departments, categories and locations are small and change
+rarely, so each worker keeps their names in memory. Statement-level triggers
+bump a per-table counter in ref_version on every write, from any process;
+workers poll those counters at most every `refcache_poll_seconds` and reload
+only the tables whose counter moved, which bounds staleness across workers.
+Writers in this process call `invalidate()` to see their own change at once.
+"""
+import threading
+import time
+from typing import Iterable, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import (
+    AppUser,
+    Department,
+    EquipmentCategory,
+    Location,
+    MaintenanceTeam,
+    RefVersion,
+)
+
+# kind -> (model, name column)
+KINDS = {
+    "team": (MaintenanceTeam, MaintenanceTeam.name),
+    "user": (AppUser, AppUser.full_name),
+    "department": (Department, Department.name),
+    "category": (EquipmentCategory, EquipmentCategory.name),
+    "location": (Location, Location.name),
+}
+
+
+class RefCache:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._names: dict[str, dict[int, str]] = {}
+        self._versions: dict[str, int] = {}
+        self._checked_at: Optional[float] = None
+
+    def _load(self, db: Session, kind: str) -> dict[int, str]:
+        model, name = KINDS[kind]
+        return dict(db.execute(select(model.id, name)).all())
+
+    def refresh(self, db: Session) -> None:
+        """Reload every kind whose table version changed since the last load."""
+        versions = dict(db.execute(select(RefVersion.table_name, RefVersion.version)).all())
+        stale = [
+            kind
+            for kind, (model, _) in KINDS.items()
+            if kind not in self._names
+            or versions.get(model.__tablename__, 0) != self._versions.get(kind)
+        ]
+        loaded = {kind: self._load(db, kind) for kind in stale}
+        with self._lock:
+            for kind, names in loaded.items():
+                self._names[kind] = names
+                self._versions[kind] = versions.get(KINDS[kind][0].__tablename__, 0)
+            self._checked_at = time.monotonic()
+
+    def _ensure_fresh(self, db: Session) -> None:
+        checked_at = self._checked_at
+        if checked_at is None or time.monotonic() - checked_at > settings.refcache_poll_seconds:
+            self.refresh(db)
+
+    def invalidate(self, kind: Optional[str] = None) -> None:
+        """Drop one kind (or all) so the next lookup reloads it."""
+        with self._lock:
+            if kind is None:
+                self._names.clear()
+            else:
+                self._names.pop(kind, None)
+            self._checked_at = None
+
+    def get(self, db: Session, kind: str, ref_id: Optional[int]) -> Optional[str]:
+        if ref_id is None:
+            return None
+        return self.get_many(db, kind, [ref_id]).get(ref_id)
+
+    def get_many(self, db: Session, kind: str, ids: Iterable[Optional[int]]) -> dict[int, str]:
+        """Names for `ids`; ids unknown to the cache (e.g. rows created in the
+        last poll interval) are fetched in one query and kept."""
+        self._ensure_fresh(db)
+        wanted = {i for i in ids if i is not None}
+        names = self._names.get(kind, {})
+        found = {i: names[i] for i in wanted if i in names}
+        missing = wanted - found.keys()
+        if missing:
+            model, name = KINDS[kind]
+            fetched = dict(db.execute(select(model.id, name).where(model.id.in_(missing))).all())
+            if fetched:
+                with self._lock:
+                    self._names.setdefault(kind, {}).update(fetched)
+                found.update(fetched)
+        return found
+
+
+refcache = RefCache()
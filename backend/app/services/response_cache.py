@@ -0,0 +1,218 @@
+"""Cache of serialized list responses, invalidated by table versions.
+
+Some list endpoints return the same body for every caller with the same
+filters until one of a few tables changes. Those tables have write counters
+in ref_version, bumped by triggers whatever process does the write. A lookup
+reads the current counters (one primary-key query) and folds them into the
+cache key along with the endpoint, the caller's visibility scope and the
+normalized filters. A write therefore makes the older entries unreachable,
+and they age out of the LRU. No explicit invalidation is needed, and a
+process sees another process's write on its next lookup.
+
+Backends:
+
+* memory: per-worker LRU bounded by entry count and total bytes
+* file: one file per entry, pruned oldest first. With response_cache_dir on
+  a tmpfs such as /dev/shm, every worker on a host shares the entries.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Iterable, Optional
+
+from fastapi.responses import JSONResponse, Response
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.db.models import RefVersion
+from app.services.refcache import refcache
+
+
+class MemoryBackend:
+    name = "memory"
+
+    def __init__(self, max_entries: int, max_bytes: int) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            body = self._entries.get(key)
+            if body is not None:
+                self._entries.move_to_end(key)
+            return body
+
+    def set(self, key: str, body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = body
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def size(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes}
+
+
+class FileBackend:
+    name = "file"
+    PRUNE_EVERY = 64  # writes
+
+    def __init__(self, directory: str, max_entries: int) -> None:
+        self.directory = Path(directory)
+        self.max_entries = max_entries
+        self._writes = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[bytes]:
+        path = self.directory / key
+        try:
+            body = path.read_bytes()
+            os.utime(path)  # recency for pruning
+        except FileNotFoundError:
+            return None
+        return body
+
+    def set(self, key: str, body: bytes) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        tmp = self.directory / f".{key}.{os.getpid()}.tmp"
+        tmp.write_bytes(body)
+        os.replace(tmp, self.directory / key)  # readers never see a partial file
+        self._writes += 1
+        if self._writes % self.PRUNE_EVERY == 0:
+            self._prune()
+
+    def _entries(self) -> list[os.DirEntry]:
+        try:
+            with os.scandir(self.directory) as it:
+                return [e for e in it if e.is_file() and not e.name.startswith(".")]
+        except FileNotFoundError:
+            return []
+
+    def _prune(self) -> None:
+        entries = self._entries()
+        excess = len(entries) - self.max_entries
+        if excess <= 0:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:excess]:
+            try:
+                os.unlink(entry.path)
+                self.evictions += 1
+            except FileNotFoundError:
+                pass  # pruned by another worker
+
+    def size(self) -> dict:
+        entries = self._entries()
+        return {"entries": len(entries), "bytes": sum(e.stat().st_size for e in entries)}
+
+
+def _backend():
+    if settings.response_cache_backend == "off":
+        return None
+    if settings.response_cache_backend == "file":
+        return FileBackend(settings.response_cache_dir, settings.response_cache_max_entries)
+    return MemoryBackend(settings.response_cache_max_entries, settings.response_cache_max_bytes)
+
+
+class ResponseCache:
+    def __init__(self, backend) -> None:
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._counters: dict[str, dict[str, int]] = {}
+
+    def _count(self, name: str, outcome: str) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(name, {"hits": 0, "misses": 0})
+            counters[outcome] += 1
+
+    def versioned_key(
+        self, db: Session, name: str, *, tables: Iterable[str], scope: str, params: dict
+    ) -> tuple[str, Optional[datetime]]:
+        """(cache key, time of the latest write to any of `tables`).
+
+        The key changes whenever one of the tables is written, so it also
+        serves as an ETag.
+        """
+        tables = sorted(tables)
+        found = {
+            table: (version, updated_at)
+            for table, version, updated_at in db.execute(
+                select(RefVersion.table_name, RefVersion.version, RefVersion.updated_at).where(
+                    RefVersion.table_name.in_(tables)
+                )
+            ).all()
+        }
+        versions = [found.get(t, (0, None))[0] for t in tables]
+        raw = json.dumps([name, scope, params, versions], sort_keys=True, default=str)
+        changed = [updated_at for _, updated_at in found.values() if updated_at is not None]
+        return f"{name}-{hashlib.sha256(raw.encode()).hexdigest()}", max(changed, default=None)
+
+    def get(self, name: str, key: str) -> Optional[bytes]:
+        if self.backend is None:
+            return None
+        body = self.backend.get(key)
+        self._count(name, "hits" if body is not None else "misses")
+        return body
+
+    def put(self, key: str, body: bytes) -> None:
+        if self.backend is not None:
+            self.backend.set(key, body)
+
+    def respond(
+        self,
+        db: Session,
+        name: str,
+        *,
+        tables: Iterable[str],
+        scope: str,
+        params: dict,
+        build: Callable[[], object],
+    ) -> Response:
+        """JSON response for `name` with `params`, from cache when none of
+        `tables` changed since it was stored; otherwise `build()` the JSON
+        content and store it. The X-Cache header says which happened."""
+        if self.backend is None:
+            return JSONResponse(content=build())
+        key, _ = self.versioned_key(db, name, tables=tables, scope=scope, params=params)
+        body = self.get(name, key)
+        if body is not None:
+            return Response(content=body, media_type="application/json", headers={"X-Cache": "hit"})
+        # build() may resolve names through refcache, which can trail the
+        # versions in the key by refcache_poll_seconds; catch it up first so
+        # no entry holds names older than its key
+        refcache.refresh(db)
+        response = JSONResponse(content=build(), headers={"X-Cache": "miss"})
+        self.put(key, response.body)
+        return response
+
+    def stats(self) -> dict:
+        with self._lock:
+            endpoints = {name: dict(c) for name, c in self._counters.items()}
+        if self.backend is None:
+            return {"backend": "off", "endpoints": endpoints}
+        return {
+            "backend": self.backend.name,
+            "evictions": self.backend.evictions,
+            **self.backend.size(),
+            "endpoints": endpoints,
+        }
+
+
+response_cache = ResponseCache(_backend())
@@ -0,0 +1,286 @@
+"""Incremental maintenance of the request KPI rollup tables."""
+from datetime import date, datetime, time, timedelta, timezone
+from decimal import ROUND_HALF_UP, Decimal
+from typing import Optional
+
+from sqlalchemy import delete, func, insert, literal_column, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.orm import Session
+
+from app.db.models import (
+    EquipmentReliabilityDaily,
+    MaintenanceRequest,
+    MaintenanceRequestArchive,
+    RequestStageRollup,
+)
+
+_KEY = ["day", "team_id", "equipment_category_id", "stage_id", "location_id"]
+
+
+def rollup_day(created_at: Optional[datetime]) -> date:
+    if created_at is None:
+        return datetime.now(timezone.utc).date()
+    if created_at.tzinfo is not None:
+        created_at = created_at.astimezone(timezone.utc)
+    return created_at.date()
+
+
+def _apply(db: Session, deltas: list[tuple[tuple, int, Optional[Decimal]]]) -> None:
+    """Upsert (key, count delta, duration) changes in a single statement."""
+    merged: dict[tuple, list] = {}
+    for key, count, duration in deltas:
+        cell = merged.setdefault(key, [0, Decimal(0), 0])
+        cell[0] += count
+        if duration is not None:
+            cell[1] += duration * count
+            cell[2] += count
+    rows = [
+        dict(zip(_KEY, key), request_count=n, duration_hours_sum=hours, duration_count=hours_n)
+        for key, (n, hours, hours_n) in merged.items()
+        if n or hours or hours_n
+    ]
+    if not rows:
+        return
+    stmt = pg_insert(RequestStageRollup).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=_KEY,
+        set_={
+            "request_count": RequestStageRollup.request_count + stmt.excluded.request_count,
+            "duration_hours_sum": RequestStageRollup.duration_hours_sum
+            + stmt.excluded.duration_hours_sum,
+            "duration_count": RequestStageRollup.duration_count + stmt.excluded.duration_count,
+        },
+    )
+    db.execute(stmt)
+
+
+def _key(req, stage_id: int) -> tuple:
+    return (
+        rollup_day(req.created_at),
+        req.team_id,
+        req.equipment_category_id,
+        stage_id,
+        req.location_id,
+    )
+
+
+def record_created(db: Session, req: MaintenanceRequest) -> None:
+    """Count a newly inserted request; call inside the creating transaction."""
+    _apply(db, [(_key(req, req.stage_id), 1, req.actual_duration_hours)])
+    if req.request_type == "corrective":
+        day = rollup_day(req.created_at)
+        _apply_reliability(db, {(req.equipment_id, day): {"failure_count": 1}})
+
+
+def record_transition(
+    db: Session,
+    req,
+    *,
+    old_stage_id: int,
+    old_duration: Optional[Decimal],
+) -> None:
+    """Move a request from its previous rollup cell to its current one.
+
+    `req` is a MaintenanceRequest or any row exposing the same attributes.
+    """
+    if old_stage_id == req.stage_id and old_duration == req.actual_duration_hours:
+        return
+    _apply(
+        db,
+        [
+            (_key(req, old_stage_id), -1, old_duration),
+            (_key(req, req.stage_id), 1, req.actual_duration_hours),
+        ],
+    )
+
+
+_RELIABILITY_SUMS = (
+    "failure_count",
+    "repair_count",
+    "repair_hours_sum",
+    "repair_hours_count",
+    "restore_hours_sum",
+    "downtime_hours",
+)
+_CENT = Decimal("0.01")
+
+
+def _utc(ts: datetime) -> datetime:
+    return ts.astimezone(timezone.utc) if ts.tzinfo else ts.replace(tzinfo=timezone.utc)
+
+
+def _hours(delta: timedelta) -> Decimal:
+    return (Decimal(delta.total_seconds()) / 3600).quantize(_CENT, ROUND_HALF_UP)
+
+
+def downtime_by_day(start: datetime, end: datetime) -> list[tuple[date, Decimal]]:
+    """Split [start, end) into hours per UTC day."""
+    start, end = _utc(start), _utc(end)
+    pieces = []
+    day = start.date()
+    while day <= end.date():
+        day_start = datetime.combine(day, time.min, tzinfo=timezone.utc)
+        lo, hi = max(start, day_start), min(end, day_start + timedelta(days=1))
+        if hi > lo:
+            pieces.append((day, _hours(hi - lo)))
+        day += timedelta(days=1)
+    return pieces
+
+
+def _add_repair(cells: dict, equipment_id: int, created_at, repaired_at, duration, sign: int) -> None:
+    # repairs without a timestamp (legacy rows) are booked on the failure day
+    # and carry no restore time or downtime, matching rebuild_reliability()
+    day = rollup_day(repaired_at or created_at)
+    cell = cells.setdefault((equipment_id, day), {})
+    cell["repair_count"] = cell.get("repair_count", 0) + sign
+    if duration is not None:
+        cell["repair_hours_sum"] = cell.get("repair_hours_sum", 0) + sign * duration
+        cell["repair_hours_count"] = cell.get("repair_hours_count", 0) + sign
+    if repaired_at is None:
+        return
+    restore = _hours(_utc(repaired_at) - _utc(created_at))
+    cell["restore_hours_sum"] = cell.get("restore_hours_sum", 0) + sign * restore
+    for down_day, hours in downtime_by_day(created_at, repaired_at):
+        down = cells.setdefault((equipment_id, down_day), {})
+        down["downtime_hours"] = down.get("downtime_hours", 0) + sign * hours
+
+
+def _apply_reliability(db: Session, cells: dict[tuple[int, date], dict]) -> None:
+    rows = [
+        {"equipment_id": eq, "day": day, **{k: delta.get(k, 0) for k in _RELIABILITY_SUMS}}
+        for (eq, day), delta in cells.items()
+        if any(delta.values())
+    ]
+    if not rows:
+        return
+    stmt = pg_insert(EquipmentReliabilityDaily).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["equipment_id", "day"],
+        set_={
+            k: getattr(EquipmentReliabilityDaily, k) + stmt.excluded[k]
+            for k in _RELIABILITY_SUMS
+        },
+    )
+    db.execute(stmt)
+
+
+def record_repair(
+    db: Session,
+    req,
+    *,
+    was_repaired: bool,
+    is_repaired: bool,
+    old_repaired_at: Optional[datetime],
+    old_duration: Optional[Decimal],
+) -> None:
+    """Book a corrective request entering, leaving or re-entering repaired.
+
+    `req` carries the post-update request_type, equipment_id, created_at,
+    repaired_at and actual_duration_hours.
+    """
+    if req.request_type != "corrective" or not (was_repaired or is_repaired):
+        return
+    cells: dict = {}
+    if was_repaired:
+        _add_repair(cells, req.equipment_id, req.created_at, old_repaired_at, old_duration, -1)
+    if is_repaired:
+        _add_repair(
+            cells, req.equipment_id, req.created_at, req.repaired_at, req.actual_duration_hours, 1
+        )
+    _apply_reliability(db, cells)
+
+
+def rebuild(db: Session) -> int:
+    """Recompute every rollup row from live and archived requests. Returns row count."""
+    history = union_all(
+        *[
+            select(
+                t.created_at,
+                t.team_id,
+                t.equipment_category_id,
+                t.stage_id,
+                t.location_id,
+                t.actual_duration_hours,
+            )
+            for t in (MaintenanceRequest, MaintenanceRequestArchive)
+        ]
+    ).subquery()
+    day = func.date(func.timezone(literal_column("'UTC'"), history.c.created_at))
+    source = select(
+        day,
+        history.c.team_id,
+        history.c.equipment_category_id,
+        history.c.stage_id,
+        history.c.location_id,
+        func.count(),
+        func.coalesce(func.sum(history.c.actual_duration_hours), 0),
+        func.count(history.c.actual_duration_hours),
+    ).group_by(
+        day,
+        history.c.team_id,
+        history.c.equipment_category_id,
+        history.c.stage_id,
+        history.c.location_id,
+    )
+    db.execute(delete(RequestStageRollup))
+    db.execute(
+        insert(RequestStageRollup).from_select(
+            _KEY + ["request_count", "duration_hours_sum", "duration_count"], source
+        )
+    )
+    return db.execute(select(func.count()).select_from(RequestStageRollup)).scalar_one()
+
+
+# "repaired" is any closed, non-scrap stage; see record_repair's callers
+_RELIABILITY_REBUILD_SQL = """
+WITH history AS (
+    SELECT equipment_id, stage_id, created_at, repaired_at, actual_duration_hours
+    FROM maintenance_request WHERE request_type = 'corrective'
+    UNION ALL
+    SELECT equipment_id, stage_id, created_at, repaired_at, actual_duration_hours
+    FROM maintenance_request_archive WHERE request_type = 'corrective'
+),
+repaired AS (
+    SELECT h.equipment_id,
+           h.created_at AT TIME ZONE 'UTC' AS created_at,
+           h.repaired_at AT TIME ZONE 'UTC' AS repaired_at,
+           h.actual_duration_hours
+    FROM history h JOIN request_stage s ON s.id = h.stage_id
+    WHERE s.is_closed AND NOT s.is_scrap
+),
+cells AS (
+    SELECT equipment_id, (created_at AT TIME ZONE 'UTC')::date AS day,
+           1 AS failures, 0 AS repairs, 0::numeric AS repair_hours, 0 AS repair_hours_n,
+           0::numeric AS restore_hours, 0::numeric AS downtime
+    FROM history
+    UNION ALL
+    SELECT equipment_id, coalesce(repaired_at, created_at)::date,
+           0, 1, coalesce(actual_duration_hours, 0), (actual_duration_hours IS NOT NULL)::int,
+           coalesce(round(extract(epoch FROM repaired_at - created_at) / 3600, 2), 0), 0
+    FROM repaired
+    UNION ALL
+    SELECT r.equipment_id, d.day::date, 0, 0, 0, 0, 0,
+           round(extract(epoch FROM least(r.repaired_at, d.day + interval '1 day')
+                                    - greatest(r.created_at, d.day)) / 3600, 2)
+    FROM repaired r
+    CROSS JOIN LATERAL generate_series(
+        date_trunc('day', r.created_at), r.repaired_at, interval '1 day'
+    ) AS d(day)
+    WHERE r.repaired_at > r.created_at AND r.repaired_at > d.day
+)
+INSERT INTO equipment_reliability_daily (
+    equipment_id, day, failure_count, repair_count, repair_hours_sum,
+    repair_hours_count, restore_hours_sum, downtime_hours
+)
+SELECT equipment_id, day, sum(failures), sum(repairs), sum(repair_hours),
+       sum(repair_hours_n), sum(restore_hours), sum(downtime)
+FROM cells
+GROUP BY equipment_id, day
+"""
+
+
+def rebuild_reliability(db: Session) -> int:
+    """Recompute equipment_reliability_daily from live and archived requests."""
+    db.execute(delete(EquipmentReliabilityDaily))
+    db.execute(text(_RELIABILITY_REBUILD_SQL))
+    return db.execute(select(func.count()).select_from(EquipmentReliabilityDaily)).scalar_one()
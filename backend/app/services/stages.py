@@ -0,0 +1,14 @@
+"""Request stage names as the API reports them."""
+
+
+def normalize_stage_name(name: str) -> str:
+    """Map a request_stage name ("In Progress", "Scrapped", ...) to its API
+    key: new, in_progress, repaired or scrap; other names are lower-cased."""
+    lowered = name.lower()
+    if lowered in ("new", "in progress", "in_progress", "in-progress"):
+        return "in_progress" if "progress" in lowered else "new"
+    if lowered.startswith("repaired"):
+        return "repaired"
+    if lowered.startswith("scrap"):
+        return "scrap"
+    return lowered
@@ -0,0 +1,47 @@
+"""Cold-start cost of the API process and of the boot script.
+
+Each sample is a fresh interpreter, as in a new container. Exits non-zero
+when the median app import time exceeds --target-ms.
+
+    python benchmarks/boot_time.py --runs 7 --target-ms 1500
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+import time
+
+STEPS = {
+    "import app.main": [sys.executable, "-c", "import app.main"],
+    "boot --check": [sys.executable, "-m", "app.scripts.boot", "--check"],
+}
+
+
+def _time(cmd: list[str]) -> float:
+    start = time.perf_counter()
+    subprocess.run(cmd, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return (time.perf_counter() - start) * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--target-ms", type=float, default=1500.0)
+    parser.add_argument("--skip-db", action="store_true", help="only time the app import")
+    args = parser.parse_args()
+
+    medians = {}
+    for name, cmd in STEPS.items():
+        if args.skip_db and name != "import app.main":
+            continue
+        samples = [_time(cmd) for _ in range(args.runs)]
+        medians[name] = statistics.median(samples)
+        print(f"{name:<16} median {medians[name]:7.1f} ms   min {min(samples):7.1f} ms")
+
+    if medians["import app.main"] > args.target_ms:
+        print(f"app import exceeds target of {args.target_ms:.0f} ms")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
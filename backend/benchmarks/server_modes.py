@@ -0,0 +1,92 @@
+"""Throughput of the dev server (uvicorn --reload) vs production (gunicorn workers).
+
+Run from backend/ with the database reachable:
+
+    python benchmarks/server_modes.py --path /health/db --requests 5000 --concurrency 32
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+MODES = {
+    "development": [
+        sys.executable, "-m", "uvicorn", "app.main:app",
+        "--host", "127.0.0.1", "--port", "{port}", "--reload",
+    ],
+    "production": [
+        sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py",
+        "--bind", "127.0.0.1:{port}", "app.main:app",
+    ],
+}
+
+
+def _wait_ready(base: str, timeout: float = 30.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"{base}/health", timeout=1).read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f"server at {base} did not become ready")
+
+
+def _hit(url: str) -> float:
+    start = time.perf_counter()
+    urllib.request.urlopen(url, timeout=30).read()
+    return time.perf_counter() - start
+
+
+def bench(mode: str, *, port: int, path: str, requests: int, concurrency: int) -> dict:
+    cmd = [part.format(port=port) for part in MODES[mode]]
+    env = dict(os.environ, APP_ENV=mode)
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        _wait_ready(base)
+        url = base + path
+        with ThreadPoolExecutor(concurrency) as pool:
+            list(pool.map(_hit, [url] * concurrency))  # warm-up
+            started = time.perf_counter()
+            latencies = sorted(pool.map(_hit, [url] * requests))
+            elapsed = time.perf_counter() - started
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    return {
+        "mode": mode,
+        "rps": requests / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default="/health/db")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+
+    for mode in MODES:
+        r = bench(
+            mode,
+            port=args.port,
+            path=args.path,
+            requests=args.requests,
+            concurrency=args.concurrency,
+        )
+        print(
+            f"{r['mode']:<12} {r['rps']:8.1f} req/s   "
+            f"p50 {r['p50_ms']:7.2f} ms   p99 {r['p99_ms']:7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
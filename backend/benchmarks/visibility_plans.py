@@ -0,0 +1,171 @@
+"""Check that request visibility queries use indexes on a scaled dataset.
+
+Inserts --rows synthetic requests (spread over the existing equipment, users
+and stages) inside a transaction, ANALYZEs, then EXPLAINs the statements the
+routes execute: the prebuilt list and calendar statements for a technician
+and a plain user, bound to their real ids, the open requests under one
+location subtree, and the Kanban board columns. Exits non-zero if any branch
+reads maintenance_request with a sequential scan. Everything is rolled back
+afterwards unless --keep is given.
+
+Run from backend/ against a seeded database:
+
+    python -m benchmarks.visibility_plans --rows 200000
+"""
+import argparse
+import json
+import sys
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+from typing import Optional
+
+from sqlalchemy import text
+
+from app.api.routes.locations import subtree_bounds
+from app.api.routes.requests import (
+    _board_statements,
+    _calendar_statement,
+    _list_statement,
+    _stage_map,
+)
+from app.db.models import MaintenanceRequest
+from app.db.session import SessionLocal
+
+INDEXED_SCANS = {"Index Scan", "Index Only Scan", "Bitmap Heap Scan", "Bitmap Index Scan"}
+
+SCALE_SQL = """
+WITH eq AS (
+    SELECT id, category_id, maintenance_team_id, location_id,
+           row_number() OVER (ORDER BY id) AS rn, count(*) OVER () AS n
+    FROM equipment
+),
+users AS (SELECT array_agg(id ORDER BY id) AS ids FROM app_user),
+techs AS (SELECT array_agg(id ORDER BY id) AS ids FROM app_user WHERE role = 'technician'),
+stages AS (SELECT array_agg(id ORDER BY sequence) AS ids, array_agg(is_closed ORDER BY sequence) AS closed FROM request_stage)
+INSERT INTO maintenance_request (
+    request_type, subject, equipment_id, equipment_category_id, team_id, location_id,
+    requester_id, assigned_to_id, stage_id, is_open, scheduled_start, created_at, updated_at
+)
+SELECT
+    CASE WHEN g % 3 = 0 THEN 'preventive' ELSE 'corrective' END,
+    'scaled request ' || g,
+    eq.id, eq.category_id, eq.maintenance_team_id, eq.location_id,
+    users.ids[1 + g % cardinality(users.ids)],
+    CASE WHEN g % 4 = 0 THEN NULL ELSE techs.ids[1 + g % cardinality(techs.ids)] END,
+    stages.ids[s.i], NOT stages.closed[s.i],
+    now() - make_interval(days => g % 720),
+    now() - make_interval(days => g % 720),
+    now() - make_interval(days => g % 720)
+FROM generate_series(1, :rows) AS g
+CROSS JOIN users CROSS JOIN techs CROSS JOIN stages
+-- mostly closed history with a thin open backlog, like a real install
+CROSS JOIN LATERAL (
+    SELECT CASE WHEN g % 10 < 7 THEN cardinality(stages.ids) - 1 + g % 2
+                ELSE 1 + g % 2 END AS i
+) AS s
+JOIN eq ON eq.rn = 1 + g % eq.n
+"""
+
+
+def _scans(plan: dict, table: str):
+    if plan.get("Relation Name") == table:
+        yield plan["Node Type"], plan.get("Index Name")
+    for child in plan.get("Plans", []):
+        yield from _scans(child, table)
+
+
+def _explain(db, stmt, params: Optional[dict] = None) -> list[tuple[str, str]]:
+    """Plan of `stmt` with its bound parameters, as the route sends it."""
+    compiled = stmt.compile(dialect=db.get_bind().dialect)
+    plan = (
+        db.connection()
+        .exec_driver_sql(
+            "EXPLAIN (FORMAT JSON) " + compiled.string, compiled.construct_params(params)
+        )
+        .scalar_one()
+    )
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return list(_scans(plan[0]["Plan"], MaintenanceRequest.__tablename__))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--keep", action="store_true", help="commit the synthetic rows")
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        stages = _stage_map(db)
+        tech_id = db.execute(
+            text(
+                "SELECT u.id FROM app_user u JOIN maintenance_team_member m ON m.user_id = u.id "
+                "WHERE u.role = 'technician' ORDER BY u.id LIMIT 1"
+            )
+        ).scalar()
+        user_id = db.execute(
+            text("SELECT id FROM app_user WHERE role = 'user' ORDER BY id LIMIT 1")
+        ).scalar()
+        if tech_id is None or user_id is None:
+            sys.exit("need at least one team technician and one user; run the seed scripts first")
+
+        db.execute(text(SCALE_SQL), {"rows": args.rows})
+        db.execute(text("ANALYZE maintenance_request"))
+
+        new_stage = stages["new"]
+        # GET /requests/calendar as the frontend calls it: the last 30 days on
+        start = {"start": datetime.now(timezone.utc) - timedelta(days=30)}
+        cases = {}
+        for role, viewer_id in (("technician", tech_id), ("user", user_id)):
+            viewer = {"viewer_id": viewer_id}
+            cases[f"list / {role}"] = (_list_statement(role, new_stage, None, None, False), viewer)
+            cases[f"calendar / {role}"] = (
+                _calendar_statement(role, new_stage, None, True, False),
+                {**viewer, **start},
+            )
+        # open requests under one building (a location with children)
+        building = db.execute(
+            text(
+                "SELECT p.path FROM location p WHERE EXISTS "
+                "(SELECT 1 FROM location c WHERE c.parent_id = p.id) ORDER BY p.path DESC LIMIT 1"
+            )
+        ).scalar()
+        if building:
+            lower, upper = subtree_bounds(building)
+            cases["open / location subtree"] = (
+                _list_statement("manager", new_stage, None, True, True),
+                {"viewer_id": 0, "subtree_lower": lower, "subtree_upper": upper},
+            )
+
+        technician = SimpleNamespace(id=tech_id, role="technician")
+        manager = SimpleNamespace(id=0, role="manager")
+        board_counts, board_cards = _board_statements(manager, stages, [], limit=25)
+        cases["board counts / manager"] = (board_counts, None)
+        cases["board cards / manager"] = (board_cards, None)
+        cases["board cards / technician"] = (
+            _board_statements(technician, stages, [], limit=25)[1],
+            None,
+        )
+
+        failed = False
+        for name, (stmt, params) in cases.items():
+            scans = _explain(db, stmt, params)
+            ok = all(node in INDEXED_SCANS for node, _ in scans)
+            failed |= not ok
+            detail = ", ".join(f"{node} ({index})" if index else node for node, index in scans)
+            print(f"{'ok  ' if ok else 'FAIL'} {name:<24} {detail}")
+
+        if args.keep:
+            db.commit()
+        else:
+            db.rollback()
+    finally:
+        db.close()
+
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""First-request vs steady-state latency of a fresh API process, with and
+without the startup warm-up (app.api.warmup).
+
+Each run starts a new uvicorn process, waits until it listens (the lifespan,
+and so the warm-up, has finished by then), then times the first few requests
+to --path as a technician and the median of --requests more. The "cold" run
+sets DB_WARM_CONNECTIONS=0, so it skips the warm-up.
+
+Run from backend/ against a seeded database:
+
+    python benchmarks/warm_start.py --path /requests --first 5 --requests 200
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+from sqlalchemy import text
+
+from app.core.security import create_access_token
+from app.db.session import SessionLocal
+
+MODES = {"cold": {"DB_WARM_CONNECTIONS": "0"}, "warm": {}}
+
+
+def _wait_listening(base: str, timeout: float = 60.0) -> float:
+    started = time.monotonic()
+    while time.monotonic() - started < timeout:
+        try:
+            urllib.request.urlopen(f"{base}/health", timeout=1).read()
+            return time.monotonic() - started
+        except OSError:
+            time.sleep(0.05)
+    raise RuntimeError(f"server at {base} did not start")
+
+
+def _hit(url: str, token: str) -> float:
+    request = urllib.request.Request(url, headers={"Authorization": f"Bearer {token}"})
+    start = time.perf_counter()
+    urllib.request.urlopen(request, timeout=30).read()
+    return (time.perf_counter() - start) * 1000
+
+
+def bench(mode: str, *, port: int, path: str, token: str, first: int, requests: int) -> dict:
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port)]
+    env = dict(os.environ, **MODES[mode])
+    proc = subprocess.Popen(cmd, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    try:
+        startup = _wait_listening(base)
+        url = base + path
+        # sequential, so each early request may need a new pool connection
+        firsts = [_hit(url, token) for _ in range(first)]
+        steady = sorted(_hit(url, token) for _ in range(requests))
+    finally:
+        proc.terminate()
+        proc.wait(timeout=30)
+    return {
+        "mode": mode,
+        "startup_s": startup,
+        "first_ms": firsts[0],
+        "early_max_ms": max(firsts),
+        "p50_ms": statistics.median(steady),
+        "p99_ms": steady[max(0, int(len(steady) * 0.99) - 1)],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--path", default="/requests")
+    parser.add_argument("--first", type=int, default=5, help="early requests reported separately")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--port", type=int, default=8101)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        user_id = db.execute(
+            text("SELECT id FROM app_user WHERE role = 'technician' ORDER BY id LIMIT 1")
+        ).scalar()
+    if user_id is None:
+        sys.exit("need a technician; run the seed scripts first")
+    token = create_access_token(user_id=user_id)
+
+    for mode in MODES:
+        r = bench(
+            mode, port=args.port, path=args.path, token=token, first=args.first, requests=args.requests
+        )
+        print(
+            f"{r['mode']:<5} startup {r['startup_s']:5.2f} s   first {r['first_ms']:7.2f} ms   "
+            f"early max {r['early_max_ms']:7.2f} ms   p50 {r['p50_ms']:6.2f} ms   p99 {r['p99_ms']:6.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
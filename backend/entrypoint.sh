@@ -1,11 +1,11 @@
 #!/bin/sh
 set -e
 
-# Apply migrations
-alembic -c /app/alembic.ini upgrade head
-
-# Seed demo users (ignore failures if already seeded)
-python -m app.scripts.seed_users || true
+# Apply migrations and seed demo users, skipping both when already done
+python -m app.scripts.boot
 
 # Start API
+if [ "${APP_ENV:-development}" = "production" ]; then
+  exec gunicorn -c /app/gunicorn.conf.py app.main:app
+fi
 exec uvicorn app.main:app --host 0.0.0.0 --port 8000 --reload
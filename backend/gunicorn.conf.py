@@ -0,0 +1,21 @@
+"""Production server settings: gunicorn managing uvicorn workers."""
+from app.core.config import settings, worker_count
+
+bind = "0.0.0.0:8000"
+worker_class = "uvicorn.workers.UvicornWorker"
+workers = worker_count()
+# Import the app once in the master so workers fork with it already loaded
+preload_app = True
+max_requests = settings.max_requests
+max_requests_jitter = settings.max_requests_jitter
+graceful_timeout = settings.graceful_timeout
+timeout = settings.graceful_timeout * 2
+accesslog = "-"
+
+
+def post_fork(server, worker):
+    # Pooled connections opened while preloading must not be shared across
+    # processes; each worker starts with an empty pool of its own.
+    from app.db.session import engine
+
+    engine.dispose(close=False)
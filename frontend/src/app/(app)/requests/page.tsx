@@ -1,20 +1,26 @@
 "use client";
 
-import { useEffect, useState } from "react";
-import { KanbanBoard } from "@/components/Kanban";
+import { useEffect, useRef, useState } from "react";
+import { ColumnTotals, KanbanBoard } from "@/components/Kanban";
 import { api } from "@/lib/api";
 import {
   RequestApiResponse,
+  RequestBoardColumn,
+  RequestBoardResponse,
   RequestCard,
+  RequestChangesResponse,
   RequestStage,
   RequestType,
 } from "@/lib/types";
 
 function mapRequest(r: RequestApiResponse): RequestCard {
+  // computed by the server when available; due_at defaults to scheduled_start
+  const dueAt = r.due_at ?? r.scheduled_start;
   const overdue =
-    !!r.scheduled_start &&
-    ["new", "in_progress"].includes(r.stage) &&
-    new Date(r.scheduled_start) < new Date();
+    r.overdue ??
+    (!!dueAt &&
+      ["new", "in_progress"].includes(r.stage) &&
+      new Date(dueAt) < new Date());
 
   return {
     id: r.id,
@@ -28,20 +34,74 @@ function mapRequest(r: RequestApiResponse): RequestCard {
       ? { id: r.assigned_to_id, name: r.assigned_to_name || "" }
       : null,
     overdue,
+    version: r.version,
   };
 }
 
+const SYNC_INTERVAL_MS = 15000;
+
 export default function RequestsPage() {
   const [data, setData] = useState<RequestCard[]>([]);
+  const [totals, setTotals] = useState<ColumnTotals>({});
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState<string | null>(null);
 
+  const cursor = useRef<string | null>(null);
+  const columnCursors = useRef<Partial<Record<RequestStage, string>>>({});
+
+  // Merge one page of board columns into the cards and per-column totals
+  const applyColumns = (cols: RequestBoardColumn[]) => {
+    setData((prev) => {
+      const byId = new Map(prev.map((r) => [r.id, r]));
+      cols.forEach((c) => c.cards.forEach((r) => byId.set(r.id, mapRequest(r))));
+      return Array.from(byId.values());
+    });
+    setTotals((prev) => {
+      const next = { ...prev };
+      cols.forEach((c) => {
+        next[c.stage] = {
+          count: c.count,
+          capped: c.count_capped,
+          hasMore: c.next_cursor !== null,
+        };
+        if (c.next_cursor) columnCursors.current[c.stage] = c.next_cursor;
+        else delete columnCursors.current[c.stage];
+      });
+      return next;
+    });
+  };
+
+  // Pull only what changed since the last cursor and patch it into the board
+  const sync = async () => {
+    let more = true;
+    while (more) {
+      const query = cursor.current
+        ? `?since=${encodeURIComponent(cursor.current)}`
+        : "";
+      const res = await api<RequestChangesResponse>(`/requests/changes${query}`);
+      setData((prev) => {
+        const byId = new Map(prev.map((r) => [r.id, r]));
+        res.removed.forEach((r) => byId.delete(r.id));
+        res.changed.forEach((r) => byId.set(r.id, mapRequest(r)));
+        return Array.from(byId.values());
+      });
+      cursor.current = res.cursor;
+      more = res.has_more;
+    }
+  };
+
+  // First page of every column, then live changes from the board snapshot on
   const load = async () => {
     setLoading(true);
     setError(null);
+    cursor.current = null;
+    columnCursors.current = {};
+    setData([]);
+    setTotals({});
     try {
-      const res = await api<RequestApiResponse[]>("/requests");
-      setData(res.map(mapRequest));
+      const board = await api<RequestBoardResponse>("/requests/board");
+      applyColumns(board.columns);
+      cursor.current = board.changes_cursor;
     } catch (err) {
       setError(err instanceof Error ? err.message : "Failed to load requests");
     } finally {
@@ -51,17 +111,52 @@ export default function RequestsPage() {
 
   useEffect(() => {
     void load();
+    const timer = setInterval(() => {
+      if (cursor.current) void sync().catch(() => undefined);
+    }, SYNC_INTERVAL_MS);
+    return () => clearInterval(timer);
   }, []);
 
+  const loadMore = async (stage: RequestStage) => {
+    const next = columnCursors.current[stage];
+    if (!next) return;
+    try {
+      const board = await api<RequestBoardResponse>(
+        `/requests/board?stage=${stage}&cursor=${encodeURIComponent(next)}`
+      );
+      applyColumns(board.columns);
+    } catch (err) {
+      setError(err instanceof Error ? err.message : "Failed to load requests");
+    }
+  };
+
   const handleStageChange = async (id: number, stage: RequestStage) => {
+    // server rejects the move with 409 if someone else changed the card first
+    const card = data.find((r) => r.id === id);
+    const version = card?.version ?? undefined;
     // optimistic update
     setData((prev) => prev.map((r) => (r.id === id ? { ...r, stage } : r)));
+    if (card) {
+      setTotals((prev) => {
+        const next = { ...prev };
+        const from = next[card.stage];
+        const to = next[stage];
+        if (from) next[card.stage] = { ...from, count: Math.max(0, from.count - 1) };
+        if (to) next[stage] = { ...to, count: to.count + 1 };
+        return next;
+      });
+    }
     try {
       const updated = await api<RequestApiResponse>(
         `/requests/${id}/stage`,
         {
           method: "PATCH",
-          body: { stage, actual_duration_hours: stage === "repaired" ? 1 : undefined },
+          idempotencyKey: crypto.randomUUID(),
+          body: {
+            stage,
+            actual_duration_hours: stage === "repaired" ? 1 : undefined,
+            version,
+          },
         }
       );
       setData((prev) =>
@@ -89,7 +184,12 @@ export default function RequestsPage() {
       {loading ? (
         <div className="text-sm text-muted-foreground">Loading...</div>
       ) : (
-        <KanbanBoard requests={data} onStageChange={handleStageChange} />
+        <KanbanBoard
+          requests={data}
+          totals={totals}
+          onStageChange={handleStageChange}
+          onLoadMore={loadMore}
+        />
       )}
     </div>
   );
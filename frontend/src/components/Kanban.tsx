@@ -16,6 +16,7 @@ import {
 import { CSS } from "@dnd-kit/utilities";
 import { Avatar, AvatarFallback, AvatarImage } from "@/components/ui/avatar";
 import { Badge } from "@/components/ui/badge";
+import { Button } from "@/components/ui/button";
 import { Card, CardContent, CardHeader, CardTitle } from "@/components/ui/card";
 import { RequestCard, RequestStage } from "@/lib/types";
 import clsx from "clsx";
@@ -35,6 +36,11 @@ const columns: StageColumn[] = [
 
 const stageKeys: RequestStage[] = ["new", "in_progress", "repaired", "scrap"];
 
+// Server-side totals for columns that only hold their first page of cards
+export type ColumnTotals = Partial<
+  Record<RequestStage, { count: number; capped: boolean; hasMore: boolean }>
+>;
+
 function SortableItem({ request }: { request: RequestCard }) {
   const {
     attributes,
@@ -113,7 +119,17 @@ function SortableItem({ request }: { request: RequestCard }) {
   );
 }
 
-function Column({ col, items }: { col: StageColumn; items: RequestCard[] }) {
+function Column({
+  col,
+  items,
+  total,
+  onLoadMore,
+}: {
+  col: StageColumn;
+  items: RequestCard[];
+  total?: ColumnTotals[RequestStage];
+  onLoadMore?: () => void;
+}) {
   const { setNodeRef, isOver } = useDroppable({
     id: col.id,
   });
@@ -122,7 +138,9 @@ function Column({ col, items }: { col: StageColumn; items: RequestCard[] }) {
     <Card key={col.id} className="bg-muted/30">
       <CardHeader className="flex flex-row items-center justify-between pb-2">
         <CardTitle className="text-sm">{col.title}</CardTitle>
-        <Badge variant="secondary">{items.length}</Badge>
+        <Badge variant="secondary">
+          {total ? `${total.count}${total.capped ? "+" : ""}` : items.length}
+        </Badge>
       </CardHeader>
       <CardContent
         ref={setNodeRef}
@@ -143,6 +161,16 @@ function Column({ col, items }: { col: StageColumn; items: RequestCard[] }) {
             ))}
           </div>
         </SortableContext>
+        {total?.hasMore && onLoadMore ? (
+          <Button
+            variant="ghost"
+            size="sm"
+            className="w-full"
+            onClick={onLoadMore}
+          >
+            Load more
+          </Button>
+        ) : null}
       </CardContent>
     </Card>
   );
@@ -150,10 +178,14 @@ function Column({ col, items }: { col: StageColumn; items: RequestCard[] }) {
 
 export function KanbanBoard({
   requests,
+  totals,
   onStageChange,
+  onLoadMore,
 }: {
   requests: RequestCard[];
+  totals?: ColumnTotals;
   onStageChange?: (id: number, stage: RequestStage) => void;
+  onLoadMore?: (stage: RequestStage) => void;
 }) {
   const sensors = useSensors(
     useSensor(PointerSensor, {
@@ -193,7 +225,13 @@ export function KanbanBoard({
     <DndContext sensors={sensors} onDragEnd={handleDragEnd}>
       <div className="grid gap-4 md:grid-cols-4">
         {columns.map((col) => (
-          <Column key={col.id} col={col} items={itemsByStage[col.id]} />
+          <Column
+            key={col.id}
+            col={col}
+            items={itemsByStage[col.id]}
+            total={totals?.[col.id]}
+            onLoadMore={onLoadMore ? () => onLoadMore(col.id) : undefined}
+          />
         ))}
       </div>
     </DndContext>
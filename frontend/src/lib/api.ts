@@ -17,24 +17,55 @@ export class ApiError extends Error {
   }
 }
 
+// Reads and keyed writes shed by the API's admission control (429/503 +
+// Retry-After) are retried
+const MAX_RETRIES = 2;
+
+function retryDelayMs(res: Response): number | null {
+  if (res.status !== 429 && res.status !== 503) return null;
+  const seconds = Number(res.headers.get("Retry-After"));
+  return Number.isFinite(seconds) && seconds > 0 ? seconds * 1000 : null;
+}
+
 export async function api<T>(
   path: string,
-  options: { method?: HttpMethod; body?: unknown; token?: string } = {}
+  options: {
+    method?: HttpMethod;
+    body?: unknown;
+    token?: string;
+    // writes sent with a key are safe to resend: the API replays the first outcome
+    idempotencyKey?: string;
+  } = {}
 ): Promise<T> {
-  const { method = "GET", body, token } = options;
+  const { method = "GET", body, token, idempotencyKey } = options;
+  const retryable = method === "GET" || idempotencyKey !== undefined;
 
   const authToken =
     token ?? (typeof window !== "undefined" ? getToken() : null) ?? undefined;
 
-  const res = await fetch(`${API_BASE}${path}`, {
-    method,
-    headers: {
-      "Content-Type": "application/json",
-      ...(authToken ? { Authorization: `Bearer ${authToken}` } : {}),
-    },
-    body: body === undefined ? undefined : JSON.stringify(body),
-    cache: "no-store",
-  });
+  let res: Response;
+  for (let attempt = 0; ; attempt++) {
+    try {
+      res = await fetch(`${API_BASE}${path}`, {
+        method,
+        headers: {
+          "Content-Type": "application/json",
+          ...(authToken ? { Authorization: `Bearer ${authToken}` } : {}),
+          ...(idempotencyKey ? { "Idempotency-Key": idempotencyKey } : {}),
+        },
+        body: body === undefined ? undefined : JSON.stringify(body),
+        cache: "no-store",
+      });
+    } catch (err) {
+      // network failure: the write may or may not have landed, so only
+      // resend when the key makes that harmless
+      if (!retryable || attempt >= MAX_RETRIES) throw err;
+      continue;
+    }
+    const delay = retryable && attempt < MAX_RETRIES ? retryDelayMs(res) : null;
+    if (delay === null) break;
+    await new Promise((resolve) => setTimeout(resolve, delay));
+  }
 
   if (!res.ok) {
     const text = await res.text().catch(() => "");
@@ -11,6 +11,7 @@ export interface RequestCard {
   teamName: string;
   assignedTo?: { id: number; name: string; avatarUrl?: string | null } | null;
   overdue: boolean;
+  version?: number | null;
 }
 
 export interface RequestApiResponse {
@@ -25,6 +26,29 @@ export interface RequestApiResponse {
   assigned_to_id: number | null;
   assigned_to_name: string | null;
   scheduled_start: string | null;
+  due_at?: string | null;
+  overdue?: boolean | null;
+  version?: number | null;
+}
+
+export interface RequestBoardColumn {
+  stage: RequestStage;
+  count: number;
+  count_capped: boolean;
+  cards: RequestApiResponse[];
+  next_cursor: string | null;
+}
+
+export interface RequestBoardResponse {
+  columns: RequestBoardColumn[];
+  changes_cursor: string;
+}
+
+export interface RequestChangesResponse {
+  changed: RequestApiResponse[];
+  removed: { id: number; reason: "archived" | "hidden" }[];
+  cursor: string;
+  has_more: boolean;
 }
 
 export interface EquipmentItem {